@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+from backend.app.core.logging import get_logger
+from backend.app.db.postgres import PostgresDBConnection
+from backend.app.db.redis import AsyncRedisDBConnection
+from ml.models.v1.embedder import Model
+from ml.inference.embedding_workers import EmbeddingWorkerPool
+from ml.services.postgres_pool import MLPostgresConnectionPool
+from ml.services.async_postgres_pool import MLAsyncPostgresConnectionPool
+from ml.services.mmap_index import MmapVectorIndex
+from ml.services.hnsw_index import HnswVectorIndex
+from ml.services.quantized_index import QuantizedVectorIndex
+from ml.services.catalog_snapshot import CatalogSnapshot
+from ml.Enum.Enumerations import Enumerations
+
+logger = get_logger(__name__, system_type="backend")
+
+
+class WarmUp:
+    # the service cannot answer requests without the embedder and its database pools
+    CRITICAL_STAGES = ("embedding_workers", "model_load", "ml_async_pool", "ml_pool", "backend_pool")
+
+    ready = False
+    finished = False
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def status() -> str:
+        if WarmUp.ready:
+            return "ready"
+        return "failed" if WarmUp.finished else "warming_up"
+
+    @staticmethod
+    def _load_model():
+        if Model.model() is None:
+            raise RuntimeError("embedding model failed to load")
+
+    @staticmethod
+    async def _ping_redis():
+        redis_client = await AsyncRedisDBConnection.get_connection()
+        await redis_client.ping()
+
+    @staticmethod
+    async def _run_stage(name: str, stage: Callable[[], Awaitable[Any]]):
+        start = time.perf_counter()
+
+        error = None
+        try:
+            await stage()
+            status = "ok"
+        except Exception as e:
+            status = "failed"
+            error = str(e)
+            logger.error(f"Warm-up stage '{name}' failed: {e}", exc_info=True)
+
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+        WarmUp.stages[name] = {"status": status, "elapsed_ms": elapsed_ms}
+        if error is not None:
+            WarmUp.stages[name]["error"] = error
+        logger.info(f"Warm-up stage '{name}' {status} in {elapsed_ms} ms")
+
+    @staticmethod
+    async def run():
+        WarmUp.ready = False
+        WarmUp.finished = False
+        WarmUp.stages = {}
+        start = time.perf_counter()
+
+        if EmbeddingWorkerPool.enabled():
+            await WarmUp._run_stage("embedding_workers", lambda: asyncio.to_thread(EmbeddingWorkerPool.warm_up))
+        else:
+            await WarmUp._run_stage("model_load", lambda: asyncio.to_thread(WarmUp._load_model))
+            await WarmUp._run_stage("model_encode", lambda: asyncio.to_thread(Model.warm_up))
+
+        if Enumerations.ml_async_db:
+            await WarmUp._run_stage("ml_async_pool", MLAsyncPostgresConnectionPool.warm_up)
+        else:
+            await WarmUp._run_stage("ml_pool", lambda: asyncio.to_thread(MLPostgresConnectionPool.warm_up))
+        if Enumerations.vector_search_backend == "mmap":
+            await WarmUp._run_stage("mmap_index", lambda: asyncio.to_thread(MmapVectorIndex.warm_up))
+        elif Enumerations.vector_search_backend == "hnsw":
+            await WarmUp._run_stage("hnsw_index", lambda: asyncio.to_thread(HnswVectorIndex.warm_up))
+        elif Enumerations.vector_search_backend == "binary":
+            await WarmUp._run_stage("quantized_index", lambda: asyncio.to_thread(QuantizedVectorIndex.warm_up))
+        if CatalogSnapshot.enabled():
+            await WarmUp._run_stage("catalog_snapshot", lambda: asyncio.to_thread(CatalogSnapshot.warm_up))
+        await WarmUp._run_stage("backend_pool", PostgresDBConnection.warm_up)
+        await WarmUp._run_stage("redis", WarmUp._ping_redis)
+
+        total_ms = round((time.perf_counter() - start) * 1000, 2)
+        failed = [
+            name for name in WarmUp.CRITICAL_STAGES
+            if name in WarmUp.stages and WarmUp.stages[name]["status"] != "ok"
+        ]
+        WarmUp.ready = not failed
+        WarmUp.finished = True
+
+        if failed:
+            logger.error(f"Warm-up finished in {total_ms} ms but critical stages failed {failed}, not ready: {WarmUp.stages}")
+        else:
+            logger.info(f"Warm-up finished in {total_ms} ms: {WarmUp.stages}")
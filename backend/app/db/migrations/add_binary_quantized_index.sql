@@ -0,0 +1,3 @@
+-- two-stage search (VECTOR_SEARCH_BACKEND=pgvector_binary), needs pgvector >= 0.7
+CREATE INDEX IF NOT EXISTS books_embedding_bit_idx ON books
+USING hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops) WITH (m = 16, ef_construction = 200);
@@ -0,0 +1,5 @@
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS books_publishyear_rating_idx ON books (publishyear, rating);
+CREATE INDEX IF NOT EXISTS books_publisher_lower_idx ON books (lower(publisher));
+CREATE INDEX IF NOT EXISTS books_authors_trgm_idx ON books USING gin (authors gin_trgm_ops);
+ANALYZE books;
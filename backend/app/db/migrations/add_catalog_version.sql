@@ -0,0 +1,8 @@
+-- book metadata cache invalidation (METADATA_CACHE=true), bumped by ml.pipeline.v1.ingest after every load
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO catalog_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
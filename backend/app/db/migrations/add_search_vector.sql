@@ -0,0 +1,9 @@
+-- hybrid lexical + vector search (HYBRID_SEARCH=true)
+ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english'::regconfig, coalesce(name_cleaned, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(description_cleaned, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS books_search_vector_idx ON books USING gin (search_vector);
+
+ANALYZE books;
@@ -10,6 +10,7 @@ from backend.app.core.config import (
     DB_PORT
 )
 from backend.app.enum.enumerations import Enumerations
+from ml.services.pgvector_codec import PGVectorCodec
 
 logger = get_logger(__name__, system_type='backend')
 
@@ -35,12 +36,28 @@ class PostgresDBConnection:
                             port=DB_PORT,
                             min_size=Enumerations.min_connections,
                             max_size=Enumerations.max_connections,
+                            init=PGVectorCodec.register_asyncpg,
                         )
                         logger.info("Async PostgreSQL connection pool initialized")
                     except Exception as e:
                         logger.error(f"Error initializing Async PostgreSQL connection pool: {e}")
                         raise
 
+    @classmethod
+    async def warm_up(cls) -> int:
+        if cls._pool is None:
+            await cls.init_pool()
+
+        async def ping():
+            async with cls._pool.acquire() as conn:
+                await conn.fetchval("SELECT 1")
+
+        connections = cls._pool.get_min_size()
+        await asyncio.gather(*(ping() for _ in range(connections)))
+
+        logger.info(f"Async PostgreSQL connection pool warmed up with {connections} connections")
+        return connections
+
     @classmethod
     async def close_pool(cls):
         if cls._pool:
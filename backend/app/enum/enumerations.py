@@ -5,6 +5,7 @@ load_dotenv()
 
 KEY_PREFIX = os.getenv("KEY_PREFIX", "rate_limit")
 CACHE_PREFIX = os.getenv("CACHE_PREFIX", "search")
+RANKED_PREFIX = os.getenv("RANKED_PREFIX", "ranked")
 
 RETRIES = int(float(os.getenv('RETRIES', 3)))
 RETRY_DELAY = int(float(os.getenv('RETRY_DELAY', 3)))
@@ -16,6 +17,9 @@ CACHE_TTL = int(float(os.getenv("EXPIRE", 3600)))
 CLEAR_ALL_COUNTER = int(os.getenv("CLEAR_ALL_COUNTER", 100))
 SEARCH_REQUEST_MAX_LENGTH = int(os.getenv("SEARCH_REQUEST_MAX_LENGTH", 255))
 SEARCH_REQUEST_MIN_LENGTH = int(os.getenv("SEARCH_REQUEST_MIN_LENGTH", 1))
+BATCH_SEARCH_MAX_QUERIES = int(os.getenv("BATCH_SEARCH_MAX_QUERIES", 100))
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 20))
+PAGE_SIZE_LESS_THAN_OR_EQUAL = int(os.getenv("PAGE_SIZE_LESS_THAN_OR_EQUAL", 500))
 
 TOP_K_GREAT_THAN_OR_EQUAL = int(os.getenv("TOP_K_GREAT_THAN_OR_EQUAL", 1))
 TOP_K_LESS_THAN_OR_EQUAL = int(os.getenv("TOP_K_LESS_THAN_OR_EQUAL", 10000))
@@ -51,11 +55,15 @@ class Enumerations:
     # Caching
     cache_ttl = CACHE_TTL
     cache_prefix = CACHE_PREFIX
+    ranked_prefix = RANKED_PREFIX
     clear_all_counter = CLEAR_ALL_COUNTER
 
     # schema configurations
     search_request_min_length = SEARCH_REQUEST_MIN_LENGTH
     search_request_max_length = SEARCH_REQUEST_MAX_LENGTH
+    batch_search_max_queries = BATCH_SEARCH_MAX_QUERIES
+    search_page_size = SEARCH_PAGE_SIZE
+    page_size_less_than_or_equal = PAGE_SIZE_LESS_THAN_OR_EQUAL
     top_k_greater_than_or_equal = TOP_K_GREAT_THAN_OR_EQUAL
     rerank_top_k_greater_than_or_equal = RERANK_TOP_K_GREAT_THAN_OR_EQUAL
     top_k_less_than_or_equal = TOP_K_LESS_THAN_OR_EQUAL
@@ -1,15 +1,27 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from backend.app.auth.routes import router as auth_router
 from backend.app.users.routes import router as users_router
 from backend.app.search.routes import router as search_router
 from backend.app.db.postgres import PostgresDBConnection
+from backend.app.core.warmup import WarmUp
+from ml.pipeline.v1.embedding_cache import EmbeddingCache
+from ml.inference.embedding_workers import EmbeddingWorkerPool
+from ml.services.async_postgres_pool import MLAsyncPostgresConnectionPool
+from ml.services.metadata_cache import MetadataCache
+from ml.services.catalog_snapshot import CatalogSnapshot
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await PostgresDBConnection.init_pool()
+    EmbeddingCache.load()
+    await WarmUp.run()
     yield
+    EmbeddingCache.save()
+    EmbeddingWorkerPool.shutdown()
+    await MLAsyncPostgresConnectionPool.close()
     await PostgresDBConnection.close_pool()
 
 app = FastAPI(
@@ -25,3 +37,24 @@ app.include_router(search_router)
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready", tags=["health"])
+async def readiness_check():
+    payload = {
+        "status": WarmUp.status(),
+        "stages": WarmUp.stages
+    }
+
+    if not WarmUp.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=payload
+        )
+
+    return payload
+
+
+@app.get("/stats", tags=["health"])
+async def stats():
+    return {"metadata_cache": MetadataCache.stats(), "catalog_snapshot": CatalogSnapshot.stats()}
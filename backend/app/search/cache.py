@@ -11,25 +11,44 @@ logger = get_logger(__name__, system_type="backend")
 class CacheManager:
     CACHE_TTL = Enumerations.cache_ttl
     CACHE_PREFIX = Enumerations.cache_prefix
+    RANKED_PREFIX = Enumerations.ranked_prefix
 
     @staticmethod
-    def _generate_key(
+    def ranked_token(
         query: str,
         top_k: int,
         apply_rerank: bool = True,
-        rerank_top_k: int = Enumerations.top_k_rerank
+        rerank_top_k: int = Enumerations.top_k_rerank,
+        filters: Optional[Dict[str, Any]] = None
     ) -> str:
         normalized_query = query.lower().strip()
         raw_key = f"{normalized_query}:{top_k}:{apply_rerank}:{rerank_top_k}"
-        hash_key = hashlib.md5(raw_key.encode()).hexdigest()
+        if filters:
+            raw_key = f"{raw_key}:{json.dumps(filters, sort_keys=True)}"
+        return hashlib.md5(raw_key.encode()).hexdigest()
+
+    @staticmethod
+    def _generate_key(
+        query: str,
+        top_k: int,
+        apply_rerank: bool = True,
+        rerank_top_k: int = Enumerations.top_k_rerank,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> str:
+        hash_key = CacheManager.ranked_token(query, top_k, apply_rerank, rerank_top_k, filters)
         return f"{CacheManager.CACHE_PREFIX}:{hash_key}"
 
+    @staticmethod
+    def _ranked_key(token: str) -> str:
+        return f"{CacheManager.CACHE_PREFIX}:{CacheManager.RANKED_PREFIX}:{token}"
+
     @staticmethod
     async def get(
         query: str,
         top_k: int,
         apply_rerank: bool = True,
-        rerank_top_k: int = Enumerations.top_k_rerank
+        rerank_top_k: int = Enumerations.top_k_rerank,
+        filters: Optional[Dict[str, Any]] = None
     ) -> tuple[Optional[List[Dict[str, Any]]], int]:
         try:
             redis_client = await AsyncRedisDBConnection.get_connection()
@@ -37,18 +56,15 @@ class CacheManager:
                 query,
                 top_k,
                 apply_rerank,
-                rerank_top_k
+                rerank_top_k,
+                filters
             )
 
             cached_data = await redis_client.get(cache_key)
 
             if cached_data:
                 logger.info(f"Cache hit for query: '{query}' (top_k={top_k}, rerank={apply_rerank})")
-                parsed = json.loads(cached_data)
-                if isinstance(parsed, dict) and 'results' in parsed and 'total_results' in parsed:
-                    return parsed['results'], parsed['total_results']
-                else:
-                    return parsed, len(parsed)
+                return CacheManager._parse(cached_data)
 
             logger.info(f"Cache miss for query: '{query}' (top_k={top_k}, rerank={apply_rerank})")
             return None, 0
@@ -64,7 +80,8 @@ class CacheManager:
         result: Optional[List[Dict[str, Any]]],
         total_results: int,
         apply_rerank: bool = True,
-        rerank_top_k: int = Enumerations.top_k_rerank
+        rerank_top_k: int = Enumerations.top_k_rerank,
+        filters: Optional[Dict[str, Any]] = None
     ) -> bool:
         try:
             redis_client = await AsyncRedisDBConnection.get_connection()
@@ -72,7 +89,8 @@ class CacheManager:
                 query,
                 top_k,
                 apply_rerank,
-                rerank_top_k
+                rerank_top_k,
+                filters
             )
             
             payload = {
@@ -93,12 +111,114 @@ class CacheManager:
             logger.warning(f"Cache set error: {e}", exc_info=True)
             return False
 
+    @staticmethod
+    def _parse(cached_data) -> tuple[Optional[List[Dict[str, Any]]], int]:
+        parsed = json.loads(cached_data)
+        if isinstance(parsed, dict) and 'results' in parsed and 'total_results' in parsed:
+            return parsed['results'], parsed['total_results']
+        return parsed, len(parsed)
+
+    @staticmethod
+    async def get_many(
+        queries: List[str],
+        top_k: int,
+        apply_rerank: bool = True,
+        rerank_top_k: int = Enumerations.top_k_rerank
+    ) -> List[tuple[Optional[List[Dict[str, Any]]], int]]:
+        try:
+            redis_client = await AsyncRedisDBConnection.get_connection()
+            cache_keys = [
+                CacheManager._generate_key(query, top_k, apply_rerank, rerank_top_k)
+                for query in queries
+            ]
+
+            cached = await redis_client.mget(cache_keys)
+            entries = [CacheManager._parse(data) if data else (None, 0) for data in cached]
+
+            hits = sum(1 for results, _ in entries if results is not None)
+            logger.info(f"Cache hits for {hits} of {len(queries)} batch queries (top_k={top_k}, rerank={apply_rerank})")
+            return entries
+
+        except Exception as e:
+            logger.warning(f"Cache get_many error: {e}", exc_info=True)
+            return [(None, 0) for _ in queries]
+
+    @staticmethod
+    async def set_many(
+        entries: List[tuple[str, List[Dict[str, Any]], int]],
+        top_k: int,
+        apply_rerank: bool = True,
+        rerank_top_k: int = Enumerations.top_k_rerank
+    ) -> bool:
+        if not entries:
+            return True
+
+        try:
+            redis_client = await AsyncRedisDBConnection.get_connection()
+
+            async with redis_client.pipeline(transaction=False) as pipeline:
+                for query, result, total_results in entries:
+                    pipeline.setex(
+                        CacheManager._generate_key(query, top_k, apply_rerank, rerank_top_k),
+                        CacheManager.CACHE_TTL,
+                        json.dumps({"results": result, "total_results": total_results})
+                    )
+                await pipeline.execute()
+
+            logger.info(f"Cached results for {len(entries)} batch queries (top_k={top_k}, rerank={apply_rerank})")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Cache set_many error: {e}", exc_info=True)
+            return False
+
+    @staticmethod
+    async def get_ranked(token: str) -> tuple[Optional[List[List[Any]]], int]:
+        try:
+            redis_client = await AsyncRedisDBConnection.get_connection()
+            cached_data = await redis_client.get(CacheManager._ranked_key(token))
+
+            if cached_data:
+                parsed = json.loads(cached_data)
+                logger.info(f"Ranked list cache hit ({len(parsed['ranked'])} books)")
+                return parsed['ranked'], parsed['total_results']
+
+            return None, 0
+
+        except Exception as e:
+            logger.warning(f"Ranked list cache get error: {e}", exc_info=True)
+            return None, 0
+
+    @staticmethod
+    async def set_ranked(
+        token: str,
+        ranked: List[List[Any]],
+        total_results: int
+    ) -> bool:
+        try:
+            redis_client = await AsyncRedisDBConnection.get_connection()
+
+            # [book_id, similarity(, rerank_score)] rows only; pages hydrate their metadata on read
+            await redis_client.setex(
+                CacheManager._ranked_key(token),
+                CacheManager.CACHE_TTL,
+                json.dumps({"ranked": ranked, "total_results": total_results}, separators=(",", ":"))
+            )
+
+            logger.info(f"Cached ranked list of {len(ranked)} books")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Ranked list cache set error: {e}", exc_info=True)
+            return False
+
     @staticmethod
     async def invalidate(
         query: str,
         top_k: int,
         apply_rerank: bool = True,
-        rerank_top_k: int = Enumerations.top_k_rerank
+        rerank_top_k: int = Enumerations.top_k_rerank,
+        filters: Optional[Dict[str, Any]] = None
     ) -> bool:
         try:
             redis_client = await AsyncRedisDBConnection.get_connection()
@@ -106,10 +226,12 @@ class CacheManager:
                 query,
                 top_k,
                 apply_rerank,
-                rerank_top_k
+                rerank_top_k,
+                filters
             )
 
-            await redis_client.delete(cache_key)
+            token = CacheManager.ranked_token(query, top_k, apply_rerank, rerank_top_k, filters)
+            await redis_client.delete(cache_key, CacheManager._ranked_key(token))
             logger.info(f"Invalidated cache for query: '{query}'")
             return True
 
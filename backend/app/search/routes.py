@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, status
 from .service import SearchService
-from .schemas import SearchRequest, SearchResponse
+from .schemas import SearchRequest, SearchResponse, BatchSearchRequest, BatchSearchResponse
 from backend.app.core.logging import get_logger
+from backend.app.enum.enumerations import Enumerations
 
 
 router = APIRouter(prefix="/search", tags=["search"])
@@ -11,14 +12,29 @@ logger = get_logger(__name__, system_type="backend")
 @router.post("/", response_model=SearchResponse)
 async def search(request: SearchRequest):
     try:
-        logger.info(f"Search request: '{request.query}' (top_k={request.top_k}, rerank={request.apply_rerank})")
+        logger.info(f"Search request: '{request.query}' (top_k={request.top_k}, rerank={request.apply_rerank}, filters={request.filters})")
 
-        results, total_found = await SearchService.search(
-            query=request.query,
-            top_k=request.top_k,
-            apply_rerank=request.apply_rerank,
-            rerank_top_k=request.rerank_top_k
-        )
+        filters = request.filters.model_dump(exclude_none=True) if request.filters else None
+        next_cursor = None
+
+        if request.page_size or request.cursor:
+            results, total_found, next_cursor = await SearchService.search_page(
+                query=request.query,
+                top_k=request.top_k,
+                apply_rerank=request.apply_rerank,
+                rerank_top_k=request.rerank_top_k,
+                filters=filters,
+                page_size=request.page_size or Enumerations.search_page_size,
+                cursor=request.cursor
+            )
+        else:
+            results, total_found = await SearchService.search(
+                query=request.query,
+                top_k=request.top_k,
+                apply_rerank=request.apply_rerank,
+                rerank_top_k=request.rerank_top_k,
+                filters=filters
+            )
 
         print(f"API Search returned {len(results)} results (out of {total_found}) for top_k={request.top_k} rerank_top_k={request.rerank_top_k}")
 
@@ -26,7 +42,14 @@ async def search(request: SearchRequest):
             success=True,
             query=request.query,
             total_results=total_found,
-            results=results
+            results=results,
+            next_cursor=next_cursor
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
 
     except Exception as e:
@@ -35,3 +58,37 @@ async def search(request: SearchRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Search failed: {str(e)}"
         )
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def search_batch(request: BatchSearchRequest):
+    try:
+        logger.info(f"Batch search request: {len(request.queries)} queries (top_k={request.top_k}, rerank={request.apply_rerank})")
+
+        batch = await SearchService.search_batch(
+            queries=request.queries,
+            top_k=request.top_k,
+            apply_rerank=request.apply_rerank,
+            rerank_top_k=request.rerank_top_k
+        )
+
+        return BatchSearchResponse(
+            success=True,
+            total_queries=len(batch),
+            results=[
+                SearchResponse(
+                    success=True,
+                    query=query,
+                    total_results=total_found,
+                    results=results
+                )
+                for query, (results, total_found) in zip(request.queries, batch)
+            ]
+        )
+
+    except Exception as e:
+        logger.error(f"Batch search endpoint error: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch search failed: {str(e)}"
+        )
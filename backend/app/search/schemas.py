@@ -1,7 +1,44 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Dict, Any
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Dict, Any, Optional
 from backend.app.enum.enumerations import Enumerations
 from ml.Enum.Enumerations import Enumerations as ml_enum
+from ml.pipeline.v1.feature import FeatureExtractor
+
+
+class SearchFilters(BaseModel):
+    min_year: Optional[int] = Field(default=None, description="Earliest publish year")
+    max_year: Optional[int] = Field(default=None, description="Latest publish year")
+    min_rating: Optional[float] = Field(default=None, ge=0, le=5, description="Minimum rating")
+    publisher: Optional[str] = Field(
+        default=None,
+        max_length=Enumerations.search_request_max_length,
+        description="Publisher, matched case-insensitively"
+    )
+    author: Optional[str] = Field(
+        default=None,
+        max_length=Enumerations.search_request_max_length,
+        description="Part of an author name, matched case-insensitively"
+    )
+    category: Optional[str] = Field(
+        default=None,
+        description="Tech category; the search only touches that partition of the books table"
+    )
+
+    @field_validator("category")
+    @classmethod
+    def validate_category(cls, valid):
+        if valid is None:
+            return valid
+        category = valid.strip().lower()
+        if category not in FeatureExtractor.CATEGORIES:
+            raise ValueError(f"category must be one of {', '.join(FeatureExtractor.CATEGORIES)}")
+        return category
+
+    @model_validator(mode="after")
+    def validate_years(self):
+        if self.min_year is not None and self.max_year is not None and self.min_year > self.max_year:
+            raise ValueError("min_year cannot be greater than max_year")
+        return self
 
 
 class SearchRequest(BaseModel):
@@ -30,6 +67,24 @@ class SearchRequest(BaseModel):
         description="Number of results to rerank"
     )
 
+    filters: Optional[SearchFilters] = Field(
+        default=None,
+        description="Metadata filters applied inside the vector search"
+    )
+
+    page_size: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=Enumerations.page_size_less_than_or_equal,
+        description="Return the ranking in pages of this size with a cursor for the next page"
+    )
+
+    cursor: Optional[str] = Field(
+        default=None,
+        max_length=Enumerations.search_request_max_length,
+        description="Cursor from a previous paged response"
+    )
+
     @field_validator("query")
     @classmethod
     def validate_query(cls, valid):
@@ -43,3 +98,48 @@ class SearchResponse(BaseModel):
     query: str
     total_results: int
     results: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(
+        min_length=1,
+        max_length=Enumerations.batch_search_max_queries,
+        description="The search query texts"
+    )
+
+    top_k: int = Field(
+        default=ml_enum.top_k,
+        ge=Enumerations.top_k_greater_than_or_equal,
+        le=Enumerations.top_k_less_than_or_equal,
+        description="Number of results to return per query"
+    )
+
+    apply_rerank: bool = Field(
+        default=True,
+        description="Whether to apply semantic reranking"
+    )
+
+    rerank_top_k: int = Field(
+        default=ml_enum.top_k_rerank,
+        ge=Enumerations.rerank_top_k_greater_than_or_equal,
+        le=Enumerations.rerank_top_k_less_than_or_equal,
+        description="Number of results to rerank per query"
+    )
+
+    @field_validator("queries")
+    @classmethod
+    def validate_queries(cls, valid):
+        queries = [query.strip() if query else "" for query in valid]
+        for query in queries:
+            if not query:
+                raise ValueError("Queries cannot be empty or whitespace only")
+            if len(query) > Enumerations.search_request_max_length:
+                raise ValueError(f"Queries cannot be longer than {Enumerations.search_request_max_length} characters")
+        return queries
+
+
+class BatchSearchResponse(BaseModel):
+    success: bool
+    total_queries: int
+    results: List[SearchResponse]
@@ -1,21 +1,62 @@
+import json
+import base64
 import asyncio
 from backend.app.core.logging import get_logger
 from .cache import CacheManager
 from ml.inference.search import Search
+from ml.services.metadata_service import MetadataService
+from ml.services.catalog_snapshot import CatalogSnapshot
 from ml.reranking.reranking import Reranker
 from ml.Enum.Enumerations import Enumerations
-from typing import Dict, List, Any
+from backend.app.enum.enumerations import Enumerations as backend_enum
+from typing import Dict, List, Any, Optional
 
 logger = get_logger(__name__, system_type="backend")
 
 
 class SearchService:
+    @staticmethod
+    def _finalize(
+        ml_results: List[Dict[str, Any]],
+        apply_rerank: bool
+    ) -> tuple[List[Dict[str, Any]], int]:
+        total_found_count = len(ml_results)
+        display_results = ml_results[:Enumerations.top_k]
+
+        if not apply_rerank:
+            return display_results, total_found_count
+
+        logger.info(f"Applying reranking to {len(ml_results)} results")
+
+        rerank_limit = min(
+            len(
+                display_results
+            ),
+            Enumerations.top_k_rerank
+        )
+
+        reranked = Reranker.reranker(
+            display_results,
+            top_k=rerank_limit
+        )
+
+        if reranked:
+            reranked_ids = {book['book_id'] for book in reranked}
+            remaining_books = [b for b in display_results if b['book_id'] not in reranked_ids]
+            final_results = reranked + remaining_books
+            logger.info(f"Reranking complete - returning top {len(final_results)} results")
+            return final_results, total_found_count
+
+        logger.warning("Reranking failed - using original ML results")
+        return display_results, total_found_count
+
     @staticmethod
     async def search(
         query: str,
         top_k: int = Enumerations.top_k,
         apply_rerank: bool = True,
-        rerank_top_k: int = Enumerations.top_k_rerank
+        rerank_top_k: int = Enumerations.top_k_rerank,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         if not query or not query.strip():
             logger.warning("Empty query provided")
@@ -26,7 +67,8 @@ class SearchService:
                 query,
                 top_k,
                 apply_rerank,
-                rerank_top_k
+                rerank_top_k,
+                filters
             )
 
             if cached_results is not None:
@@ -35,63 +77,255 @@ class SearchService:
 
             logger.info(f"Cache miss - calling ML inference for: '{query}'")
 
-            loop = asyncio.get_running_loop()
+            final_results, total_found_count = await SearchService._rank(query, top_k, apply_rerank, filters)
+
+            if not final_results:
+                return [], 0
+
+            await CacheManager.set(
+                query,
+                top_k,
+                final_results,
+                total_found_count,
+                apply_rerank,
+                rerank_top_k,
+                filters
+            )
+            return final_results, total_found_count
+
+        except Exception as e:
+            logger.error(f"Search service error for query '{query}': {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    async def _rank(
+        query: str,
+        top_k: int,
+        apply_rerank: bool,
+        filters: Optional[Dict[str, Any]]
+    ) -> tuple[List[Dict[str, Any]], int]:
+        loop = asyncio.get_running_loop()
+        if Enumerations.ml_async_db:
+            ml_results = await Search.search_async(user_text=query, top_k=top_k, filters=filters)
+        else:
             ml_results = await loop.run_in_executor(
                 None,
-                lambda: Search.search(user_text=query, top_k=top_k)
+                lambda: Search.search(user_text=query, top_k=top_k, filters=filters)
             )
 
-            if not ml_results:
-                logger.warning(f"No results from ML inference for: '{query}'")
-                return []
+        if not ml_results:
+            logger.warning(f"No results from ML inference for: '{query}'")
+            return [], 0
 
-            logger.info(f"ML inference returned {len(ml_results)} results")
+        logger.info(f"ML inference returned {len(ml_results)} results")
 
-            final_results = ml_results
+        if apply_rerank:
+            return await loop.run_in_executor(
+                None,
+                SearchService._finalize,
+                ml_results,
+                apply_rerank
+            )
 
-            if apply_rerank and len(ml_results) > 0:
-                logger.info(f"Applying reranking to {len(ml_results)} results")
+        return SearchService._finalize(ml_results, apply_rerank)
 
-                total_found_count = len(ml_results)
-                display_results = ml_results[:Enumerations.top_k]
-                rerank_limit = min(
-                    len(
-                        display_results
-                    ),
-                    Enumerations.top_k_rerank
-                )
+    @staticmethod
+    def _ranked_rows(results: List[Dict[str, Any]]) -> List[List[Any]]:
+        rows = []
+        for book in results:
+            row = [book['book_id'], book.get('similarity', 0.0)]
+            if 'rerank_score' in book:
+                row.append(book['rerank_score'])
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def encode_cursor(token: str, offset: int) -> str:
+        raw = json.dumps({"token": token, "offset": offset}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-                reranked = await loop.run_in_executor(
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            parsed = json.loads(raw)
+            token, offset = str(parsed["token"]), int(parsed["offset"])
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+        if offset < 0:
+            raise ValueError("Invalid cursor")
+        return token, offset
+
+    @staticmethod
+    async def _metadata(book_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        if Enumerations.ml_async_db:
+            metadata = await MetadataService.get_books_metadata_async(book_ids)
+        else:
+            loop = asyncio.get_running_loop()
+            metadata = await loop.run_in_executor(None, MetadataService.get_books_metadata, book_ids)
+
+        return {book['book_id']: book for book in metadata}
+
+    @staticmethod
+    async def _hydrate(rows: List[List[Any]]) -> List[Dict[str, Any]]:
+        book_ids = [row[0] for row in rows]
+        if not book_ids:
+            return []
+
+        metadata = await SearchService._metadata(book_ids)
+
+        page = []
+        for row in rows:
+            book = metadata.get(row[0])
+            # books deleted since the ranking was cached are skipped
+            if book is None:
+                continue
+            book['similarity'] = row[1]
+            if len(row) > 2:
+                book['rerank_score'] = row[2]
+            page.append(book)
+        return page
+
+    @staticmethod
+    async def _rank_ids(
+        query: str,
+        top_k: int,
+        apply_rerank: bool,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[List[Any]]:
+        loop = asyncio.get_running_loop()
+        if Enumerations.ml_async_db:
+            ranked = await Search.rank_async(user_text=query, top_k=top_k, filters=filters)
+        else:
+            ranked = await loop.run_in_executor(
+                None,
+                lambda: Search.rank(user_text=query, top_k=top_k, filters=filters)
+            )
+
+        if not ranked or not apply_rerank:
+            return [[book['book_id'], book['similarity']] for book in ranked]
+
+        # the reranker sees the same window as an unpaged search; only books the catalog
+        # snapshot does not hold need their metadata for the rerank features
+        window, rest = ranked[:Enumerations.top_k], ranked[Enumerations.top_k:]
+        _, found = CatalogSnapshot.features([book['book_id'] for book in window])
+        missing = [book['book_id'] for book, held in zip(window, found.tolist()) if not held]
+        if missing:
+            metadata = await SearchService._metadata(missing)
+            window = [{**metadata.get(book['book_id'], {}), **book} for book in window]
+
+        final_results, _ = await loop.run_in_executor(None, SearchService._finalize, window, apply_rerank)
+        return SearchService._ranked_rows(final_results) + [[book['book_id'], book['similarity']] for book in rest]
+
+    @staticmethod
+    async def search_page(
+        query: str,
+        top_k: int = Enumerations.top_k,
+        apply_rerank: bool = True,
+        rerank_top_k: int = Enumerations.top_k_rerank,
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = backend_enum.search_page_size,
+        cursor: Optional[str] = None
+    ) -> tuple[List[Dict[str, Any]], int, Optional[str]]:
+        if cursor:
+            token, offset = SearchService.decode_cursor(cursor)
+        else:
+            token, offset = CacheManager.ranked_token(query, top_k, apply_rerank, rerank_top_k, filters), 0
+
+        try:
+            ranked, total_found_count = await CacheManager.get_ranked(token)
+
+            if ranked is None:
+                if cursor:
+                    raise ValueError("Cursor has expired, repeat the search without a cursor")
+
+                logger.info(f"Ranked list miss - calling ML inference for: '{query}'")
+                # the whole top_k ranking is cached, so every page is hydrated on its own
+                ranked = await SearchService._rank_ids(query, top_k, apply_rerank, filters)
+
+                if not ranked:
+                    return [], 0, None
+
+                total_found_count = len(ranked)
+                await CacheManager.set_ranked(token, ranked, total_found_count)
+
+            end = offset + page_size
+            page = await SearchService._hydrate(ranked[offset:end])
+            next_cursor = SearchService.encode_cursor(token, end) if end < len(ranked) else None
+
+            return page, total_found_count, next_cursor
+
+        except ValueError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Paged search service error for query '{query}': {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    async def search_batch(
+        queries: List[str],
+        top_k: int = Enumerations.top_k,
+        apply_rerank: bool = True,
+        rerank_top_k: int = Enumerations.top_k_rerank
+    ) -> List[tuple[List[Dict[str, Any]], int]]:
+        try:
+            entries = await CacheManager.get_many(
+                queries,
+                top_k,
+                apply_rerank,
+                rerank_top_k
+            )
+
+            # repeated queries share one inference, matched the way the cache key normalizes them
+            pending: Dict[str, List[int]] = {}
+            for position, (query, (cached_results, _)) in enumerate(zip(queries, entries)):
+                if cached_results is None:
+                    pending.setdefault(query.lower().strip(), []).append(position)
+
+            if not pending:
+                logger.info(f"Returning cached results for all {len(queries)} batch queries")
+                return entries
+
+            texts = [queries[positions[0]] for positions in pending.values()]
+            logger.info(f"Cache miss - calling ML inference for {len(texts)} of {len(queries)} batch queries")
+
+            loop = asyncio.get_running_loop()
+            if Enumerations.ml_async_db:
+                ml_results = await Search.search_batch_async(user_texts=texts, top_k=top_k)
+            else:
+                ml_results = await loop.run_in_executor(
                     None,
-                    lambda: Reranker.reranker(
-                        display_results,
-                        top_k=rerank_limit
-                    )
+                    lambda: Search.search_batch(user_texts=texts, top_k=top_k)
                 )
 
-                if reranked:
-                    reranked_ids = {book['book_id'] for book in reranked}
-                    remaining_books = [b for b in display_results if b['book_id'] not in reranked_ids]
-                    final_results = reranked + remaining_books
-                    logger.info(f"Reranking complete - returning top {len(final_results)} results")
-                else:
-                    final_results = display_results
-                    logger.warning("Reranking failed - using original ML results")
-            else:
-                total_found_count = len(ml_results)
-                final_results = ml_results[:Enumerations.top_k]
+            # one executor hop reranks every query of the batch
+            finalized = await loop.run_in_executor(
+                None,
+                lambda: [
+                    SearchService._finalize(results, apply_rerank) if results else ([], 0)
+                    for results in ml_results
+                ]
+            )
 
-            await CacheManager.set(
-                query,
+            fresh = []
+            for text, positions, (final_results, total_found_count) in zip(texts, pending.values(), finalized):
+                for position in positions:
+                    entries[position] = (final_results, total_found_count)
+                if final_results:
+                    fresh.append((text, final_results, total_found_count))
+
+            await CacheManager.set_many(
+                fresh,
                 top_k,
-                final_results,
                 apply_rerank,
                 rerank_top_k
             )
-            return final_results, total_found_count
+            return entries
 
         except Exception as e:
-            logger.error(f"Search service error for query '{query}': {e}", exc_info=True)
+            logger.error(f"Batch search service error for {len(queries)} queries: {e}", exc_info=True)
             raise
 
     @staticmethod
@@ -12,6 +12,76 @@ RERANK_WEIGHT_PUBLISHYEAR = float(os.getenv('RERANK_WEIGHT_PUBLISHYEAR', 0.05))
 RERANK_WEIGHT_AVERAGE_LOW = float(os.getenv('RERANK_WEIGHT_AVERAGE_LOW', 0.05))
 MIN_CONNECTIONS = int(os.getenv('MIN_CONNECTIONS', 1))
 MAX_CONNECTIONS = int(os.getenv('MAX_CONNECTIONS', 20))
+REPLICA_EJECT_SECONDS = float(os.getenv('REPLICA_EJECT_SECONDS', 30))
+REPLICA_CONNECT_TIMEOUT = int(os.getenv('REPLICA_CONNECT_TIMEOUT', 3))
+EMBEDDING_MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch').lower()
+EMBEDDING_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', 384))
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv('EMBEDDING_MAX_SEQ_LENGTH', 256))
+EMBEDDING_STORAGE = os.getenv('EMBEDDING_STORAGE', 'vector').lower()
+EMBEDDING_STORAGE_DIMENSION = int(os.getenv('EMBEDDING_STORAGE_DIMENSION', EMBEDDING_DIMENSION))
+EMBEDDING_PROJECTION = os.getenv('EMBEDDING_PROJECTION', 'none').lower()
+EMBEDDING_PCA_PATH = os.getenv('EMBEDDING_PCA_PATH', 'ml/models/v1/embedding_pca.npz')
+ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR', 'ml/models/v1/onnx')
+ONNX_QUANTIZED = os.getenv('ONNX_QUANTIZED', 'true').lower() == 'true'
+ONNX_INTRA_OP_THREADS = int(os.getenv('ONNX_INTRA_OP_THREADS', 0))
+EMBEDDING_WORKERS = int(os.getenv('EMBEDDING_WORKERS', 0))
+EMBEDDING_WORKER_THREADS = int(os.getenv('EMBEDDING_WORKER_THREADS', 0))
+EMBEDDING_WORKER_TIMEOUT = float(os.getenv('EMBEDDING_WORKER_TIMEOUT', 30))
+INGEST_CSV_PATH = os.getenv('INGEST_CSV_PATH', 'ml/data/filtered/v1/tech_books_filtered.csv')
+INGEST_CHECKPOINT_PATH = os.getenv('INGEST_CHECKPOINT_PATH', 'ml/data/processed/v1/ingest_checkpoint.json')
+INGEST_CHUNK_SIZE = int(os.getenv('INGEST_CHUNK_SIZE', 5000))
+INGEST_ENCODE_BATCH_SIZE = int(os.getenv('INGEST_ENCODE_BATCH_SIZE', 256))
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', os.cpu_count() or 1))
+INGEST_MIN_VOTES_QUANTILE = float(os.getenv('INGEST_MIN_VOTES_QUANTILE', 0.75))
+INGEST_TECH_SCORE_CAP = int(os.getenv('INGEST_TECH_SCORE_CAP', 10))
+INGEST_MAINTENANCE_WORK_MEM = os.getenv('INGEST_MAINTENANCE_WORK_MEM', '1GB')
+WARMUP_ENCODES = int(os.getenv('WARMUP_ENCODES', 3))
+WARMUP_CONNECTIONS = int(os.getenv('WARMUP_CONNECTIONS', 4))
+EMBED_CACHE = os.getenv('EMBED_CACHE', 'true').lower() == 'true'
+EMBED_CACHE_SIZE = int(os.getenv('EMBED_CACHE_SIZE', 10000))
+EMBED_CACHE_REDIS = os.getenv('EMBED_CACHE_REDIS', 'true').lower() == 'true'
+EMBED_CACHE_PREFIX = os.getenv('EMBED_CACHE_PREFIX', 'embedding')
+EMBED_CACHE_TTL = int(os.getenv('EMBED_CACHE_TTL', 604800))
+EMBED_CACHE_REDIS_TIMEOUT = float(os.getenv('EMBED_CACHE_REDIS_TIMEOUT', 0.2))
+EMBED_CACHE_REDIS_BACKOFF = float(os.getenv('EMBED_CACHE_REDIS_BACKOFF', 30))
+EMBED_CACHE_PATH = os.getenv('EMBED_CACHE_PATH', '')
+EMBED_BATCHING = os.getenv('EMBED_BATCHING', 'true').lower() == 'true'
+EMBED_BATCH_MAX_SIZE = int(os.getenv('EMBED_BATCH_MAX_SIZE', 32))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv('EMBED_BATCH_MAX_WAIT_MS', 5))
+ML_ASYNC_DB = os.getenv('ML_ASYNC_DB', 'true').lower() == 'true'
+VECTOR_SEARCH_BACKEND = os.getenv('VECTOR_SEARCH_BACKEND', 'pgvector').lower()
+VECTOR_SNAPSHOT_DIR = os.getenv('VECTOR_SNAPSHOT_DIR', 'ml/vector_db/snapshots')
+VECTOR_SNAPSHOT_KEEP = int(os.getenv('VECTOR_SNAPSHOT_KEEP', 2))
+VECTOR_SNAPSHOT_REFRESH_SECONDS = float(os.getenv('VECTOR_SNAPSHOT_REFRESH_SECONDS', 30))
+HNSW_LOCAL_M = int(os.getenv('HNSW_LOCAL_M', 16))
+HNSW_LOCAL_EF_CONSTRUCTION = int(os.getenv('HNSW_LOCAL_EF_CONSTRUCTION', 200))
+HNSW_LOCAL_EF_SEARCH = int(os.getenv('HNSW_LOCAL_EF_SEARCH', EF_SEARCH))
+METADATA_CACHE = os.getenv('METADATA_CACHE', 'true').lower() == 'true'
+METADATA_CACHE_SIZE = int(os.getenv('METADATA_CACHE_SIZE', 20000))
+METADATA_CACHE_TTL_SECONDS = float(os.getenv('METADATA_CACHE_TTL_SECONDS', 3600))
+METADATA_CACHE_VERSION_CHECK_SECONDS = float(os.getenv('METADATA_CACHE_VERSION_CHECK_SECONDS', 5))
+METADATA_CACHE_VERSION_BACKOFF_SECONDS = float(os.getenv('METADATA_CACHE_VERSION_BACKOFF_SECONDS', 300))
+CATALOG_SNAPSHOT = os.getenv('CATALOG_SNAPSHOT', 'false').lower() == 'true'
+CATALOG_SNAPSHOT_DIR = os.getenv('CATALOG_SNAPSHOT_DIR', 'ml/vector_db/catalog')
+CATALOG_SNAPSHOT_DISPLAY = os.getenv('CATALOG_SNAPSHOT_DISPLAY', 'true').lower() == 'true'
+CATALOG_SNAPSHOT_KEEP = int(os.getenv('CATALOG_SNAPSHOT_KEEP', 2))
+CATALOG_SNAPSHOT_REFRESH_SECONDS = float(os.getenv('CATALOG_SNAPSHOT_REFRESH_SECONDS', 30))
+PARTITION_SEARCH_WORKERS = int(os.getenv('PARTITION_SEARCH_WORKERS', 4))
+PARTITION_SEARCH_CONNECTIONS = int(os.getenv('PARTITION_SEARCH_CONNECTIONS', 4))
+INGEST_INDEX_WORKERS = int(os.getenv('INGEST_INDEX_WORKERS', 4))
+HYBRID_SEARCH = os.getenv('HYBRID_SEARCH', 'false').lower() == 'true'
+HYBRID_RRF_K = int(os.getenv('HYBRID_RRF_K', 60))
+QUANTIZED_CANDIDATES = int(os.getenv('QUANTIZED_CANDIDATES', 400))
+FILTERED_SEARCH_EF_FACTOR = int(os.getenv('FILTERED_SEARCH_EF_FACTOR', 4))
+FILTERED_SEARCH_ITERATIVE_SCAN = os.getenv('FILTERED_SEARCH_ITERATIVE_SCAN', 'off').lower()
+FILTERED_SEARCH_COUNT_CACHE_SIZE = int(os.getenv('FILTERED_SEARCH_COUNT_CACHE_SIZE', 1024))
+FILTERED_SEARCH_COUNT_TTL_SECONDS = float(os.getenv('FILTERED_SEARCH_COUNT_TTL_SECONDS', 300))
+HNSW_SESSION_EF_SEARCH = min(max(EF_SEARCH, QUANTIZED_CANDIDATES), 1000) \
+    if VECTOR_SEARCH_BACKEND == 'pgvector_binary' else EF_SEARCH
+PREPARED_STATEMENTS = os.getenv('PREPARED_STATEMENTS', 'true').lower() == 'true'
+PREPARED_STATEMENTS_PER_CONNECTION = int(os.getenv('PREPARED_STATEMENTS_PER_CONNECTION', 64))
+PG_JIT = os.getenv('PG_JIT', 'off').lower()
 
 
 class Enumerations():
@@ -19,23 +89,404 @@ class Enumerations():
     pattern_domain = r'https?://\S+|www\.\S+'
     pattern_page_numbers = r'\[\d+\]|\(p\.\s*\d+\)'
     pattern_more_space_line_removal = r'\s+'
-    pattern_punctuation_end_sen = r'([.!?])\1+'
     pattern_punctuation_lines_repeated = r'[-_*/]{2,}'
     non_printing_control_characters = r'[^\x00-\x7F]+'
     useless_symbols_and_signs = r'[^\w\s]'
 
     # SQL Queries
-    ef_search = f'SET hnsw.ef_search = {EF_SEARCH};'
+    hnsw_ef_search = EF_SEARCH
+    # the bit index returns at most ef_search rows, so pgvector_binary sessions start at the candidate count
+    hnsw_session_ef_search = HNSW_SESSION_EF_SEARCH
+    # applied once when a pooled connection opens (libpq options / asyncpg server_settings), never per request;
+    # JIT compilation only adds latency to millisecond index scans
+    session_settings = {'hnsw.ef_search': str(HNSW_SESSION_EF_SEARCH), 'jit': PG_JIT}
+    prepared_statements = PREPARED_STATEMENTS
+    # least recently used statements are DEALLOCATEd past this many on one connection
+    prepared_statements_per_connection = max(1, PREPARED_STATEMENTS_PER_CONNECTION)
+    # top_k is rounded up to one of these LIMITs (then multiples of the last) and the rows are cut back in Python,
+    # so a handful of statements covers every top_k
+    prepared_limit_steps = (10, 20, 50, 100, 200, 500, 1000)
 
+    # psycopg2 search statements are prepared once per pooled connection (ml.services.prepared_statements);
+    # LIMIT {top_k} (rounded up by PreparedStatements.limit) is part of the statement text so the cached generic plan keeps the HNSW scan
+    # the query vector is bound once (ml.services.pgvector_codec.QueryVector); ORDER BY the alias keeps the HNSW scan
     vector_service_query = """
-        SELECT
-            book_id,
-            1 - (embedding <=> %s::vector) AS similarity
-        FROM books
-        ORDER BY embedding <=> %s::vector
+        SELECT book_id, 1 - distance AS similarity
+        FROM (
+            SELECT book_id, embedding <=> %s AS distance
+            FROM books
+            ORDER BY distance
+            LIMIT {top_k}
+        ) knn
+        ORDER BY distance;
+    """
+
+    # KNN and metadata in one round trip; the CTE keeps the KNN order through the join
+    vector_metadata_query = """
+        WITH knn AS (
+            SELECT book_id, category, embedding <=> %s AS distance
+            FROM books
+            ORDER BY distance
+            LIMIT {top_k}
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+
+    # asyncpg variants; the vector parameter is sent in pgvector's binary format
+    vector_service_query_async = f"""
+        SELECT book_id, 1 - distance AS similarity
+        FROM (
+            SELECT book_id, embedding <=> $1::{EMBEDDING_STORAGE} AS distance
+            FROM books
+            ORDER BY distance
+            LIMIT $2
+        ) knn
+        ORDER BY distance;
+    """
+
+    vector_metadata_query_async = f"""
+        WITH knn AS (
+            SELECT book_id, category, embedding <=> $1::{EMBEDDING_STORAGE} AS distance
+            FROM books
+            ORDER BY distance
+            LIMIT $2
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+
+    ef_search_local_async = "SELECT set_config('hnsw.ef_search', $1, true);"
+
+    # partition fan-out: the same KNN against one partition ({partition}), the top-k lists are merged client-side
+    vector_partition_query = """
+        SELECT book_id, 1 - distance AS similarity
+        FROM (
+            SELECT book_id, embedding <=> %s AS distance
+            FROM {partition}
+            ORDER BY distance
+            LIMIT {top_k}
+        ) knn
+        ORDER BY distance;
+    """
+
+    vector_partition_metadata_query = """
+        WITH knn AS (
+            SELECT book_id, category, embedding <=> %s AS distance
+            FROM {partition}
+            ORDER BY distance
+            LIMIT {top_k}
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN {partition} b ON b.book_id = knn.book_id
+        ORDER BY knn.distance;
+    """
+
+    vector_partition_query_async = f"""
+        SELECT book_id, 1 - distance AS similarity
+        FROM (
+            SELECT book_id, embedding <=> $1::{EMBEDDING_STORAGE} AS distance
+            FROM {{partition}}
+            ORDER BY distance
+            LIMIT $2
+        ) knn
+        ORDER BY distance;
+    """
+
+    vector_partition_metadata_query_async = f"""
+        WITH knn AS (
+            SELECT book_id, category, embedding <=> $1::{EMBEDDING_STORAGE} AS distance
+            FROM {{partition}}
+            ORDER BY distance
+            LIMIT $2
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN {{partition}} b ON b.book_id = knn.book_id
+        ORDER BY knn.distance;
+    """
+
+    # batch search: one HNSW scan per query vector through LATERAL, all in a single statement
+    vector_metadata_batch_query = f"""
+        WITH queries AS (
+            SELECT position, embedding
+            FROM unnest(%s::{EMBEDDING_STORAGE}[]) WITH ORDINALITY AS q(embedding, position)
+        ),
+        knn AS (
+            SELECT queries.position, nearest.book_id, nearest.category, nearest.distance
+            FROM queries
+            CROSS JOIN LATERAL (
+                SELECT book_id, category, embedding <=> queries.embedding AS distance
+                FROM books
+                ORDER BY distance
+                LIMIT {{top_k}}
+            ) nearest
+        )
+        SELECT knn.position AS query_position, b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.position, knn.distance;
+    """
+
+    vector_metadata_batch_query_async = f"""
+        WITH queries AS (
+            SELECT position, embedding
+            FROM unnest($1::{EMBEDDING_STORAGE}[]) WITH ORDINALITY AS q(embedding, position)
+        ),
+        knn AS (
+            SELECT queries.position, nearest.book_id, nearest.category, nearest.distance
+            FROM queries
+            CROSS JOIN LATERAL (
+                SELECT book_id, category, embedding <=> queries.embedding AS distance
+                FROM books
+                ORDER BY distance
+                LIMIT $2
+            ) nearest
+        )
+        SELECT knn.position AS query_position, b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.position, knn.distance;
+    """
+
+    # two-stage search: Hamming distance over binary_quantize() picks candidates, full vectors rescore them
+    vector_service_binary_query = f"""
+        SELECT book_id, 1 - (embedding <=> %s) AS similarity
+        FROM (
+            SELECT book_id, embedding
+            FROM books
+            ORDER BY binary_quantize(embedding)::bit({EMBEDDING_STORAGE_DIMENSION}) <~> binary_quantize(%s::{EMBEDDING_STORAGE})
+            LIMIT %s
+        ) coarse
+        ORDER BY similarity DESC
         LIMIT %s;
     """
 
+    vector_metadata_binary_query = f"""
+        WITH coarse AS (
+            SELECT book_id, category, embedding
+            FROM books
+            ORDER BY binary_quantize(embedding)::bit({EMBEDDING_STORAGE_DIMENSION}) <~> binary_quantize(%s::{EMBEDDING_STORAGE})
+            LIMIT %s
+        ), knn AS (
+            SELECT book_id, category, embedding <=> %s AS distance
+            FROM coarse
+            ORDER BY distance
+            LIMIT %s
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+
+    vector_service_binary_query_async = f"""
+        SELECT book_id, 1 - (embedding <=> $1::{EMBEDDING_STORAGE}) AS similarity
+        FROM (
+            SELECT book_id, embedding
+            FROM books
+            ORDER BY binary_quantize(embedding)::bit({EMBEDDING_STORAGE_DIMENSION}) <~> binary_quantize($1::{EMBEDDING_STORAGE})
+            LIMIT $3
+        ) coarse
+        ORDER BY similarity DESC
+        LIMIT $2;
+    """
+
+    vector_metadata_binary_query_async = f"""
+        WITH coarse AS (
+            SELECT book_id, category, embedding
+            FROM books
+            ORDER BY binary_quantize(embedding)::bit({EMBEDDING_STORAGE_DIMENSION}) <~> binary_quantize($1::{EMBEDDING_STORAGE})
+            LIMIT $3
+        ), knn AS (
+            SELECT book_id, category, embedding <=> $1::{EMBEDDING_STORAGE} AS distance
+            FROM coarse
+            ORDER BY distance
+            LIMIT $2
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+    iterative_scan_local_async = "SELECT set_config('hnsw.iterative_scan', $1, true);"
+
+    # filtered search; {where} comes from ml.services.metadata_filter.MetadataFilter and stays inside the KNN scan
+    vector_metadata_filtered_query = """
+        WITH knn AS (
+            SELECT book_id, category, embedding <=> %(query)s AS distance
+            FROM books
+            WHERE {where}
+            ORDER BY distance
+            LIMIT {top_k}
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+
+    # exact fallback when the filter leaves fewer than top_k rows in the HNSW candidate list
+    vector_metadata_filtered_exact_query = """
+        WITH candidates AS MATERIALIZED (
+            SELECT book_id, category, embedding
+            FROM books
+            WHERE {where}
+        ), knn AS (
+            SELECT book_id, category, embedding <=> %(query)s AS distance
+            FROM candidates
+            ORDER BY distance
+            LIMIT {top_k}
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+
+    vector_metadata_filtered_query_async = f"""
+        WITH knn AS (
+            SELECT book_id, category, embedding <=> $1::{EMBEDDING_STORAGE} AS distance
+            FROM books
+            WHERE {{where}}
+            ORDER BY distance
+            LIMIT $2
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+
+    # how many rows the filter matches, counted up to top_k
+    vector_metadata_filtered_count_query = """
+        SELECT count(*) AS matches
+        FROM (
+            SELECT 1
+            FROM books
+            WHERE {where}
+            LIMIT {top_k}
+        ) matched;
+    """
+
+    vector_metadata_filtered_count_query_async = """
+        SELECT count(*) AS matches
+        FROM (
+            SELECT 1
+            FROM books
+            WHERE {where}
+            LIMIT $1
+        ) matched;
+    """
+
+    vector_metadata_filtered_exact_query_async = f"""
+        WITH candidates AS MATERIALIZED (
+            SELECT book_id, category, embedding
+            FROM books
+            WHERE {{where}}
+        ), knn AS (
+            SELECT book_id, category, embedding <=> $1::{EMBEDDING_STORAGE} AS distance
+            FROM candidates
+            ORDER BY distance
+            LIMIT $2
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - knn.distance AS similarity
+        FROM knn
+        JOIN books b ON b.book_id = knn.book_id AND b.category = knn.category
+        ORDER BY knn.distance;
+    """
+
+    # full-text retriever for hybrid search over the generated search_vector column (GIN index);
+    # similarity is the cosine of every hit so lexical-only books still carry the reranker feature
+    lexical_metadata_query = f"""
+        WITH lexical AS (
+            SELECT book_id, category, ts_rank_cd(search_vector, query) AS rank
+            FROM books, websearch_to_tsquery('english', %s) query
+            WHERE search_vector @@ query
+            ORDER BY rank DESC, book_id
+            LIMIT %s
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - (b.embedding <=> %s) AS similarity
+        FROM lexical
+        JOIN books b ON b.book_id = lexical.book_id AND b.category = lexical.category
+        ORDER BY lexical.rank DESC, lexical.book_id;
+    """
+
+    lexical_metadata_query_async = f"""
+        WITH lexical AS (
+            SELECT book_id, category, ts_rank_cd(search_vector, query) AS rank
+            FROM books, websearch_to_tsquery('english', $1) query
+            WHERE search_vector @@ query
+            ORDER BY rank DESC, book_id
+            LIMIT $2
+        )
+        SELECT b.book_id, b.name_cleaned AS name, b.authors, b.publisher,
+        b.description_cleaned AS description, b.rating, b.publishyear, b.weighted_rating,
+        b.counts_of_review_scaled, b.tech_score_scaled, b.publishyear_scaled,
+        b.average_low_rating, b.average_high_rating,
+        1 - (b.embedding <=> $3::{EMBEDDING_STORAGE}) AS similarity
+        FROM lexical
+        JOIN books b ON b.book_id = lexical.book_id AND b.category = lexical.category
+        ORDER BY lexical.rank DESC, lexical.book_id;
+    """
+
     metadata_service_query = """
         SELECT book_id, name_cleaned AS name, authors, publisher,
         description_cleaned AS description, rating, publishyear, weighted_rating,
@@ -45,6 +496,18 @@ class Enumerations():
         WHERE book_id = ANY(%s::int[])
     """
 
+    metadata_service_query_async = """
+        SELECT book_id, name_cleaned AS name, authors, publisher,
+        description_cleaned AS description, rating, publishyear, weighted_rating,
+        counts_of_review_scaled, tech_score_scaled, publishyear_scaled,
+        average_low_rating, average_high_rating
+        FROM books
+        WHERE book_id = ANY($1::int[])
+    """
+
+    # bumped by ml.pipeline.v1.ingest after every load, cached book rows of older versions are dropped
+    catalog_version_query = "SELECT version FROM catalog_version;"
+
     # books
     top_k = 100
     top_k_rerank = 50
@@ -60,3 +523,106 @@ class Enumerations():
     # Connections
     min_connections = MIN_CONNECTIONS
     max_connections = MAX_CONNECTIONS
+
+    # Read replicas: unreachable replicas are skipped for replica_eject_seconds, reads fall back to the primary
+    replica_eject_seconds = REPLICA_EJECT_SECONDS
+    replica_connect_timeout = REPLICA_CONNECT_TIMEOUT
+
+    # Embedding model
+    embedding_model_name = EMBEDDING_MODEL_NAME
+    embedding_backend = EMBEDDING_BACKEND
+    embedding_dimension = EMBEDDING_DIMENSION
+    embedding_max_seq_length = EMBEDDING_MAX_SEQ_LENGTH
+    embedding_storage = EMBEDDING_STORAGE
+    embedding_storage_dimension = EMBEDDING_STORAGE_DIMENSION
+    embedding_storage_type = f'{EMBEDDING_STORAGE}({EMBEDDING_STORAGE_DIMENSION})'
+    embedding_opclass = f'{EMBEDDING_STORAGE}_cosine_ops'
+    embedding_projection = EMBEDDING_PROJECTION
+    embedding_pca_path = EMBEDDING_PCA_PATH
+    onnx_model_dir = ONNX_MODEL_DIR
+    onnx_quantized = ONNX_QUANTIZED
+    onnx_intra_op_threads = ONNX_INTRA_OP_THREADS
+
+    # Process-pool embedding workers (0 = encode in the calling process)
+    embedding_workers = EMBEDDING_WORKERS
+    embedding_worker_threads = EMBEDDING_WORKER_THREADS
+    embedding_worker_timeout = EMBEDDING_WORKER_TIMEOUT
+
+    # Bulk corpus ingestion
+    ingest_csv_path = INGEST_CSV_PATH
+    ingest_checkpoint_path = INGEST_CHECKPOINT_PATH
+    ingest_chunk_size = INGEST_CHUNK_SIZE
+    ingest_encode_batch_size = INGEST_ENCODE_BATCH_SIZE
+    ingest_workers = INGEST_WORKERS
+    ingest_min_votes_quantile = INGEST_MIN_VOTES_QUANTILE
+    ingest_tech_score_cap = INGEST_TECH_SCORE_CAP
+    ingest_maintenance_work_mem = INGEST_MAINTENANCE_WORK_MEM
+    ingest_index_workers = INGEST_INDEX_WORKERS
+
+    # Startup warm-up
+    warmup_encodes = WARMUP_ENCODES
+    warmup_connections = WARMUP_CONNECTIONS
+
+    # Query embedding cache
+    embed_cache = EMBED_CACHE
+    embed_cache_size = EMBED_CACHE_SIZE
+    embed_cache_redis = EMBED_CACHE_REDIS
+    embed_cache_prefix = EMBED_CACHE_PREFIX
+    embed_cache_ttl = EMBED_CACHE_TTL
+    embed_cache_redis_timeout = EMBED_CACHE_REDIS_TIMEOUT
+    embed_cache_redis_backoff = EMBED_CACHE_REDIS_BACKOFF
+    embed_cache_path = EMBED_CACHE_PATH
+
+    # In-process book metadata cache (LRU + TTL, dropped in bulk when catalog_version changes)
+    metadata_cache = METADATA_CACHE
+    metadata_cache_size = METADATA_CACHE_SIZE
+    metadata_cache_ttl = METADATA_CACHE_TTL_SECONDS
+    metadata_cache_version_check = METADATA_CACHE_VERSION_CHECK_SECONDS
+    # longest wait between reads of a catalog_version that keeps failing (the interval doubles per failure)
+    metadata_cache_version_backoff = METADATA_CACHE_VERSION_BACKOFF_SECONDS
+
+    # Columnar catalog snapshot: rerank features (+ display fields) memory-mapped from .npy files,
+    # exported after every ingestion and re-read when the CURRENT pointer moves
+    catalog_snapshot = CATALOG_SNAPSHOT
+    catalog_snapshot_dir = CATALOG_SNAPSHOT_DIR
+    catalog_snapshot_display = CATALOG_SNAPSHOT_DISPLAY
+    catalog_snapshot_keep = CATALOG_SNAPSHOT_KEEP
+    catalog_snapshot_refresh = CATALOG_SNAPSHOT_REFRESH_SECONDS
+
+    # Embedding micro-batching
+    embed_batching = EMBED_BATCHING
+    embed_batch_max_size = EMBED_BATCH_MAX_SIZE
+    embed_batch_max_wait = EMBED_BATCH_MAX_WAIT_MS / 1000
+
+    # asyncpg data path for search (false = psycopg2 pool in a thread)
+    ml_async_db = ML_ASYNC_DB
+
+    # Vector search backend: pgvector | mmap (exact, exported snapshot) | hnsw (in-process graph over the snapshot)
+    # | binary (in-process binary codes + rescoring) | pgvector_binary (bit index + rescoring, pgvector >= 0.7)
+    # | pgvector_partitioned (one HNSW scan per category partition, merged top-k)
+    vector_search_backend = VECTOR_SEARCH_BACKEND
+    vector_snapshot_dir = VECTOR_SNAPSHOT_DIR
+    vector_snapshot_keep = VECTOR_SNAPSHOT_KEEP
+    vector_snapshot_refresh = VECTOR_SNAPSHOT_REFRESH_SECONDS
+    hnsw_local_m = HNSW_LOCAL_M
+    hnsw_local_ef_construction = HNSW_LOCAL_EF_CONSTRUCTION
+    hnsw_local_ef_search = HNSW_LOCAL_EF_SEARCH
+    quantized_candidates = QUANTIZED_CANDIDATES
+    partition_search_workers = PARTITION_SEARCH_WORKERS
+    # pooled connections one partitioned search holds at a time, at most a quarter of the pool
+    # so four searches can fan out at once without exhausting it
+    partition_search_connections = max(1, min(PARTITION_SEARCH_CONNECTIONS, MAX_CONNECTIONS // 4))
+
+    # Hybrid search: full-text and vector rankings fused with reciprocal-rank fusion (1 / (k + rank))
+    hybrid_search = HYBRID_SEARCH
+    hybrid_rrf_k = HYBRID_RRF_K
+
+    # Filtered search: ef_search is raised to top_k * factor (pgvector caps it at 1000);
+    # iterative scan is off | relaxed_order | strict_order and needs pgvector >= 0.8
+    hnsw_max_ef_search = 1000
+    filtered_search_ef_factor = FILTERED_SEARCH_EF_FACTOR
+    filtered_search_iterative_scan = FILTERED_SEARCH_ITERATIVE_SCAN
+    # a short HNSW result only falls back to the exact scan when the filter matches more rows than it returned;
+    # the (top_k-bounded) match count is cached per filter
+    filtered_search_count_cache_size = FILTERED_SEARCH_COUNT_CACHE_SIZE
+    filtered_search_count_ttl = FILTERED_SEARCH_COUNT_TTL_SECONDS
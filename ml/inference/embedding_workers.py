@@ -0,0 +1,102 @@
+import os
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Tuple
+from ml.Enum.Enumerations import Enumerations
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+_worker_model = None
+
+
+def _init_worker(threads: int):
+    global _worker_model
+
+    if Enumerations.embedding_backend == 'onnx':
+        Enumerations.onnx_intra_op_threads = threads
+    else:
+        import torch
+        torch.set_num_threads(threads)
+
+    from ml.models.v1.embedder import Model
+    _worker_model = Model.model()
+
+    if _worker_model is None:
+        raise RuntimeError('embedding model failed to load in worker')
+
+    logger.info(f'EmbeddingWorkerPool: worker {os.getpid()} ready with {threads} threads')
+
+
+def _encode_in_worker(texts: List[str]) -> Tuple[bytes, Tuple[int, ...]]:
+    vectors = np.asarray(_worker_model.encode(texts), dtype=np.float32)
+    return vectors.tobytes(), vectors.shape
+
+
+class EmbeddingWorkerPool:
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return Enumerations.embedding_workers > 0
+
+    @staticmethod
+    def _threads_per_worker() -> int:
+        if Enumerations.embedding_worker_threads > 0:
+            return Enumerations.embedding_worker_threads
+        return max(1, (os.cpu_count() or 1) // Enumerations.embedding_workers)
+
+    @classmethod
+    def get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    threads = cls._threads_per_worker()
+                    cls._executor = ProcessPoolExecutor(
+                        max_workers=Enumerations.embedding_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                        initargs=(threads,)
+                    )
+                    logger.info(
+                        f'EmbeddingWorkerPool: started {Enumerations.embedding_workers} '
+                        f'workers with {threads} threads each'
+                    )
+        return cls._executor
+
+    @classmethod
+    def encode(cls, texts: List[str]) -> np.ndarray:
+        try:
+            future = cls.get_executor().submit(_encode_in_worker, list(texts))
+            buffer, shape = future.result(timeout=Enumerations.embedding_worker_timeout)
+        except BrokenProcessPool:
+            logger.error('EmbeddingWorkerPool: worker pool broken, restarting on next call')
+            cls.shutdown(wait=False)
+            raise
+
+        return np.frombuffer(buffer, dtype=np.float32).reshape(shape)
+
+    @classmethod
+    def warm_up(cls) -> int:
+        executor = cls.get_executor()
+        futures = [
+            executor.submit(_encode_in_worker, ['warm up query'])
+            for _ in range(Enumerations.embedding_workers)
+        ]
+
+        for future in futures:
+            future.result()
+
+        return len(futures)
+
+    @classmethod
+    def shutdown(cls, wait: bool = True):
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=wait, cancel_futures=True)
+                cls._executor = None
+                logger.info('EmbeddingWorkerPool: workers stopped')
@@ -1,19 +1,216 @@
+import asyncio
+from concurrent.futures import Future
 from backend.app.core.logging import get_logger
 from ml.Enum.Enumerations import Enumerations
 from ml.services.vector_service import VectorService
 from ml.services.metadata_service import MetadataService
+from ml.services.metadata_filter import MetadataFilter
+from ml.services.lexical_service import LexicalService
+from ml.reranking.fusion import RankFusion
 from ml.pipeline.v1.embed import Embedder
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
 
 logger = get_logger(__name__, system_type='ml')
 
 
 class Search:
+    @staticmethod
+    def _attach_similarity(
+        vector_results: List[Dict[str, Any]],
+        metadata_results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        similarity_map = {
+            item["book_id"]: item["similarity"]
+            for item in vector_results
+        }
+
+        for book in metadata_results:
+            book["similarity"] = similarity_map.get(book["book_id"], 0.0)
+
+        # ANY() returns rows in table order, so restore the KNN order
+        metadata_results.sort(key=lambda book: book["similarity"], reverse=True)
+        return metadata_results
+
+    @staticmethod
+    def _attach_metadata_batch(
+        vector_results: List[List[Dict[str, Any]]],
+        metadata_results: List[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        metadata = {book["book_id"]: book for book in metadata_results}
+
+        # a book can match several queries, so every query gets its own copies
+        return [
+            Search._attach_similarity(
+                results,
+                [dict(metadata[item["book_id"]]) for item in results if item["book_id"] in metadata]
+            )
+            for results in vector_results
+        ]
+
+    @staticmethod
+    def _batch_book_ids(vector_results: List[List[Dict[str, Any]]]) -> List[int]:
+        return list({item["book_id"] for results in vector_results for item in results})
+
+    @staticmethod
+    def _hybrid(filters: Dict[str, Any]) -> bool:
+        return Enumerations.hybrid_search and not filters
+
+    @staticmethod
+    def _submit_lexical(
+        user_text: str,
+        query_embedding: Any,
+        top_k: int,
+        filters: Dict[str, Any]
+    ) -> Optional[Future]:
+        if not Search._hybrid(filters):
+            return None
+
+        # the lexical query runs on a worker thread and its own pool connection while the vector query runs here
+        return VectorService.get_executor().submit(
+            LexicalService.search_books_with_metadata, user_text, query_embedding, top_k
+        )
+
+    @staticmethod
+    def _retrieve(
+        query_embedding: Any,
+        top_k: int,
+        filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        # the local indexes hold no metadata, so filtered searches always run in pgvector
+        if filters or Enumerations.vector_search_backend not in VectorService.LOCAL_BACKENDS:
+            return VectorService.search_books_with_metadata(
+                query_embedding=query_embedding,
+                top_k=top_k,
+                filters=filters
+            )
+
+        vector_results = VectorService.search_similar_books(
+            query_embedding=query_embedding,
+            top_k=top_k
+        )
+
+        if not vector_results:
+            return []
+
+        book_ids = [item["book_id"] for item in vector_results]
+
+        return Search._attach_similarity(
+            vector_results,
+            MetadataService.get_books_metadata(book_ids)
+        )
+
+    @staticmethod
+    async def _retrieve_async(
+        query_embedding: Any,
+        top_k: int,
+        filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        if filters or Enumerations.vector_search_backend not in VectorService.LOCAL_BACKENDS:
+            return await VectorService.search_books_with_metadata_async(
+                query_embedding=query_embedding,
+                top_k=top_k,
+                filters=filters
+            )
+
+        vector_results = await VectorService.search_similar_books_async(
+            query_embedding=query_embedding,
+            top_k=top_k
+        )
+
+        if not vector_results:
+            return []
+
+        book_ids = [item["book_id"] for item in vector_results]
+
+        return Search._attach_similarity(
+            vector_results,
+            await MetadataService.get_books_metadata_async(book_ids)
+        )
+
+    @staticmethod
+    def _ranked(books: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{"book_id": book["book_id"], "similarity": book.get("similarity", 0.0)} for book in books]
+
+    @staticmethod
+    def rank(
+        user_text: str,
+        top_k: int = Enumerations.top_k,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        # book ids and similarities only; callers hydrate the slice they display
+        filters = MetadataFilter.normalize(filters)
+
+        try:
+            embed_result = Embedder.embedder(user_text)
+            query_embedding = embed_result.get("name_embeddings")
+
+            if query_embedding is None or len(query_embedding) == 0:
+                logger.warning("Search: empty embedding returned")
+                return []
+
+            lexical = Search._submit_lexical(user_text, query_embedding, top_k, filters)
+
+            # metadata filters only run joined to books
+            if filters:
+                books = VectorService.search_books_with_metadata(query_embedding=query_embedding, top_k=top_k, filters=filters)
+            else:
+                books = VectorService.search_similar_books(query_embedding=query_embedding, top_k=top_k)
+
+            if lexical is not None:
+                books = RankFusion.reciprocal_rank([books, lexical.result()], top_k=top_k)
+
+            logger.info(f"Search: ranked {len(books)} books")
+            return Search._ranked(books)
+
+        except Exception as e:
+            logger.error(f"Search rank error: {e}", exc_info=True)
+            return []
+
+    @staticmethod
+    async def rank_async(
+        user_text: str,
+        top_k: int = Enumerations.top_k,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        filters = MetadataFilter.normalize(filters)
+
+        try:
+            embed_result = await asyncio.to_thread(Embedder.embedder, user_text)
+            query_embedding = embed_result.get("name_embeddings")
+
+            if query_embedding is None or len(query_embedding) == 0:
+                logger.warning("Search: empty embedding returned")
+                return []
+
+            if filters:
+                retrieve = VectorService.search_books_with_metadata_async(query_embedding=query_embedding, top_k=top_k, filters=filters)
+            else:
+                retrieve = VectorService.search_similar_books_async(query_embedding=query_embedding, top_k=top_k)
+
+            if Search._hybrid(filters):
+                books, lexical = await asyncio.gather(
+                    retrieve,
+                    LexicalService.search_books_with_metadata_async(user_text, query_embedding, top_k)
+                )
+                books = RankFusion.reciprocal_rank([books, lexical], top_k=top_k)
+            else:
+                books = await retrieve
+
+            logger.info(f"Search: ranked {len(books)} books")
+            return Search._ranked(books)
+
+        except Exception as e:
+            logger.error(f"Search rank error: {e}", exc_info=True)
+            return []
+
     @staticmethod
     def search(
         user_text: str,
-        top_k: int = Enumerations.top_k
+        top_k: int = Enumerations.top_k,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
+        filters = MetadataFilter.normalize(filters)
+
         try:
             embed_result = Embedder.embedder(user_text)
             query_embedding = embed_result.get("name_embeddings")
@@ -22,30 +219,126 @@ class Search:
                 logger.warning("Search: empty embedding returned")
                 return []
 
-            vector_results = VectorService.search_similar_books(
-                query_embedding=query_embedding,
-                top_k=top_k
-            )
+            lexical = Search._submit_lexical(user_text, query_embedding, top_k, filters)
+            books = Search._retrieve(query_embedding, top_k, filters)
 
-            if not vector_results:
+            if lexical is not None:
+                books = RankFusion.reciprocal_rank([books, lexical.result()], top_k=top_k)
+
+            if not books:
                 logger.warning("Search: no vector results found")
                 return []
 
-            book_ids = [item["book_id"] for item in vector_results]
+            logger.info(f"Search: returning {len(books)} books")
+            return books
 
-            metadata_results = MetadataService.get_books_metadata(book_ids)
+        except Exception as e:
+            logger.error(f"Search error: {e}", exc_info=True)
+            return []
 
-            similarity_map = {
-                item["book_id"]: item["similarity"]
-                for item in vector_results
-            }
+    @staticmethod
+    async def search_async(
+        user_text: str,
+        top_k: int = Enumerations.top_k,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        filters = MetadataFilter.normalize(filters)
 
-            for book in metadata_results:
-                book["similarity"] = similarity_map.get(book["book_id"], 0.0)
+        try:
+            # only the CPU-bound embedding leaves the event loop
+            embed_result = await asyncio.to_thread(Embedder.embedder, user_text)
+            query_embedding = embed_result.get("name_embeddings")
+
+            if query_embedding is None or len(query_embedding) == 0:
+                logger.warning("Search: empty embedding returned")
+                return []
+
+            if Search._hybrid(filters):
+                # the two retrievers run at the same time on separate pool connections
+                books, lexical = await asyncio.gather(
+                    Search._retrieve_async(query_embedding, top_k, filters),
+                    LexicalService.search_books_with_metadata_async(user_text, query_embedding, top_k)
+                )
+                books = RankFusion.reciprocal_rank([books, lexical], top_k=top_k)
+            else:
+                books = await Search._retrieve_async(query_embedding, top_k, filters)
 
-            logger.info(f"Search: returning {len(metadata_results)} books")
-            return metadata_results
+            if not books:
+                logger.warning("Search: no vector results found")
+                return []
+
+            logger.info(f"Search: returning {len(books)} books")
+            return books
 
         except Exception as e:
             logger.error(f"Search error: {e}", exc_info=True)
             return []
+
+    @staticmethod
+    def search_batch(
+        user_texts: List[str],
+        top_k: int = Enumerations.top_k
+    ) -> List[List[Dict[str, Any]]]:
+        try:
+            query_embeddings = Embedder.embed_batch(user_texts).get("name_embeddings")
+
+            if query_embeddings is None or len(query_embeddings) != len(user_texts):
+                logger.warning("Search: batch embedding failed")
+                return [[] for _ in user_texts]
+
+            if Enumerations.vector_search_backend not in VectorService.LOCAL_BACKENDS:
+                books = VectorService.search_books_with_metadata_batch(
+                    query_embeddings=query_embeddings,
+                    top_k=top_k
+                )
+            else:
+                vector_results = [
+                    VectorService.search_similar_books(query_embedding=embedding, top_k=top_k)
+                    for embedding in query_embeddings
+                ]
+                books = Search._attach_metadata_batch(
+                    vector_results,
+                    MetadataService.get_books_metadata(Search._batch_book_ids(vector_results))
+                )
+
+            logger.info(f"Search: returning results for {len(books)} queries")
+            return books
+
+        except Exception as e:
+            logger.error(f"Search batch error: {e}", exc_info=True)
+            return [[] for _ in user_texts]
+
+    @staticmethod
+    async def search_batch_async(
+        user_texts: List[str],
+        top_k: int = Enumerations.top_k
+    ) -> List[List[Dict[str, Any]]]:
+        try:
+            embed_result = await asyncio.to_thread(Embedder.embed_batch, user_texts)
+            query_embeddings = embed_result.get("name_embeddings")
+
+            if query_embeddings is None or len(query_embeddings) != len(user_texts):
+                logger.warning("Search: batch embedding failed")
+                return [[] for _ in user_texts]
+
+            if Enumerations.vector_search_backend not in VectorService.LOCAL_BACKENDS:
+                books = await VectorService.search_books_with_metadata_batch_async(
+                    query_embeddings=query_embeddings,
+                    top_k=top_k
+                )
+            else:
+                vector_results = await asyncio.gather(*(
+                    VectorService.search_similar_books_async(query_embedding=embedding, top_k=top_k)
+                    for embedding in query_embeddings
+                ))
+                books = Search._attach_metadata_batch(
+                    vector_results,
+                    await MetadataService.get_books_metadata_async(Search._batch_book_ids(vector_results))
+                )
+
+            logger.info(f"Search: returning results for {len(books)} queries")
+            return books
+
+        except Exception as e:
+            logger.error(f"Search batch error: {e}", exc_info=True)
+            return [[] for _ in user_texts]
@@ -1,19 +1,49 @@
-from sentence_transformers import SentenceTransformer
+from ml.Enum.Enumerations import Enumerations
 from backend.app.core.logging import get_logger
 
 logger = get_logger(__name__, system_type='ml')
 
+# imported lazily so the ONNX backend never pulls torch into the worker
+SentenceTransformer = None
+
+
+def _sentence_transformer():
+    global SentenceTransformer
+    if SentenceTransformer is None:
+        from sentence_transformers import SentenceTransformer as _SentenceTransformer
+        SentenceTransformer = _SentenceTransformer
+    return SentenceTransformer
+
 
 class Model():
     _model = None
 
+    @staticmethod
+    def _load():
+        if Enumerations.embedding_backend == 'onnx':
+            from ml.models.v1.onnx_embedder import OnnxEmbedder
+            return OnnxEmbedder()
+
+        return _sentence_transformer()(Enumerations.embedding_model_name)
+
     @staticmethod
     def model():
         if Model._model is None:
             try:
-                Model._model = SentenceTransformer('all-MiniLM-L6-v2')
-                logger.info('loading successfully')
+                Model._model = Model._load()
+                logger.info(f'loading successfully ({Enumerations.embedding_backend} backend)')
             except Exception as e:
                 logger.error(f'error: {e}')
 
         return Model._model
+
+    @staticmethod
+    def warm_up(encodes: int = Enumerations.warmup_encodes) -> int:
+        model = Model.model()
+        if model is None:
+            raise RuntimeError('embedding model failed to load')
+
+        for i in range(encodes):
+            model.encode(['warm up query'] * (i + 1))
+
+        return encodes
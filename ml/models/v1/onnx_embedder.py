@@ -0,0 +1,229 @@
+import os
+import time
+import argparse
+import numpy as np
+from typing import List, Union
+from ml.Enum.Enumerations import Enumerations
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class OnnxEmbedder:
+    MODEL_FILE = 'model.onnx'
+    QUANTIZED_MODEL_FILE = 'model_quantized.onnx'
+    TOKENIZER_FILE = 'tokenizer.json'
+
+    def __init__(
+        self,
+        model_dir: str = Enumerations.onnx_model_dir,
+        quantized: bool = Enumerations.onnx_quantized,
+        max_seq_length: int = Enumerations.embedding_max_seq_length
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = self.QUANTIZED_MODEL_FILE if quantized else self.MODEL_FILE
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, self.TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if Enumerations.onnx_intra_op_threads > 0:
+            options.intra_op_num_threads = Enumerations.onnx_intra_op_threads
+
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            sess_options=options,
+            providers=['CPUExecutionProvider']
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+        logger.info(f'OnnxEmbedder: loaded {model_file} from {model_dir}')
+
+    @staticmethod
+    def _mean_pooling(
+        token_embeddings: np.ndarray,
+        attention_mask: np.ndarray
+    ) -> np.ndarray:
+        mask = attention_mask[..., np.newaxis].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return summed / counts
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.clip(norms, 1e-12, None)
+
+    def _encode_batch(self, sentences: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(sentences)
+
+        feeds = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        return self._mean_pooling(token_embeddings, feeds['attention_mask'])
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        if not sentences:
+            return np.empty((0, Enumerations.embedding_dimension), dtype=np.float32)
+
+        batches = [
+            self._encode_batch(sentences[start:start + batch_size])
+            for start in range(0, len(sentences), batch_size)
+        ]
+        embeddings = np.vstack(batches).astype(np.float32, copy=False)
+
+        if normalize_embeddings:
+            embeddings = self._normalize(embeddings)
+
+        return embeddings[0] if single else embeddings
+
+    @staticmethod
+    def export(
+        model_name: str = Enumerations.embedding_model_name,
+        output_dir: str = Enumerations.onnx_model_dir,
+        quantize: bool = True
+    ) -> str:
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        if '/' not in model_name and not os.path.isdir(model_name):
+            model_name = f'sentence-transformers/{model_name}'
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name)
+        model.eval()
+
+        class _Encoder(torch.nn.Module):
+            def __init__(self, transformer):
+                super().__init__()
+                self.transformer = transformer
+
+            def forward(self, input_ids, attention_mask, token_type_ids):
+                return self.transformer(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    token_type_ids=token_type_ids
+                ).last_hidden_state
+
+        sample = tokenizer(['export sample'], return_tensors='pt')
+        input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+        model_path = os.path.join(output_dir, OnnxEmbedder.MODEL_FILE)
+        with torch.no_grad():
+            torch.onnx.export(
+                _Encoder(model),
+                tuple(sample[name] for name in input_names),
+                model_path,
+                input_names=input_names,
+                output_names=['last_hidden_state'],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+                dynamo=False
+            )
+
+        tokenizer.backend_tokenizer.save(os.path.join(output_dir, OnnxEmbedder.TOKENIZER_FILE))
+        logger.info(f'OnnxEmbedder: exported {model_name} to {model_path}')
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantized_path = os.path.join(output_dir, OnnxEmbedder.QUANTIZED_MODEL_FILE)
+            quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+            logger.info(f'OnnxEmbedder: int8 quantized model saved to {quantized_path}')
+
+        return output_dir
+
+
+def compare_backends(
+    sentences: List[str],
+    model_dir: str = Enumerations.onnx_model_dir,
+    quantized: bool = Enumerations.onnx_quantized,
+    runs: int = 50
+) -> dict:
+    from sentence_transformers import SentenceTransformer
+
+    torch_model = SentenceTransformer(Enumerations.embedding_model_name)
+    onnx_model = OnnxEmbedder(model_dir=model_dir, quantized=quantized)
+
+    torch_vectors = torch_model.encode(sentences, normalize_embeddings=True)
+    onnx_vectors = onnx_model.encode(sentences, normalize_embeddings=True)
+    cosine = np.sum(torch_vectors * onnx_vectors, axis=1)
+
+    def latency(model) -> List[float]:
+        timings = []
+        for i in range(runs):
+            start = time.perf_counter()
+            model.encode([sentences[i % len(sentences)]])
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    torch_ms = latency(torch_model)
+    onnx_ms = latency(onnx_model)
+
+    return {
+        'cosine_min': float(cosine.min()),
+        'cosine_mean': float(cosine.mean()),
+        'torch_p50_ms': float(np.percentile(torch_ms, 50)),
+        'torch_p95_ms': float(np.percentile(torch_ms, 95)),
+        'onnx_p50_ms': float(np.percentile(onnx_ms, 50)),
+        'onnx_p95_ms': float(np.percentile(onnx_ms, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export and benchmark the ONNX embedding backend')
+    parser.add_argument('command', choices=['export', 'compare'])
+    parser.add_argument('--model-dir', default=Enumerations.onnx_model_dir)
+    parser.add_argument('--no-quantize', action='store_true')
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        OnnxEmbedder.export(output_dir=args.model_dir, quantize=not args.no_quantize)
+        print(f'Exported ONNX model to {args.model_dir}')
+        return
+
+    sentences = [
+        'deep learning with python',
+        'clean code',
+        'designing data intensive applications',
+        'kubernetes in action',
+        'introduction to algorithms',
+        'rust programming language',
+    ]
+    report = compare_backends(
+        sentences,
+        model_dir=args.model_dir,
+        quantized=not args.no_quantize,
+        runs=args.runs
+    )
+
+    for key, value in report.items():
+        print(f'{key}: {value:.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import os
+import argparse
+import numpy as np
+from typing import Any, Dict, List, Optional
+from ml.Enum.Enumerations import Enumerations
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class EmbeddingProjection:
+    _pca = None
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+    @staticmethod
+    def fit_pca(vectors: np.ndarray, dimension: int) -> Dict[str, np.ndarray]:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        mean = vectors.mean(axis=0)
+        _, _, components = np.linalg.svd(vectors - mean, full_matrices=False)
+        return {'mean': mean, 'components': components[:dimension].astype(np.float32)}
+
+    @staticmethod
+    def save_pca(pca: Dict[str, np.ndarray], path: str = Enumerations.embedding_pca_path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(path, mean=pca['mean'], components=pca['components'])
+        logger.info(f"EmbeddingProjection: saved PCA ({pca['components'].shape[0]} dims) to {path}")
+
+    @classmethod
+    def load_pca(cls, path: str = Enumerations.embedding_pca_path) -> Dict[str, np.ndarray]:
+        if cls._pca is None:
+            with np.load(path) as data:
+                cls._pca = {'mean': data['mean'], 'components': data['components']}
+        return cls._pca
+
+    @staticmethod
+    def apply(
+        vectors: Any,
+        mode: str,
+        dimension: int,
+        pca: Optional[Dict[str, np.ndarray]] = None
+    ) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        if mode == 'truncate':
+            vectors = vectors[..., :dimension]
+        elif mode == 'pca':
+            vectors = (vectors - pca['mean']) @ pca['components'][:dimension].T
+        elif mode != 'none':
+            raise ValueError(f'unknown embedding projection: {mode}')
+
+        return EmbeddingProjection._normalize(vectors).astype(np.float32, copy=False)
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return Enumerations.embedding_projection != 'none'
+
+    @classmethod
+    def project(cls, vectors: Any) -> np.ndarray:
+        if not cls.enabled():
+            return np.asarray(vectors, dtype=np.float32)
+
+        pca = cls.load_pca() if Enumerations.embedding_projection == 'pca' else None
+        return cls.apply(
+            vectors,
+            Enumerations.embedding_projection,
+            Enumerations.embedding_storage_dimension,
+            pca
+        )
+
+
+def _fetch_embeddings(limit: int) -> np.ndarray:
+    from pgvector.psycopg2 import register_vector
+    from ml.services.postgres_pool import MLPostgresConnectionPool
+
+    with MLPostgresConnectionPool.get_connection() as conn:
+        register_vector(conn)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                'SELECT embedding::vector FROM books WHERE embedding IS NOT NULL ORDER BY random() LIMIT %s;',
+                (limit,)
+            )
+            rows = cursor.fetchall()
+
+    vectors = [row[0].to_numpy() if hasattr(row[0], 'to_numpy') else row[0] for row in rows]
+    return EmbeddingProjection._normalize(np.vstack(vectors).astype(np.float32))
+
+
+def recall_report(
+    vectors: np.ndarray,
+    dimensions: List[int],
+    queries: int = 200,
+    k: int = 10,
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    vectors = EmbeddingProjection._normalize(np.asarray(vectors, dtype=np.float32))
+    query_ids = rng.choice(len(vectors), size=min(queries, len(vectors)), replace=False)
+    k = min(k, len(vectors) - 1)
+
+    def top_k(matrix: np.ndarray, query_matrix: np.ndarray) -> np.ndarray:
+        scores = query_matrix @ matrix.T
+        scores[np.arange(len(query_ids)), query_ids] = -np.inf
+        return np.argpartition(-scores, k, axis=1)[:, :k]
+
+    truth = top_k(vectors, vectors[query_ids])
+    full_dimension = vectors.shape[1]
+    report = []
+
+    for mode in ('truncate', 'pca'):
+        for dimension in dimensions:
+            if mode == 'pca' and dimension > min(vectors.shape):
+                continue
+
+            pca = EmbeddingProjection.fit_pca(vectors, dimension) if mode == 'pca' else None
+            projected = EmbeddingProjection.apply(vectors, mode, dimension, pca)
+
+            for storage, bytes_per_value in (('vector', 4), ('halfvec', 2)):
+                stored = projected if storage == 'vector' else projected.astype(np.float16).astype(np.float32)
+                found = top_k(stored, stored[query_ids])
+                recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(truth, found)])
+
+                report.append({
+                    'projection': 'none' if mode == 'truncate' and dimension == full_dimension else mode,
+                    'dimension': dimension,
+                    'storage': storage,
+                    'bytes_per_vector': dimension * bytes_per_value + 8,
+                    f'recall@{k}': float(recall),
+                })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit embedding projections and report recall versus size')
+    parser.add_argument('command', choices=['fit', 'report'])
+    parser.add_argument('--dimension', type=int, default=Enumerations.embedding_storage_dimension)
+    parser.add_argument('--dimensions', default='384,256,192,128,64')
+    parser.add_argument('--sample', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--output', default=Enumerations.embedding_pca_path)
+    args = parser.parse_args()
+
+    vectors = _fetch_embeddings(args.sample)
+
+    if args.command == 'fit':
+        EmbeddingProjection.save_pca(EmbeddingProjection.fit_pca(vectors, args.dimension), args.output)
+        print(f'PCA with {args.dimension} dims fitted on {len(vectors)} embeddings -> {args.output}')
+        return
+
+    dimensions = [int(d) for d in args.dimensions.split(',')]
+    rows = recall_report(vectors, dimensions, queries=args.queries, k=args.k)
+    recall_key = f'recall@{min(args.k, len(vectors) - 1)}'
+
+    print(f"{'projection':<10} {'dim':>4} {'storage':<8} {'bytes/vec':>9} {recall_key:>10}")
+    for row in rows:
+        print(f"{row['projection']:<10} {row['dimension']:>4} {row['storage']:<8} "
+              f"{row['bytes_per_vector']:>9} {row[recall_key]:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
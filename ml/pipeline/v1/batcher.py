@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Tuple
+from ml.Enum.Enumerations import Enumerations
+from ml.models.v1.embedder import Model
+from ml.inference.embedding_workers import EmbeddingWorkerPool
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class EmbeddingBatcher:
+    _queue = None
+    _worker = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _ensure_worker(cls):
+        if cls._worker is not None and cls._worker.is_alive():
+            return
+
+        with cls._lock:
+            if cls._worker is None or not cls._worker.is_alive():
+                cls._queue = queue.Queue()
+                cls._worker = threading.Thread(
+                    target=cls._run,
+                    args=(cls._queue,),
+                    name='embedding-batcher',
+                    daemon=True
+                )
+                cls._worker.start()
+                logger.info('EmbeddingBatcher: worker started')
+
+    @classmethod
+    def encode(cls, text: str) -> Any:
+        cls._ensure_worker()
+
+        future = Future()
+        cls._queue.put((text, future))
+        return future.result()
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._worker is not None and cls._worker.is_alive():
+                cls._queue.put(None)
+                cls._worker.join()
+            cls._worker = None
+            cls._queue = None
+
+    @staticmethod
+    def _collect(
+        requests: queue.Queue,
+        first: Tuple[str, Future]
+    ) -> Tuple[List[Tuple[str, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + Enumerations.embed_batch_max_wait
+
+        while len(batch) < Enumerations.embed_batch_max_size:
+            remaining = deadline - time.monotonic()
+
+            try:
+                if remaining > 0:
+                    item = requests.get(timeout=remaining)
+                else:
+                    item = requests.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    @staticmethod
+    def _encode_batch(batch: List[Tuple[str, Future]]):
+        texts = list(dict.fromkeys(text for text, _ in batch))
+
+        try:
+            if EmbeddingWorkerPool.enabled():
+                embeddings = EmbeddingWorkerPool.encode(texts)
+            else:
+                embeddings = Model.model().encode(texts)
+            by_text = dict(zip(texts, embeddings))
+
+            for text, future in batch:
+                future.set_result(by_text[text])
+
+            logger.info(f'EmbeddingBatcher: encoded {len(texts)} texts for {len(batch)} requests')
+
+        except Exception as e:
+            logger.error(f'EmbeddingBatcher error: {e}', exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    @staticmethod
+    def _run(requests: queue.Queue):
+        while True:
+            item = requests.get()
+            if item is None:
+                break
+
+            batch, stop = EmbeddingBatcher._collect(requests, item)
+            EmbeddingBatcher._encode_batch(batch)
+
+            if stop:
+                break
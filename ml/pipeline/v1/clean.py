@@ -1,4 +1,5 @@
 import re
+from typing import Iterable, List
 from bs4 import BeautifulSoup
 from ml.Enum.Enumerations import Enumerations
 from backend.app.core.logging import get_logger
@@ -7,8 +8,25 @@ logger = get_logger(__name__, system_type='ml')
 
 
 class TextCleaner:
+    # every cleaning pattern maps to a single space, so they run as one pass;
+    # whitespace is part of the alternation to collapse each run in the same pass
+    _noise = re.compile('(?:{})+'.format('|'.join(
+        f'(?:{pattern})' for pattern in (
+            Enumerations.pattern_domain,
+            Enumerations.pattern_page_numbers,
+            Enumerations.pattern_punctuation_lines_repeated,
+            Enumerations.non_printing_control_characters,
+            Enumerations.useless_symbols_and_signs,
+            Enumerations.pattern_more_space_line_removal,
+        )
+    )))
+    _markup = re.compile(r'[<&]')
+
     @staticmethod
     def _extract_text_from_html(text: str) -> str:
+        if not TextCleaner._markup.search(text):
+            return text
+
         try:
             soup = BeautifulSoup(text, 'lxml')
         except Exception as e:
@@ -17,6 +35,11 @@ class TextCleaner:
 
         return soup.get_text(separator=' ')
 
+    @staticmethod
+    def _clean(text: str) -> str:
+        text = TextCleaner._extract_text_from_html(text)
+        return TextCleaner._noise.sub(' ', text).lower().strip()
+
     @staticmethod
     def text_cleaner(text: str) -> str:
         if not text:
@@ -24,16 +47,7 @@ class TextCleaner:
             return ""
 
         try:
-            text = TextCleaner._extract_text_from_html(text)
-            text = re.sub(Enumerations.pattern_domain, ' ', text)
-            text = re.sub(Enumerations.pattern_page_numbers, ' ', text)
-            text = re.sub(Enumerations.pattern_punctuation_end_sen, r'\1', text)
-            text = re.sub(Enumerations.pattern_punctuation_lines_repeated, ' ', text)
-            text = re.sub(Enumerations.non_printing_control_characters, ' ', text)
-            text = re.sub(Enumerations.useless_symbols_and_signs, ' ', text)
-            text = re.sub(Enumerations.pattern_more_space_line_removal, ' ', text)
-            text = text.lower().strip()
-
+            text = TextCleaner._clean(text)
             logger.info('Text cleaned successfully')
 
         except Exception as e:
@@ -41,3 +55,23 @@ class TextCleaner:
             return text
 
         return text
+
+    @staticmethod
+    def clean_many(texts: Iterable[str]) -> List[str]:
+        cleaned = []
+        failed = 0
+
+        for text in texts:
+            if not text:
+                cleaned.append("")
+                continue
+
+            try:
+                cleaned.append(TextCleaner._clean(text))
+            except Exception as e:
+                failed += 1
+                logger.error(f'Error cleaning text: {e}')
+                cleaned.append(text)
+
+        logger.info(f'Cleaned {len(cleaned)} texts ({failed} failed)')
+        return cleaned
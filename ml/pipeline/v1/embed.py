@@ -1,5 +1,12 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Union
 from .feature import FeatureExtractor
+from .batcher import EmbeddingBatcher
+from .embedding_cache import EmbeddingCache
+from ml.Enum.Enumerations import Enumerations
 from ml.models.v1.embedder import Model
+from ml.inference.embedding_workers import EmbeddingWorkerPool
 from backend.app.core.logging import get_logger
 
 logger = get_logger(__name__, system_type='ml')
@@ -8,13 +15,22 @@ logger = get_logger(__name__, system_type='ml')
 class Embedder:
     @staticmethod
     def embedder(text: str) -> dict:
-        model = Model.model()
-
         try:
             features_dict = FeatureExtractor.feature_extractor(text)
             tech_score = features_dict.get('tech_score', 0)
             name_cleaned = features_dict.get('name_cleaned', text)
-            name_embeddings = model.encode([name_cleaned])[0]
+
+            name_embeddings = EmbeddingCache.get(name_cleaned)
+
+            if name_embeddings is None:
+                if Enumerations.embed_batching:
+                    name_embeddings = EmbeddingBatcher.encode(name_cleaned)
+                elif EmbeddingWorkerPool.enabled():
+                    name_embeddings = EmbeddingWorkerPool.encode([name_cleaned])[0]
+                else:
+                    name_embeddings = Model.model().encode([name_cleaned])[0]
+
+                EmbeddingCache.set(name_cleaned, name_embeddings)
 
             logger.info('Embeddings successfully created')
 
@@ -31,3 +47,57 @@ class Embedder:
                 'tech_score': 0,
                 'name_embeddings': []
             }
+
+    @staticmethod
+    def encode_batch(
+        names: List[str],
+        use_cache: bool = True,
+        batch_size: int = Enumerations.ingest_encode_batch_size
+    ) -> np.ndarray:
+        embeddings = np.empty((len(names), Enumerations.embedding_dimension), dtype=np.float32)
+        missing: Dict[str, List[int]] = {}
+
+        cached_vectors = EmbeddingCache.get_many(names) if use_cache else [None] * len(names)
+
+        for position, (name, cached) in enumerate(zip(names, cached_vectors)):
+            if cached is None:
+                missing.setdefault(name, []).append(position)
+            else:
+                embeddings[position] = cached
+
+        if missing:
+            texts = list(missing)
+            if EmbeddingWorkerPool.enabled():
+                vectors = EmbeddingWorkerPool.encode(texts)
+            else:
+                vectors = Model.model().encode(texts, batch_size=batch_size, show_progress_bar=False)
+
+            vectors = np.asarray(vectors, dtype=np.float32)
+            for text, vector in zip(texts, vectors):
+                embeddings[missing[text]] = vector
+
+            if use_cache:
+                EmbeddingCache.set_many(texts, vectors)
+
+        logger.info(f'Embeddings created for {len(names)} texts ({len(missing)} encoded)')
+        return embeddings
+
+    @staticmethod
+    def embed_batch(texts: Union[pd.Series, Iterable[str]], use_cache: bool = True) -> dict:
+        try:
+            features = FeatureExtractor.feature_extractor_batch(texts)
+            names = features['name_cleaned'].tolist()
+
+            return {
+                'name_cleaned': names,
+                'tech_score': features['tech_score'].to_numpy(),
+                'name_embeddings': Embedder.encode_batch(names, use_cache=use_cache)
+            }
+
+        except Exception as e:
+            logger.error(f'error: {e}')
+            return {
+                'name_cleaned': [],
+                'tech_score': np.empty(0, dtype=np.int64),
+                'name_embeddings': np.empty((0, Enumerations.embedding_dimension), dtype=np.float32)
+            }
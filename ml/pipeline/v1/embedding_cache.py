@@ -0,0 +1,238 @@
+import os
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+from ml.Enum.Enumerations import Enumerations
+from backend.app.core.config import REDIS_HOST, REDIS_PORT, REDIS_PASSWORD, REDIS_DB
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class EmbeddingCache:
+    _lru = OrderedDict()
+    _lock = threading.Lock()
+    _redis = None
+    _redis_retry_at = 0.0
+    _loaded = False
+
+    @staticmethod
+    def model_version() -> str:
+        version = f'{Enumerations.embedding_model_name}:{Enumerations.embedding_backend}'
+        if Enumerations.embedding_backend == 'onnx' and Enumerations.onnx_quantized:
+            version += ':int8'
+        return version
+
+    @staticmethod
+    def _redis_key(text: str) -> str:
+        digest = hashlib.sha1(f'{EmbeddingCache.model_version()}:{text}'.encode()).hexdigest()
+        return f'{Enumerations.embed_cache_prefix}:{digest}'
+
+    @classmethod
+    def _get_redis(cls):
+        if not Enumerations.embed_cache_redis or time.monotonic() < cls._redis_retry_at:
+            return None
+
+        if cls._redis is None:
+            import redis
+            from redis.backoff import NoBackoff
+            from redis.retry import Retry
+
+            # a cache tier must fail fast instead of retrying on the request path
+            cls._redis = redis.Redis(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                password=REDIS_PASSWORD,
+                socket_timeout=Enumerations.embed_cache_redis_timeout,
+                socket_connect_timeout=Enumerations.embed_cache_redis_timeout,
+                retry=Retry(NoBackoff(), 0)
+            )
+
+        return cls._redis
+
+    @classmethod
+    def _redis_failed(cls, e: Exception):
+        cls._redis_retry_at = time.monotonic() + Enumerations.embed_cache_redis_backoff
+        logger.warning(f'EmbeddingCache: redis unavailable, retrying in '
+                       f'{Enumerations.embed_cache_redis_backoff}s: {e}')
+
+    @classmethod
+    def _remember(cls, key: tuple, vector: np.ndarray):
+        with cls._lock:
+            cls._lru[key] = vector
+            cls._lru.move_to_end(key)
+            while len(cls._lru) > Enumerations.embed_cache_size:
+                cls._lru.popitem(last=False)
+
+    @classmethod
+    def get(cls, text: str) -> Optional[np.ndarray]:
+        if not Enumerations.embed_cache:
+            return None
+
+        if not cls._loaded:
+            cls.load()
+
+        key = (cls.model_version(), text)
+        with cls._lock:
+            vector = cls._lru.get(key)
+            if vector is not None:
+                cls._lru.move_to_end(key)
+                return vector
+
+        client = cls._get_redis()
+        if client is None:
+            return None
+
+        try:
+            raw = client.get(cls._redis_key(text))
+        except Exception as e:
+            cls._redis_failed(e)
+            return None
+
+        if raw is None:
+            return None
+
+        vector = np.frombuffer(raw, dtype=np.float32)
+        cls._remember(key, vector)
+        return vector
+
+    @classmethod
+    def set(cls, text: str, embedding: Any):
+        if not Enumerations.embed_cache:
+            return
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        cls._remember((cls.model_version(), text), vector)
+
+        client = cls._get_redis()
+        if client is None:
+            return
+
+        try:
+            client.setex(cls._redis_key(text), Enumerations.embed_cache_ttl, vector.tobytes())
+        except Exception as e:
+            cls._redis_failed(e)
+
+    @classmethod
+    def get_many(cls, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        if not Enumerations.embed_cache:
+            return [None] * len(texts)
+
+        if not cls._loaded:
+            cls.load()
+
+        version = cls.model_version()
+        vectors = [None] * len(texts)
+        missing = []
+
+        with cls._lock:
+            for position, text in enumerate(texts):
+                vector = cls._lru.get((version, text))
+                if vector is None:
+                    missing.append(position)
+                else:
+                    cls._lru.move_to_end((version, text))
+                    vectors[position] = vector
+
+        client = cls._get_redis()
+        if not missing or client is None:
+            return vectors
+
+        try:
+            raws = client.mget([cls._redis_key(texts[position]) for position in missing])
+        except Exception as e:
+            cls._redis_failed(e)
+            return vectors
+
+        for position, raw in zip(missing, raws):
+            if raw is not None:
+                vectors[position] = np.frombuffer(raw, dtype=np.float32)
+                cls._remember((version, texts[position]), vectors[position])
+
+        return vectors
+
+    @classmethod
+    def set_many(cls, texts: Sequence[str], embeddings: Any):
+        if not Enumerations.embed_cache or len(texts) == 0:
+            return
+
+        version = cls.model_version()
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        for text, vector in zip(texts, vectors):
+            cls._remember((version, text), vector)
+
+        client = cls._get_redis()
+        if client is None:
+            return
+
+        try:
+            pipeline = client.pipeline(transaction=False)
+            for text, vector in zip(texts, vectors):
+                pipeline.setex(cls._redis_key(text), Enumerations.embed_cache_ttl, vector.tobytes())
+            pipeline.execute()
+        except Exception as e:
+            cls._redis_failed(e)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._lru.clear()
+
+    @classmethod
+    def load(cls, path: str = Enumerations.embed_cache_path):
+        cls._loaded = True
+        if not path or not os.path.exists(path):
+            return 0
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data['model_version']) != cls.model_version():
+                    logger.info('EmbeddingCache: snapshot model version mismatch, skipping load')
+                    return 0
+
+                texts, vectors = data['texts'], data['vectors']
+
+            version = cls.model_version()
+            for text, vector in zip(texts.tolist(), vectors):
+                cls._remember((version, text), vector)
+
+            logger.info(f'EmbeddingCache: loaded {len(texts)} embeddings from {path}')
+            return len(texts)
+
+        except Exception as e:
+            logger.warning(f'EmbeddingCache: failed to load {path}: {e}')
+            return 0
+
+    @classmethod
+    def save(cls, path: str = Enumerations.embed_cache_path):
+        if not path:
+            return 0
+
+        version = cls.model_version()
+        with cls._lock:
+            items = [(key[1], vector) for key, vector in cls._lru.items() if key[0] == version]
+
+        if not items:
+            return 0
+
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f'{path}.tmp.npz'
+            np.savez(
+                tmp_path,
+                model_version=np.array(version),
+                texts=np.array([text for text, _ in items]),
+                vectors=np.vstack([vector for _, vector in items])
+            )
+            os.replace(tmp_path, path)
+
+            logger.info(f'EmbeddingCache: saved {len(items)} embeddings to {path}')
+            return len(items)
+
+        except Exception as e:
+            logger.warning(f'EmbeddingCache: failed to save {path}: {e}')
+            return 0
@@ -1,27 +1,35 @@
+import pandas as pd
+from typing import Iterable, Union
 from .clean import TextCleaner
+from .keywords import KeywordMatcher
 from backend.app.core.logging import get_logger
 
 logger = get_logger(__name__, system_type='ml')
 
 
 class FeatureExtractor:
-    TECH_KEYWORDS = frozenset(
-        [
-            # Programming Languages & Runtimes
+    # categories double as the partitions of the books table (books_<category>), first match wins on overlaps
+    TECH_CATEGORIES = {
+        # Programming Languages & Runtimes
+        'languages': frozenset([
             'python', 'javascript', 'typescript', 'java', 'c++', 'c#', 'rust',
             'golang', 'ruby', 'kotlin', 'swift', 'dart', 'php', 'scala',
             'elixir', 'haskell', 'lua', 'clojure', 'f#', 'fortran', 'assembly',
             'solidity', 'zig', 'carbon', 'mojo', 'node.js', 'bun', 'deno',
+        ]),
 
-            # Frameworks & Libraries
+        # Frameworks & Libraries
+        'frameworks': frozenset([
             'react', 'angular', 'vue.js', 'svelte', 'next.js', 'nuxt.js',
             'express.js', 'nestjs', 'fastapi', 'django', 'flask', 'laravel',
             'spring boot', 'asp.net', 'ruby on rails', 'tailwindcss', 'keras',
             'bootstrap', 'tensorflow', 'pytorch', 'scikit-learn', 'pandas',
             'numpy', 'matplotlib', 'opencv', 'langchain', 'llama-index',
             'flutter', 'react native', 'ionic',
+        ]),
 
-            # AI, ML & Data Science (2026 Trends)
+        # AI, ML & Data Science (2026 Trends)
+        'ai_data': frozenset([
             'artificial intelligence', 'machine learning', 'deep learning',
             'generative ai', 'genai', 'large language models', 'llm', 'nlp',
             'natural language processing', 'computer vision', 'transformers',
@@ -29,48 +37,84 @@ class FeatureExtractor:
             'gpt-5', 'prompt engineering', 'retrieval-augmented generation',
             'rag', 'ai agents', 'vector embeddings', 'data mining', 'big data',
             'data engineering', 'analytics', 'statistics', 'mlops',
+        ]),
 
-            # Backend, APIs & Architecture
+        # Backend, APIs & Architecture
+        'backend': frozenset([
             'backend', 'microservices', 'serverless', 'rest api', 'graphql',
             'grpc', 'trpc', 'websockets', 'soap', 'api gateway', 'kafka',
             'message queue', 'rabbitmq', 'redis', 'system design', 'monolith',
             'software architecture', 'design patterns', 'event-driven', 'mvc',
             'soa',
+        ]),
 
-            # Infrastructure, Cloud & DevOps
+        # Infrastructure, Cloud & DevOps
+        'infrastructure': frozenset([
             'devops', 'cloud computing', 'aws', 'amazon web services', 'azure',
             'google cloud', 'gcp', 'docker', 'kubernetes', 'k8s', 'terraform',
             'ansible', 'jenkins', 'ci/cd', 'github actions', 'linux', 'unix',
             'ubuntu', 'bash', 'powershell', 'nginx', 'apache', 'prometheus',
             'grafana', 'terraform', 'infrastructure as code', 'iac', 'sre',
             'site reliability',
+        ]),
 
-            # Databases & Storage
+        # Databases & Storage
+        'databases': frozenset([
             'database', 'sql', 'nosql', 'postgresql', 'mysql', 'mongodb',
             'cassandra', 'elasticsearch', 'dynamodb', 'redis', 'neo4j',
             'pinecone', 'milvus', 'weaviate', 'supabase', 'prisma', 'drizzle',
             'sharding', 'replication', 'acid', 'data warehouse', 'data lake',
+        ]),
 
-            # Software Engineering & Methodology
+        # Software Engineering & Methodology
+        'engineering': frozenset([
             'coding', 'programming', 'software engineering', 'clean code',
             'solid principles', 'agile', 'scrum', 'kanban', 'tdd',
             'test driven development', 'unit testing', 'integration testing',
             'debugging', 'version control', 'git', 'github', 'gitlab',
             'bitbucket', 'object-oriented', 'oop', 'functional programming',
             'refactoring',
+        ]),
 
-            # Cybersecurity & Web Security
+        # Cybersecurity & Web Security
+        'security': frozenset([
             'cybersecurity', 'information security', 'ethical hacking', 'jwt',
             'penetration testing', 'encryption', 'cryptography', 'oauth',
             'auth0', 'firewall', 'zero trust', 'ssl', 'tls', 'vulnerability',
+        ]),
 
-            # Emerging Tech & Others
+        # Emerging Tech & Others
+        'emerging': frozenset([
             'blockchain', 'web3', 'smart contracts', 'ethereum', 'iot',
             'internet of things', 'quantum computing', 'augmented reality',
             'virtual reality', 'xr', 'game development', 'unreal engine',
             'embedded systems', 'rtos', 'webassembly', 'wasm', 'unity',
-        ]
-    )
+        ]),
+    }
+    GENERAL_CATEGORY = 'general'
+    CATEGORIES = tuple(TECH_CATEGORIES) + (GENERAL_CATEGORY,)
+
+    TECH_KEYWORDS = frozenset().union(*TECH_CATEGORIES.values())
+    KEYWORD_CATEGORIES = {
+        keyword: category
+        for category, keywords in reversed(TECH_CATEGORIES.items())
+        for keyword in keywords
+    }
+
+    TECH_MATCHER = KeywordMatcher(TECH_KEYWORDS)
+
+    @staticmethod
+    def tech_category(tech_keywords: Iterable[str]) -> str:
+        counts = {}
+        for keyword in tech_keywords:
+            category = FeatureExtractor.KEYWORD_CATEGORIES[keyword]
+            counts[category] = counts.get(category, 0) + 1
+
+        if not counts:
+            return FeatureExtractor.GENERAL_CATEGORY
+
+        # ties go to the category listed first
+        return max(FeatureExtractor.TECH_CATEGORIES, key=lambda category: counts.get(category, 0))
 
     @staticmethod
     def feature_extractor(text: str) -> dict:
@@ -80,11 +124,13 @@ class FeatureExtractor:
 
         try:
             text = TextCleaner.text_cleaner(text)
-            tech_score = sum(1 for kw in FeatureExtractor.TECH_KEYWORDS if kw in text.lower())
+            tech_keywords = FeatureExtractor.TECH_MATCHER.matches(text)
 
             features = {
                 'name_cleaned': text,
-                'tech_score': tech_score,
+                'tech_score': len(tech_keywords),
+                'tech_keywords': sorted(tech_keywords),
+                'tech_category': FeatureExtractor.tech_category(tech_keywords),
             }
 
             logger.info(f'Features extracted: {features}')
@@ -97,3 +143,21 @@ class FeatureExtractor:
             }
 
         return features
+
+    @staticmethod
+    def feature_extractor_batch(texts: Union[pd.Series, Iterable[str]]) -> pd.DataFrame:
+        if not isinstance(texts, pd.Series):
+            texts = pd.Series(list(texts), dtype=object)
+
+        names = TextCleaner.clean_many(texts.fillna('').astype(str))
+        tech_keywords = [sorted(FeatureExtractor.TECH_MATCHER.matches(name)) for name in names]
+
+        features = pd.DataFrame({
+            'name_cleaned': names,
+            'tech_score': [len(keywords) for keywords in tech_keywords],
+            'tech_keywords': tech_keywords,
+            'tech_category': [FeatureExtractor.tech_category(keywords) for keywords in tech_keywords],
+        }, index=texts.index)
+
+        logger.info(f'Features extracted for {len(features)} texts')
+        return features
@@ -0,0 +1,507 @@
+import io
+import os
+import json
+import argparse
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from ml.Enum.Enumerations import Enumerations
+from ml.models.v1.projection import EmbeddingProjection
+from ml.pipeline.v1.clean import TextCleaner
+from ml.pipeline.v1.embed import Embedder
+from ml.pipeline.v1.feature import FeatureExtractor
+from ml.services.pg_binary import PGBinary
+from ml.services.catalog_snapshot import CatalogSnapshot
+from ml.services.postgres_pool import MLPostgresConnectionPool
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'vector_db', 'pgvector', 'v1', 'schema.json')
+
+
+class BookIngestion:
+    BOOK_COLUMNS = [
+        ('book_id', 'int4'),
+        ('name', 'text'),
+        ('name_cleaned', 'text'),
+        ('authors', 'text'),
+        ('publisher', 'text'),
+        ('description', 'text'),
+        ('description_cleaned', 'text'),
+        ('rating', 'float8'),
+        ('publishyear', 'int4'),
+        ('weighted_rating', 'float8'),
+        ('counts_of_review_scaled', 'float8'),
+        ('tech_score_scaled', 'float8'),
+        ('publishyear_scaled', 'float8'),
+        ('average_low_rating', 'float8'),
+        ('average_high_rating', 'float8'),
+        ('embedding', Enumerations.embedding_storage),
+        ('category', 'text'),
+    ]
+
+    STATS_COLUMNS = ['Rating', 'PublishYear', 'CountsOfReview', 'RatingDistTotal']
+
+    @staticmethod
+    def _rating_count(series: pd.Series) -> pd.Series:
+        values = series.astype('string').str.split(':').str[-1]
+        return pd.to_numeric(values, errors='coerce').fillna(0.0)
+
+    @staticmethod
+    def compute_stats(csv_path: str, chunk_size: int) -> Dict[str, float]:
+        ratings, years, reviews, totals = [], [], [], []
+
+        for chunk in pd.read_csv(
+            csv_path,
+            usecols=lambda col: col in BookIngestion.STATS_COLUMNS,
+            chunksize=chunk_size,
+            low_memory=False
+        ):
+            ratings.append(pd.to_numeric(chunk['Rating'], errors='coerce'))
+            years.append(pd.to_numeric(chunk['PublishYear'], errors='coerce'))
+            reviews.append(pd.to_numeric(chunk['CountsOfReview'], errors='coerce'))
+            totals.append(BookIngestion._rating_count(chunk['RatingDistTotal']))
+
+        rating = pd.concat(ratings)
+        year = pd.concat(years)
+        review = np.log1p(pd.concat(reviews).fillna(0).clip(lower=0))
+        total = pd.concat(totals)
+
+        return {
+            'rows': int(len(rating)),
+            'mean_rating': float(rating.mean()),
+            'min_votes': float(total.quantile(Enumerations.ingest_min_votes_quantile)),
+            'min_year': float(year.min()),
+            'max_year': float(year.max()),
+            'max_log_reviews': float(review.max()) or 1.0,
+        }
+
+    @staticmethod
+    def features(chunk: pd.DataFrame, stats: Dict[str, float]) -> pd.DataFrame:
+        rating = pd.to_numeric(chunk['Rating'], errors='coerce')
+        year = pd.to_numeric(chunk['PublishYear'], errors='coerce')
+        reviews = pd.to_numeric(chunk['CountsOfReview'], errors='coerce').fillna(0).clip(lower=0)
+
+        total = BookIngestion._rating_count(chunk['RatingDistTotal'])
+        low = BookIngestion._rating_count(chunk['RatingDist1']) + BookIngestion._rating_count(chunk['RatingDist2'])
+        high = BookIngestion._rating_count(chunk['RatingDist4']) + BookIngestion._rating_count(chunk['RatingDist5'])
+        safe_total = total.where(total > 0)
+
+        votes, min_votes = total, stats['min_votes']
+        weighted = (votes / (votes + min_votes)) * rating.fillna(stats['mean_rating']) + \
+            (min_votes / (votes + min_votes)) * stats['mean_rating']
+        year_span = (stats['max_year'] - stats['min_year']) or 1.0
+
+        return pd.DataFrame({
+            'rating': rating,
+            'publishyear': year,
+            'weighted_rating': weighted.fillna(stats['mean_rating']) / 5.0,
+            'counts_of_review_scaled': np.log1p(reviews) / stats['max_log_reviews'],
+            'publishyear_scaled': ((year - stats['min_year']) / year_span).clip(0.0, 1.0),
+            'average_low_rating': (low / safe_total).fillna(0.0),
+            'average_high_rating': (high / safe_total).fillna(0.0),
+        }, index=chunk.index)
+
+    @staticmethod
+    def clean_texts(records: List[Tuple[str, str]]) -> List[Tuple[str, str, int, str]]:
+        results = []
+        names = TextCleaner.clean_many(name for name, _ in records)
+        descriptions = TextCleaner.clean_many(description for _, description in records)
+
+        for name_cleaned, description_cleaned in zip(names, descriptions):
+            tech_keywords = FeatureExtractor.TECH_MATCHER.matches(f'{name_cleaned} {description_cleaned}')
+            category = FeatureExtractor.tech_category(tech_keywords)
+            results.append((name_cleaned, description_cleaned, len(tech_keywords), category))
+
+        return results
+
+    @staticmethod
+    def submit_cleaning(
+        executor: ProcessPoolExecutor,
+        chunk: pd.DataFrame,
+        workers: int
+    ) -> List[Any]:
+        names = chunk['Name'].fillna('').astype(str).tolist()
+        descriptions = chunk.get('Description', pd.Series('', index=chunk.index)).fillna('').astype(str).tolist()
+        records = list(zip(names, descriptions))
+
+        step = max(1, -(-len(records) // workers))
+        return [
+            executor.submit(BookIngestion.clean_texts, records[start:start + step])
+            for start in range(0, len(records), step)
+        ]
+
+    @staticmethod
+    def _column(chunk: pd.DataFrame, name: str) -> List[Any]:
+        if name not in chunk.columns:
+            return [None] * len(chunk)
+        values = chunk[name].astype(object)
+        return values.where(values.notna(), None).tolist()
+
+    @staticmethod
+    def build_rows(
+        chunk: pd.DataFrame,
+        first_book_id: int,
+        cleaned: List[Tuple[str, str, int, str]],
+        embeddings: np.ndarray,
+        stats: Dict[str, float]
+    ) -> List[tuple]:
+        features = BookIngestion.features(chunk, stats)
+        cap = Enumerations.ingest_tech_score_cap
+        years = [None if pd.isna(year) else int(year) for year in features['publishyear']]
+
+        return list(zip(
+            range(first_book_id, first_book_id + len(chunk)),
+            BookIngestion._column(chunk, 'Name'),
+            [row[0] for row in cleaned],
+            BookIngestion._column(chunk, 'Authors'),
+            BookIngestion._column(chunk, 'Publisher'),
+            BookIngestion._column(chunk, 'Description'),
+            [row[1] for row in cleaned],
+            features['rating'].tolist(),
+            years,
+            features['weighted_rating'].tolist(),
+            features['counts_of_review_scaled'].tolist(),
+            [min(row[2], cap) / cap for row in cleaned],
+            features['publishyear_scaled'].tolist(),
+            features['average_low_rating'].tolist(),
+            features['average_high_rating'].tolist(),
+            list(embeddings),
+            [row[3] for row in cleaned],
+        ))
+
+    @staticmethod
+    def copy_rows(conn, rows: List[tuple]):
+        columns = BookIngestion.BOOK_COLUMNS
+        payload = PGBinary.copy_rows(rows, [kind for _, kind in columns])
+        first_id, last_id = rows[0][0], rows[-1][0]
+
+        with conn.cursor() as cursor:
+            # replaying a chunk after a crash must not duplicate rows
+            cursor.execute('DELETE FROM books WHERE book_id BETWEEN %s AND %s;', (first_id, last_id))
+            cursor.copy_expert(
+                f"COPY books ({', '.join(name for name, _ in columns)}) FROM STDIN WITH (FORMAT binary)",
+                io.BytesIO(payload)
+            )
+        conn.commit()
+
+    @staticmethod
+    def load_checkpoint(path: str, csv_path: str, chunk_size: int) -> Dict[str, Any]:
+        if os.path.exists(path):
+            with open(path) as f:
+                checkpoint = json.load(f)
+
+            if checkpoint.get('csv') == os.path.abspath(csv_path) and checkpoint.get('chunk_size') == chunk_size:
+                return checkpoint
+
+            logger.warning('BookIngestion: checkpoint belongs to another run, starting over')
+
+        return {'csv': os.path.abspath(csv_path), 'chunk_size': chunk_size, 'next_chunk': 0, 'rows_loaded': 0}
+
+    @staticmethod
+    def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _schema() -> Dict[str, Any]:
+        with open(SCHEMA_PATH) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _table_statement(statement: str) -> str:
+        statement = statement.replace('VECTOR(384)', Enumerations.embedding_storage_type)
+        return statement.replace('CREATE TABLE books', 'CREATE TABLE IF NOT EXISTS books', 1)
+
+    @staticmethod
+    def _index_statement(statement: str) -> str:
+        statement = statement.replace('vector_cosine_ops', Enumerations.embedding_opclass)
+        statement = statement.replace('bit(384)', f'bit({Enumerations.embedding_storage_dimension})')
+        return statement.replace('CREATE INDEX ', 'CREATE INDEX IF NOT EXISTS ', 1)
+
+    @staticmethod
+    def partitions(cursor) -> List[str]:
+        cursor.execute(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'books'::regclass ORDER BY 1;"
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def prepare_table(conn, truncate: bool, drop_index: bool):
+        schema = BookIngestion._schema()
+
+        with conn.cursor() as cursor:
+            # a fresh database gets the extensions, the partitioned table and its partitions before the load
+            for statement in schema['setup_commands']:
+                cursor.execute(statement)
+            cursor.execute(BookIngestion._table_statement(schema['create_table_books']))
+
+            # tables from before partitioning keep loading unpartitioned until --partition-existing moves them
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'books'::regclass;")
+            if cursor.fetchone()[0] == 'p':
+                for statement in schema['create_partitions']:
+                    cursor.execute(statement)
+
+            if truncate:
+                cursor.execute('TRUNCATE books;')
+            if drop_index:
+                # dropping a partitioned index drops the index of every partition
+                cursor.execute('DROP INDEX IF EXISTS books_embedding_idx;')
+                cursor.execute('DROP INDEX IF EXISTS books_embedding_bit_idx;')
+                cursor.execute('DROP INDEX IF EXISTS books_search_vector_idx;')
+
+            # tables created before these columns existed get them before the load
+            for statement in schema['add_columns']:
+                cursor.execute(statement)
+
+            cursor.execute(
+                "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                "WHERE attrelid = 'books'::regclass AND attname = 'embedding';"
+            )
+            current_type = cursor.fetchone()[0]
+
+            if current_type != Enumerations.embedding_storage_type:
+                # every row is rewritten by this run with vectors in the new storage mode
+                cursor.execute(
+                    f'ALTER TABLE books ALTER COLUMN embedding '
+                    f'TYPE {Enumerations.embedding_storage_type} USING NULL;'
+                )
+                logger.info(f'BookIngestion: embedding column changed from {current_type} '
+                            f'to {Enumerations.embedding_storage_type}')
+        conn.commit()
+
+    @staticmethod
+    def _build_partition_index(partition: str, statements: List[str]) -> str:
+        with MLPostgresConnectionPool.get_connection() as conn:
+            old_autocommit = conn.autocommit
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"SET maintenance_work_mem = '{Enumerations.ingest_maintenance_work_mem}';")
+                    for statement in statements:
+                        cursor.execute(statement.format(partition=partition))
+            finally:
+                conn.autocommit = old_autocommit
+        return partition
+
+    @staticmethod
+    def build_partition_indexes(
+        partitions: List[str],
+        statements: List[str],
+        workers: int = Enumerations.ingest_index_workers
+    ):
+        # every partition has its own HNSW graph, so the builds run side by side on separate connections;
+        # each build may use up to maintenance_work_mem
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for partition in executor.map(
+                lambda partition: BookIngestion._build_partition_index(partition, statements),
+                partitions
+            ):
+                logger.info(f'BookIngestion: HNSW index built for {partition}')
+
+    @staticmethod
+    def finish_table(conn):
+        schema = BookIngestion._schema()
+
+        old_autocommit = conn.autocommit
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence('books', 'book_id'), "
+                    "COALESCE((SELECT MAX(book_id) FROM books), 1));"
+                )
+                cursor.execute(f"SET maintenance_work_mem = '{Enumerations.ingest_maintenance_work_mem}';")
+                statements = schema['create_indexes']
+                if Enumerations.vector_search_backend == 'pgvector_binary':
+                    statements = statements + schema['create_binary_indexes']
+
+                for statement in statements:
+                    cursor.execute(BookIngestion._index_statement(statement))
+
+                partitions = BookIngestion.partitions(cursor)
+        finally:
+            conn.autocommit = old_autocommit
+
+        # books_embedding_idx is created ON ONLY the parent and becomes valid once every partition index is attached
+        if partitions:
+            BookIngestion.build_partition_indexes(
+                partitions,
+                [BookIngestion._index_statement(statement) for statement in schema['create_partition_indexes']]
+            )
+
+        BookIngestion.bump_catalog_version(conn)
+
+        # API workers switch to the new snapshot on their next refresh check
+        if CatalogSnapshot.enabled():
+            CatalogSnapshot.export()
+
+    @staticmethod
+    def bump_catalog_version(conn) -> int:
+        # API processes drop their cached book metadata when they see the new version
+        with conn.cursor() as cursor:
+            for statement in BookIngestion._schema()['create_catalog_version']:
+                cursor.execute(statement)
+            cursor.execute('UPDATE catalog_version SET version = version + 1, updated_at = now() RETURNING version;')
+            version = cursor.fetchone()[0]
+        conn.commit()
+
+        logger.info(f'BookIngestion: catalog version bumped to {version}')
+        return version
+
+    @staticmethod
+    def partition_table(batch_size: int = 10000) -> int:
+        schema = BookIngestion._schema()
+        columns = [name for name, _ in BookIngestion.BOOK_COLUMNS if name != 'category']
+
+        with MLPostgresConnectionPool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                if BookIngestion.partitions(cursor):
+                    logger.info('BookIngestion: books is already partitioned')
+                    return 0
+
+                # one transaction: a failure leaves the original table untouched;
+                # pg_trgm is installed before the move so the trigram index in finish_table cannot fail after it
+                for statement in schema['setup_commands']:
+                    cursor.execute(statement)
+                for statement in schema['add_columns']:
+                    cursor.execute(statement)
+                cursor.execute('ALTER TABLE books RENAME TO books_unpartitioned;')
+                cursor.execute('ALTER INDEX books_pkey RENAME TO books_unpartitioned_pkey;')
+                cursor.execute(BookIngestion._table_statement(schema['create_table_books']))
+                for statement in schema['create_partitions']:
+                    cursor.execute(statement)
+                cursor.execute('CREATE TEMPORARY TABLE book_categories (book_id INT PRIMARY KEY, category TEXT) ON COMMIT DROP;')
+
+            with conn.cursor(name='partition_categories') as source, conn.cursor() as cursor:
+                source.itersize = batch_size
+                source.execute('SELECT book_id, name_cleaned, description_cleaned FROM books_unpartitioned;')
+
+                while True:
+                    rows = source.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    buffer = io.StringIO()
+                    for book_id, name, description in rows:
+                        tech_keywords = FeatureExtractor.TECH_MATCHER.matches(f'{name or ""} {description or ""}')
+                        buffer.write(f'{book_id}\t{FeatureExtractor.tech_category(tech_keywords)}\n')
+                    buffer.seek(0)
+                    cursor.copy_expert('COPY book_categories FROM STDIN', buffer)
+
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO books ({", ".join(columns)}, category) '
+                    f'SELECT {", ".join("b." + name for name in columns)}, c.category '
+                    f'FROM books_unpartitioned b JOIN book_categories c ON c.book_id = b.book_id;'
+                )
+                moved = cursor.rowcount
+                cursor.execute('DROP TABLE books_unpartitioned;')
+            conn.commit()
+
+            BookIngestion.finish_table(conn)
+
+        logger.info(f'BookIngestion: moved {moved} books into {len(schema["create_partitions"])} partitions')
+        return moved
+
+    @staticmethod
+    def run(
+        csv_path: str,
+        chunk_size: int = Enumerations.ingest_chunk_size,
+        checkpoint_path: str = Enumerations.ingest_checkpoint_path,
+        workers: int = Enumerations.ingest_workers,
+        truncate: bool = False
+    ) -> int:
+        checkpoint = BookIngestion.load_checkpoint(checkpoint_path, csv_path, chunk_size)
+        fresh = checkpoint['next_chunk'] == 0
+
+        if 'stats' not in checkpoint:
+            checkpoint['stats'] = BookIngestion.compute_stats(csv_path, chunk_size)
+            BookIngestion.save_checkpoint(checkpoint_path, checkpoint)
+
+        stats = checkpoint['stats']
+
+        with MLPostgresConnectionPool.get_connection() as conn:
+            if fresh:
+                BookIngestion.prepare_table(conn, truncate=truncate, drop_index=True)
+
+            chunks = pd.read_csv(csv_path, chunksize=chunk_size, low_memory=False)
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                pending = None
+
+                for chunk_number, chunk in enumerate(chunks):
+                    if chunk_number < checkpoint['next_chunk']:
+                        continue
+
+                    # the next chunk is cleaned in the workers while this one is embedded and loaded
+                    submitted = (chunk_number, chunk, BookIngestion.submit_cleaning(executor, chunk, workers))
+                    if pending is not None:
+                        BookIngestion._load_chunk(conn, pending, chunk_size, stats, checkpoint, checkpoint_path)
+                    pending = submitted
+
+                if pending is not None:
+                    BookIngestion._load_chunk(conn, pending, chunk_size, stats, checkpoint, checkpoint_path)
+
+            BookIngestion.finish_table(conn)
+
+        os.remove(checkpoint_path)
+
+        logger.info(f"BookIngestion: finished, {checkpoint['rows_loaded']} rows loaded")
+        return checkpoint['rows_loaded']
+
+    @staticmethod
+    def _load_chunk(conn, item, chunk_size, stats, checkpoint, checkpoint_path):
+        chunk_number, chunk, futures = item
+        cleaned = [row for future in futures for row in future.result()]
+
+        embeddings = EmbeddingProjection.project(
+            Embedder.encode_batch([row[0] for row in cleaned], use_cache=False)
+        )
+
+        rows = BookIngestion.build_rows(chunk, chunk_number * chunk_size + 1, cleaned, embeddings, stats)
+        BookIngestion.copy_rows(conn, rows)
+
+        checkpoint['next_chunk'] = chunk_number + 1
+        checkpoint['rows_loaded'] = checkpoint.get('rows_loaded', 0) + len(rows)
+        BookIngestion.save_checkpoint(checkpoint_path, checkpoint)
+
+        logger.info(f"BookIngestion: chunk {chunk_number} loaded ({checkpoint['rows_loaded']} rows total)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clean, embed and bulk-load the books corpus into pgvector')
+    parser.add_argument('--csv', default=Enumerations.ingest_csv_path)
+    parser.add_argument('--chunk-size', type=int, default=Enumerations.ingest_chunk_size)
+    parser.add_argument('--checkpoint', default=Enumerations.ingest_checkpoint_path)
+    parser.add_argument('--workers', type=int, default=Enumerations.ingest_workers)
+    parser.add_argument('--truncate', action='store_true', help='empty the books table before a fresh run')
+    parser.add_argument('--partition-existing', action='store_true',
+                        help='move an existing unpartitioned books table into category partitions and exit')
+    args = parser.parse_args()
+
+    if args.partition_existing:
+        print(f'{BookIngestion.partition_table()} books partitioned')
+        return
+
+    BookIngestion.run(
+        csv_path=args.csv,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+        truncate=args.truncate
+    )
+
+
+if __name__ == '__main__':
+    main()
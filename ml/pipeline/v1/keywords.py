@@ -0,0 +1,59 @@
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(keyword.lower() for keyword in keywords if keyword)
+        self._transitions, self._outputs = self._build(self.keywords)
+
+    @staticmethod
+    def _build(keywords: FrozenSet[str]) -> Tuple[List[Dict[str, int]], List[FrozenSet[str]]]:
+        goto = [{}]
+        outputs = [set()]
+
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].add(keyword)
+
+        # resolve failure links into a full transition table so matching never backtracks
+        transitions = [dict(goto[0])] + [None] * (len(goto) - 1)
+        fail = [0] * len(goto)
+        pending = deque(goto[0].values())
+
+        while pending:
+            state = pending.popleft()
+            outputs[state] |= outputs[fail[state]]
+            transitions[state] = dict(transitions[fail[state]])
+
+            for char, child in goto[state].items():
+                fail[child] = transitions[fail[state]].get(char, 0)
+                transitions[state][char] = child
+                pending.append(child)
+
+        return transitions, [frozenset(output) for output in outputs]
+
+    def matches(self, text: str) -> Set[str]:
+        found = set()
+        if not text:
+            return found
+
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+
+        for char in text.lower():
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+
+        return found
+
+    def score(self, text: str) -> int:
+        return len(self.matches(text))
@@ -0,0 +1,31 @@
+from backend.app.core.logging import get_logger
+from ml.Enum.Enumerations import Enumerations
+from typing import Any, List, Dict, Optional
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class RankFusion:
+    @staticmethod
+    def reciprocal_rank(
+        rankings: List[List[Dict[str, Any]]],
+        k: int = Enumerations.hybrid_rrf_k,
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        books: Dict[int, Dict[str, Any]] = {}
+        scores: Dict[int, float] = {}
+
+        for ranking in rankings:
+            for rank, book in enumerate(ranking, start=1):
+                book_id = book["book_id"]
+                scores[book_id] = scores.get(book_id, 0.0) + 1.0 / (k + rank)
+                books.setdefault(book_id, book)
+
+        # sorted() is stable, so ties keep the order of the first ranking
+        fused = sorted(scores, key=scores.get, reverse=True)[:top_k]
+
+        for book_id in fused:
+            books[book_id]["rrf_score"] = scores[book_id]
+
+        logger.info(f"RankFusion: fused {len(rankings)} rankings into {len(fused)} books")
+        return [books[book_id] for book_id in fused]
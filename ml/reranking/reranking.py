@@ -1,12 +1,36 @@
 from backend.app.core.logging import get_logger
 from ml.Enum.Enumerations import Enumerations
+from ml.services.catalog_snapshot import CatalogSnapshot
 from typing import Any, List, Dict
-import pandas as pd
+import numpy as np
 
 logger = get_logger(__name__, system_type='ml')
 
 
 class Reranker:
+    @staticmethod
+    def weights() -> np.ndarray:
+        # same order as CatalogSnapshot.FEATURES
+        return np.array([
+            Enumerations.weight_weighted_rating,
+            Enumerations.weight_counts_of_review,
+            Enumerations.weight_tech_score,
+            Enumerations.weight_publishyear,
+            -Enumerations.weight_average_low,
+        ], dtype=np.float64)
+
+    @staticmethod
+    def _features(books: List[Dict[str, Any]]) -> np.ndarray:
+        # one gather from the catalog snapshot; books it does not hold (or no snapshot) use their own fields
+        features, found = CatalogSnapshot.features([book['book_id'] for book in books])
+        features = features.astype(np.float64)
+
+        for position in np.flatnonzero(~found):
+            book = books[position]
+            features[position] = [book.get(column) or 0.0 for column in CatalogSnapshot.FEATURES]
+
+        return features
+
     @staticmethod
     def reranker(
         books: List[Dict[str, Any]],
@@ -18,36 +42,24 @@ class Reranker:
             return []
 
         try:
-            data = pd.DataFrame(books)
-
-            required_columns = [
-                "similarity",
-                "weighted_rating",
-                "counts_of_review_scaled",
-                "tech_score_scaled",
-                "publishyear_scaled",
-                "average_low_rating"
-            ]
-
-            for col in required_columns:
-                if col not in data.columns:
-                    data[col] = 0.0
-
-            data[required_columns] = data[required_columns].fillna(0.0)
-
-            data['rerank_score'] = (
-                Enumerations.weight_similarity * data["similarity"] +
-                Enumerations.weight_weighted_rating * data["weighted_rating"] +
-                Enumerations.weight_counts_of_review * data["counts_of_review_scaled"] +
-                Enumerations.weight_tech_score * data["tech_score_scaled"] +
-                Enumerations.weight_publishyear * data["publishyear_scaled"] -
-                Enumerations.weight_average_low * data["average_low_rating"]
-            )
-
-            data = data.sort_values('rerank_score', ascending=False)
-
-            logger.info(f"Reranker: reranked {len(data)} books, returning top {top_k}")
-            return data.to_dict(orient='records')[:top_k]
+            features = Reranker._features(books)
+            similarity = np.array([book.get('similarity') or 0.0 for book in books], dtype=np.float64)
+
+            scores = Enumerations.weight_similarity * similarity + features @ Reranker.weights()
+            order = np.argsort(-scores, kind='stable')[:top_k]
+
+            reranked = []
+            for position in order.tolist():
+                book = dict(books[position])
+                book['similarity'] = float(similarity[position])
+                for column, value in zip(CatalogSnapshot.FEATURES, features[position].tolist()):
+                    if book.get(column) is None:
+                        book[column] = value
+                book['rerank_score'] = float(scores[position])
+                reranked.append(book)
+
+            logger.info(f"Reranker: reranked {len(books)} books, returning top {top_k}")
+            return reranked
 
         except Exception as e:
             logger.error(f"Reranker error: {e}", exc_info=True)
@@ -0,0 +1,158 @@
+import asyncio
+import asyncpg
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable
+from backend.app.core.config import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER
+from ml.Enum.Enumerations import Enumerations
+from ml.services.pgvector_codec import PGVectorCodec
+from ml.services.replica_router import ReplicaRouter
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class ReplicaConnectionLost(asyncpg.InterfaceError):
+    pass
+
+
+class MLAsyncPostgresConnectionPool:
+    _pool = None
+    _replica_pools = {}
+    _lock = None
+
+    @staticmethod
+    async def _create_pool(host: str, port: str, **kwargs):
+        return await asyncpg.create_pool(
+            user=DB_USER,
+            password=DB_PASSWORD,
+            database=DB_NAME,
+            host=host,
+            port=port,
+            min_size=Enumerations.min_connections,
+            max_size=Enumerations.max_connections,
+            # the default ef_search and jit are session settings, so queries skip the SET round trip
+            server_settings=Enumerations.session_settings,
+            init=PGVectorCodec.register_asyncpg,
+            **kwargs
+        )
+
+    @classmethod
+    async def get_pool(cls):
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+
+        if cls._pool is None:
+            async with cls._lock:
+                if cls._pool is None:
+                    try:
+                        cls._pool = await cls._create_pool(DB_HOST, DB_PORT)
+                        logger.info("Asynchronous PostgreSQL connection pool initialized for ML services")
+                    except Exception as e:
+                        logger.error(f"Error initializing Asynchronous PostgreSQL connection pool: {e}")
+                        raise
+        return cls._pool
+
+    @classmethod
+    async def get_replica_pool(cls, replica):
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+
+        replica_pool = cls._replica_pools.get(replica)
+        if replica_pool is None:
+            async with cls._lock:
+                replica_pool = cls._replica_pools.get(replica)
+                if replica_pool is None:
+                    replica_pool = await cls._create_pool(*replica, timeout=Enumerations.replica_connect_timeout)
+                    cls._replica_pools[replica] = replica_pool
+                    logger.info(f"Asynchronous PostgreSQL replica pool initialized for {replica[0]}:{replica[1]}")
+        return replica_pool
+
+    @classmethod
+    def _eject(cls, replica, replica_pool, error: Exception = None):
+        ReplicaRouter.eject(replica, error)
+        if replica_pool is not None and cls._replica_pools.get(replica) is replica_pool:
+            del cls._replica_pools[replica]
+            # close() waits for borrowed connections, so requests still on the replica finish first
+            asyncio.get_running_loop().create_task(replica_pool.close())
+
+    @staticmethod
+    def _is_broken(conn) -> bool:
+        try:
+            return conn.is_closed()
+        except asyncpg.InterfaceError:
+            # asyncpg detaches the proxy of a connection the server dropped
+            return True
+
+    @classmethod
+    async def _acquire(cls, read_only: bool):
+        if read_only:
+            for replica in ReplicaRouter.candidates():
+                replica_pool = None
+                try:
+                    replica_pool = await cls.get_replica_pool(replica)
+                    return replica_pool, await replica_pool.acquire(), replica
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                    cls._eject(replica, replica_pool, e)
+
+        primary = await cls.get_pool()
+        return primary, await primary.acquire(), None
+
+    @classmethod
+    @asynccontextmanager
+    async def get_connection(cls, read_only: bool = False):
+        # read_only connections go to a healthy read replica when DB_READ_REPLICAS is set
+        pool, conn, replica = await cls._acquire(read_only)
+        try:
+            yield conn
+        except Exception as e:
+            if replica is not None and cls._is_broken(conn):
+                raise ReplicaConnectionLost(f"Replica {replica[0]}:{replica[1]} failed mid-query: {e}") from e
+            raise
+        finally:
+            broken = replica is not None and cls._is_broken(conn)
+            await pool.release(conn)
+            if broken:
+                cls._eject(replica, pool)
+
+    @classmethod
+    async def read(cls, work: Callable[[Any], Awaitable[Any]]) -> Any:
+        # the replica is already ejected when its connection breaks, so the read runs once more on the primary
+        try:
+            async with cls.get_connection(read_only=True) as conn:
+                return await work(conn)
+        except ReplicaConnectionLost as e:
+            logger.warning(f"{e}, retrying on the primary")
+
+        async with cls.get_connection() as conn:
+            return await work(conn)
+
+    @classmethod
+    async def warm_up(cls, connections: int = Enumerations.warmup_connections) -> int:
+        pool = await cls.get_pool()
+
+        async def ping():
+            async with pool.acquire() as conn:
+                await conn.fetchval('SELECT 1;')
+
+        connections = min(connections, Enumerations.max_connections)
+        await asyncio.gather(*(ping() for _ in range(connections)))
+
+        for replica in ReplicaRouter.replicas():
+            try:
+                await cls.get_replica_pool(replica)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                cls._eject(replica, None, e)
+
+        logger.info(f"ML async connection pool warmed up with {connections} connections")
+        return connections
+
+    @classmethod
+    async def close(cls):
+        if cls._pool is not None:
+            await cls._pool.close()
+            cls._pool = None
+            logger.info("ML async PostgreSQL connection pool closed")
+
+        replica_pools, cls._replica_pools = cls._replica_pools, {}
+        for replica_pool in replica_pools.values():
+            await replica_pool.close()
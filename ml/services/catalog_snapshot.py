@@ -0,0 +1,312 @@
+import os
+import json
+import time
+import argparse
+import threading
+import numpy as np
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+from ml.Enum.Enumerations import Enumerations
+from ml.services.mmap_index import MmapVectorIndex
+from ml.services.postgres_pool import MLPostgresConnectionPool
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class CatalogSnapshot:
+    # rerank features, in the column order of ml.reranking.reranking.Reranker.weights
+    FEATURES = (
+        'weighted_rating',
+        'counts_of_review_scaled',
+        'tech_score_scaled',
+        'publishyear_scaled',
+        'average_low_rating',
+    )
+    # display fields: variable-length text (UTF-8 blob + offsets, as in Arrow) and float columns (NaN = NULL)
+    TEXT_FIELDS = (('name', 'name_cleaned'), ('authors', 'authors'), ('publisher', 'publisher'),
+                   ('description', 'description_cleaned'))
+    NUMERIC_FIELDS = ('rating', 'publishyear', 'average_high_rating')
+
+    BOOK_IDS_FILE = 'book_ids.npy'
+    FEATURES_FILE = 'features.npy'
+    NUMERIC_FILE = 'display_numeric.npy'
+    TEXT_NULLS_FILE = 'display_text_nulls.npy'
+    MANIFEST_FILE = 'manifest.json'
+    CURRENT_FILE = 'CURRENT'
+
+    # one dict swapped as a whole, so a reader never mixes arrays of two snapshots
+    _snapshot = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return Enumerations.catalog_snapshot
+
+    @staticmethod
+    def _export_query(display: bool) -> str:
+        columns = ['book_id', *CatalogSnapshot.FEATURES]
+        if display:
+            columns += [column for _, column in CatalogSnapshot.TEXT_FIELDS] + list(CatalogSnapshot.NUMERIC_FIELDS)
+        return f'SELECT {", ".join(columns)} FROM books ORDER BY book_id;'
+
+    @staticmethod
+    def write(target: str, batches: Iterable[Sequence[tuple]], total: int, display: bool) -> int:
+        features_count = len(CatalogSnapshot.FEATURES)
+        text_count = len(CatalogSnapshot.TEXT_FIELDS)
+
+        book_ids = np.empty(total, dtype=np.int64)
+        # float64 like the FLOAT columns, so snapshot rows carry the exact values Postgres returns
+        features = np.lib.format.open_memmap(
+            os.path.join(target, CatalogSnapshot.FEATURES_FILE), mode='w+', dtype=np.float64,
+            shape=(total, features_count)
+        )
+        if display:
+            numeric = np.empty((total, len(CatalogSnapshot.NUMERIC_FIELDS)), dtype=np.float64)
+            text_nulls = np.zeros((total, text_count), dtype=bool)
+            blobs = [bytearray() for _ in CatalogSnapshot.TEXT_FIELDS]
+            offsets = [np.zeros(total + 1, dtype=np.int64) for _ in CatalogSnapshot.TEXT_FIELDS]
+
+        written = 0
+        for rows in batches:
+            end = written + len(rows)
+            book_ids[written:end] = [row[0] for row in rows]
+            features[written:end] = np.array(
+                [row[1:1 + features_count] for row in rows], dtype=np.float64
+            )
+
+            if display:
+                first_text = 1 + features_count
+                numeric[written:end] = np.array(
+                    [row[first_text + text_count:] for row in rows], dtype=np.float64
+                )
+                for position, row in enumerate(rows, start=written):
+                    for field, value in enumerate(row[first_text:first_text + text_count]):
+                        if value is None:
+                            text_nulls[position, field] = True
+                        else:
+                            blobs[field] += value.encode('utf-8')
+                        offsets[field][position + 1] = len(blobs[field])
+            written = end
+
+        # NULL features score as zero, like the reranker's fillna
+        np.nan_to_num(features, copy=False)
+        features.flush()
+        del features
+        np.save(os.path.join(target, CatalogSnapshot.BOOK_IDS_FILE), book_ids[:written])
+
+        if display:
+            np.save(os.path.join(target, CatalogSnapshot.NUMERIC_FILE), numeric[:written])
+            np.save(os.path.join(target, CatalogSnapshot.TEXT_NULLS_FILE), text_nulls[:written])
+            for (field, _), blob, field_offsets in zip(CatalogSnapshot.TEXT_FIELDS, blobs, offsets):
+                np.save(os.path.join(target, f'{field}.npy'), np.frombuffer(bytes(blob), dtype=np.uint8))
+                np.save(os.path.join(target, f'{field}_offsets.npy'), field_offsets[:written + 1])
+
+        return written
+
+    @staticmethod
+    def export(
+        snapshot_dir: str = Enumerations.catalog_snapshot_dir,
+        display: bool = Enumerations.catalog_snapshot_display,
+        batch_size: int = 10000,
+        keep: int = Enumerations.catalog_snapshot_keep
+    ) -> str:
+        version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        target = os.path.join(snapshot_dir, version)
+        os.makedirs(target, exist_ok=True)
+
+        with MLPostgresConnectionPool.get_connection() as conn:
+            conn.rollback()
+
+            # the catalog version, the count and the rows come from one snapshot of the table
+            with conn.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ;')
+                cursor.execute("SELECT to_regclass('catalog_version') IS NOT NULL;")
+                catalog_version = None
+                if cursor.fetchone()[0]:
+                    cursor.execute(Enumerations.catalog_version_query)
+                    catalog_version = cursor.fetchone()[0]
+                cursor.execute('SELECT count(*) FROM books;')
+                total = cursor.fetchone()[0]
+
+            with conn.cursor(name='catalog_snapshot_export') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(CatalogSnapshot._export_query(display))
+                written = CatalogSnapshot.write(target, iter(lambda: cursor.fetchmany(batch_size), []), total, display)
+
+            conn.rollback()
+
+        with open(os.path.join(target, CatalogSnapshot.MANIFEST_FILE), 'w') as f:
+            json.dump({
+                'version': version,
+                'catalog_version': catalog_version,
+                'count': written,
+                'features': list(CatalogSnapshot.FEATURES),
+                'display': display,
+            }, f, indent=2)
+
+        # atomically switch readers to the new snapshot
+        pointer = os.path.join(snapshot_dir, CatalogSnapshot.CURRENT_FILE)
+        with open(f'{pointer}.tmp', 'w') as f:
+            f.write(version)
+        os.replace(f'{pointer}.tmp', pointer)
+
+        MmapVectorIndex.prune(snapshot_dir, keep)
+        logger.info(f'CatalogSnapshot: exported {written} books (catalog version {catalog_version}) to {target}')
+        return target
+
+    @classmethod
+    def load(cls, snapshot_dir: str = Enumerations.catalog_snapshot_dir) -> bool:
+        version = MmapVectorIndex.current_version(snapshot_dir)
+        if version is None:
+            logger.warning(f'CatalogSnapshot: no snapshot in {snapshot_dir}')
+            return False
+
+        cls._checked_at = time.monotonic()
+        if cls._snapshot is not None and cls._snapshot['version'] == version:
+            return True
+
+        path = os.path.join(snapshot_dir, version)
+        with open(os.path.join(path, cls.MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+
+        # memory-mapped read-only, so every worker process shares the same page cache
+        snapshot = {
+            'version': version,
+            'catalog_version': manifest.get('catalog_version'),
+            'book_ids': np.load(os.path.join(path, cls.BOOK_IDS_FILE)),
+            'features': np.load(os.path.join(path, cls.FEATURES_FILE), mmap_mode='r'),
+            'display': manifest.get('display', False),
+        }
+        if snapshot['display']:
+            snapshot['numeric'] = np.load(os.path.join(path, cls.NUMERIC_FILE), mmap_mode='r')
+            snapshot['text_nulls'] = np.load(os.path.join(path, cls.TEXT_NULLS_FILE), mmap_mode='r')
+            snapshot['text'] = [
+                (
+                    np.load(os.path.join(path, f'{field}.npy'), mmap_mode='r'),
+                    np.load(os.path.join(path, f'{field}_offsets.npy'), mmap_mode='r'),
+                )
+                for field, _ in cls.TEXT_FIELDS
+            ]
+
+        with cls._lock:
+            cls._snapshot = snapshot
+
+        logger.info(f'CatalogSnapshot: loaded snapshot {version} ({len(snapshot["book_ids"])} books, '
+                    f'catalog version {snapshot["catalog_version"]})')
+        return True
+
+    @classmethod
+    def _current(cls) -> Optional[Dict[str, Any]]:
+        if not cls.enabled():
+            return None
+
+        if cls._snapshot is None or time.monotonic() - cls._checked_at >= Enumerations.catalog_snapshot_refresh:
+            try:
+                cls.load()
+            except Exception as e:
+                cls._checked_at = time.monotonic()
+                logger.error(f'CatalogSnapshot: failed to load: {e}', exc_info=True)
+
+        return cls._snapshot
+
+    @classmethod
+    def warm_up(cls) -> int:
+        if not cls.load():
+            raise RuntimeError('catalog snapshot is not available')
+
+        snapshot = cls._snapshot
+        # touch the feature pages once so the first rerank does not fault them in
+        float(np.asarray(snapshot['features']).sum())
+        return len(snapshot['book_ids'])
+
+    @staticmethod
+    def _positions(snapshot: Dict[str, Any], book_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        # book ids are stored sorted, so the dense position of a book is a binary search away
+        ids = np.asarray(book_ids, dtype=np.int64)
+        positions = np.searchsorted(snapshot['book_ids'], ids)
+        positions = np.minimum(positions, len(snapshot['book_ids']) - 1)
+        found = snapshot['book_ids'][positions] == ids if len(snapshot['book_ids']) else np.zeros(len(ids), dtype=bool)
+        return positions, found
+
+    @classmethod
+    def features(cls, book_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        matrix = np.zeros((len(book_ids), len(cls.FEATURES)), dtype=np.float64)
+        snapshot = cls._current()
+        if snapshot is None or len(book_ids) == 0:
+            return matrix, np.zeros(len(book_ids), dtype=bool)
+
+        positions, found = cls._positions(snapshot, book_ids)
+        matrix[found] = snapshot['features'][positions[found]]
+        return matrix, found
+
+    @classmethod
+    def books(cls, book_ids: Sequence[int], catalog_version: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+        snapshot = cls._current()
+        if snapshot is None or not snapshot['display'] or len(book_ids) == 0:
+            return {}
+
+        # a snapshot older than the catalog would serve rows the ingestion job has replaced
+        if catalog_version is not None and snapshot['catalog_version'] not in (None, catalog_version):
+            return {}
+
+        book_ids = list(dict.fromkeys(book_ids))
+        positions, found = cls._positions(snapshot, book_ids)
+        books = {}
+
+        for book_id, position in zip(np.asarray(book_ids)[found].tolist(), positions[found].tolist()):
+            book = {'book_id': book_id}
+            for field, ((name, _), (blob, offsets)) in enumerate(zip(cls.TEXT_FIELDS, snapshot['text'])):
+                if snapshot['text_nulls'][position, field]:
+                    book[name] = None
+                else:
+                    book[name] = bytes(blob[offsets[position]:offsets[position + 1]]).decode('utf-8')
+
+            numeric = snapshot['numeric'][position]
+            book['rating'] = None if np.isnan(numeric[0]) else float(numeric[0])
+            book['publishyear'] = None if np.isnan(numeric[1]) else int(numeric[1])
+            book.update(zip(cls.FEATURES, snapshot['features'][position].tolist()))
+            book['average_high_rating'] = None if np.isnan(numeric[2]) else float(numeric[2])
+            books[book_id] = book
+
+        return books
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        snapshot = cls._snapshot
+        if snapshot is None:
+            return {'enabled': cls.enabled(), 'loaded': False}
+
+        arrays = [snapshot['book_ids'], snapshot['features']]
+        if snapshot['display']:
+            arrays += [snapshot['numeric'], snapshot['text_nulls']] + [array for pair in snapshot['text'] for array in pair]
+
+        return {
+            'enabled': cls.enabled(),
+            'loaded': True,
+            'version': snapshot['version'],
+            'catalog_version': snapshot['catalog_version'],
+            'books': len(snapshot['book_ids']),
+            'display': snapshot['display'],
+            'bytes': sum(array.nbytes for array in arrays),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the book catalog into a memory-mapped columnar snapshot')
+    parser.add_argument('command', choices=['export', 'prune'])
+    parser.add_argument('--dir', default=Enumerations.catalog_snapshot_dir)
+    parser.add_argument('--keep', type=int, default=Enumerations.catalog_snapshot_keep)
+    parser.add_argument('--features-only', action='store_true', help='skip the display fields')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        display = Enumerations.catalog_snapshot_display and not args.features_only
+        print(CatalogSnapshot.export(args.dir, display=display, keep=args.keep))
+    else:
+        MmapVectorIndex.prune(args.dir, args.keep)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import os
+import time
+import argparse
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional
+from ml.Enum.Enumerations import Enumerations
+from ml.services.mmap_index import MmapVectorIndex
+from ml.services.postgres_pool import MLPostgresConnectionPool
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class HnswVectorIndex:
+    INDEX_FILE = 'hnsw_index.bin'
+
+    _index = None
+    _state = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _new_index(dimension: int):
+        import hnswlib
+        # snapshot vectors are L2-normalized, so inner product distance is cosine distance
+        return hnswlib.Index(space='ip', dim=dimension)
+
+    @staticmethod
+    def _index_path(snapshot_dir: str) -> Optional[str]:
+        version = MmapVectorIndex.current_version(snapshot_dir)
+        if version is None:
+            return None
+        return os.path.join(snapshot_dir, version, HnswVectorIndex.INDEX_FILE)
+
+    @staticmethod
+    def _save(index, path: str):
+        index.save_index(f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+
+    @staticmethod
+    def build(
+        snapshot_dir: str = Enumerations.vector_snapshot_dir,
+        m: int = Enumerations.hnsw_local_m,
+        ef_construction: int = Enumerations.hnsw_local_ef_construction,
+        batch_size: int = 10000
+    ) -> str:
+        path = HnswVectorIndex._index_path(snapshot_dir)
+        if path is None:
+            raise RuntimeError(f'no vector snapshot in {snapshot_dir}, run mmap_index export first')
+
+        folder = os.path.dirname(path)
+        embeddings = np.load(os.path.join(folder, MmapVectorIndex.EMBEDDINGS_FILE), mmap_mode='r')
+        book_ids = np.load(os.path.join(folder, MmapVectorIndex.BOOK_IDS_FILE))
+
+        index = HnswVectorIndex._new_index(embeddings.shape[1])
+        index.init_index(max_elements=max(len(book_ids), 1), M=m, ef_construction=ef_construction)
+
+        for start in range(0, len(book_ids), batch_size):
+            end = start + batch_size
+            index.add_items(np.asarray(embeddings[start:end]), book_ids[start:end])
+
+        HnswVectorIndex._save(index, path)
+        logger.info(f'HnswVectorIndex: built index over {len(book_ids)} embeddings at {path}')
+        return path
+
+    @staticmethod
+    def add(index, book_ids: Any, embeddings: Any) -> int:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        required = index.get_current_count() + len(embeddings)
+        if required > index.get_max_elements():
+            index.resize_index(max(required, int(index.get_max_elements() * 1.5)))
+
+        # re-adding an existing book_id replaces its vector
+        index.add_items(embeddings / np.clip(norms, 1e-12, None), np.asarray(book_ids, dtype=np.int64))
+        return len(embeddings)
+
+    @staticmethod
+    def update(snapshot_dir: str = Enumerations.vector_snapshot_dir, batch_size: int = 10000) -> int:
+        from pgvector.psycopg2 import register_vector
+
+        path = HnswVectorIndex._index_path(snapshot_dir)
+        if path is None or not os.path.exists(path):
+            raise RuntimeError(f'no HNSW index in {snapshot_dir}, run build first')
+
+        index = HnswVectorIndex._new_index(Enumerations.embedding_storage_dimension)
+        index.load_index(path)
+        labels = index.get_ids_list()
+        last_book_id = int(max(labels)) if labels else 0
+        added = 0
+
+        with MLPostgresConnectionPool.get_connection() as conn:
+            register_vector(conn)
+
+            with conn.cursor(name='hnsw_index_update') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(
+                    'SELECT book_id, embedding::vector FROM books '
+                    'WHERE embedding IS NOT NULL AND book_id > %s ORDER BY book_id;',
+                    (last_book_id,)
+                )
+
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    added += HnswVectorIndex.add(
+                        index,
+                        [row[0] for row in rows],
+                        [row[1].to_numpy() if hasattr(row[1], 'to_numpy') else row[1] for row in rows]
+                    )
+
+            conn.rollback()
+
+        if added:
+            HnswVectorIndex._save(index, path)
+
+        logger.info(f'HnswVectorIndex: added {added} books after book_id {last_book_id}')
+        return added
+
+    @classmethod
+    def load(cls, snapshot_dir: str = Enumerations.vector_snapshot_dir) -> bool:
+        path = cls._index_path(snapshot_dir)
+        if path is None or not os.path.exists(path):
+            logger.warning(f'HnswVectorIndex: no index in {snapshot_dir}')
+            return False
+
+        state = (path, os.path.getmtime(path))
+        cls._checked_at = time.monotonic()
+        if state == cls._state:
+            return True
+
+        index = cls._new_index(Enumerations.embedding_storage_dimension)
+        index.load_index(path)
+        index.set_ef(Enumerations.hnsw_local_ef_search)
+
+        with cls._lock:
+            cls._index, cls._state = index, state
+
+        logger.info(f'HnswVectorIndex: loaded {path} ({index.get_current_count()} embeddings)')
+        return True
+
+    @classmethod
+    def _ensure_loaded(cls) -> bool:
+        if cls._index is not None and time.monotonic() - cls._checked_at < Enumerations.vector_snapshot_refresh:
+            return True
+
+        return cls.load()
+
+    @classmethod
+    def warm_up(cls) -> int:
+        if not cls.load():
+            raise RuntimeError('HNSW index is not available')
+
+        cls.search(np.ones(cls._index.dim, dtype=np.float32), 1)
+        return cls._index.get_current_count()
+
+    @classmethod
+    def search(
+        cls,
+        query_embedding: Any,
+        top_k: int = Enumerations.top_k,
+        ef: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        if not cls._ensure_loaded():
+            raise RuntimeError('HNSW index is not available')
+
+        index = cls._index
+        top_k = min(top_k, index.get_current_count())
+        if top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        ef = max(ef or Enumerations.hnsw_local_ef_search, top_k)
+
+        if ef == Enumerations.hnsw_local_ef_search:
+            labels, distances = index.knn_query(query, k=top_k)
+        else:
+            # ef is a property of the index object, so a custom value is set and restored under the lock
+            with cls._lock:
+                index.set_ef(ef)
+                try:
+                    labels, distances = index.knn_query(query, k=top_k)
+                finally:
+                    index.set_ef(Enumerations.hnsw_local_ef_search)
+
+        return [
+            {'book_id': int(label), 'similarity': float(1.0 - distance)}
+            for label, distance in zip(labels[0], distances[0])
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or extend the in-process HNSW index of the current vector snapshot')
+    parser.add_argument('command', choices=['build', 'update'])
+    parser.add_argument('--dir', default=Enumerations.vector_snapshot_dir)
+    parser.add_argument('--m', type=int, default=Enumerations.hnsw_local_m)
+    parser.add_argument('--ef-construction', type=int, default=Enumerations.hnsw_local_ef_construction)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(HnswVectorIndex.build(args.dir, args.m, args.ef_construction))
+    else:
+        print(f'{HnswVectorIndex.update(args.dir)} books added')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+from backend.app.core.logging import get_logger
+from ml.services.postgres_pool import MLPostgresConnectionPool
+from ml.services.async_postgres_pool import MLAsyncPostgresConnectionPool
+from typing import Any, Dict, List, Union
+from ml.Enum.Enumerations import Enumerations
+from ml.models.v1.projection import EmbeddingProjection
+from ml.services.pgvector_codec import QueryVector
+from ml.services.prepared_statements import PreparedStatements
+import numpy as np
+import psycopg2.extras
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class LexicalService:
+    @staticmethod
+    def _query_vector(query_embedding: Union[List[float], np.ndarray]) -> QueryVector:
+        # the similarity column keeps lexical-only hits comparable for the reranker
+        if EmbeddingProjection.enabled():
+            query_embedding = EmbeddingProjection.project(query_embedding)
+        return QueryVector(query_embedding)
+
+    @staticmethod
+    def _to_books(results) -> List[Dict[str, Any]]:
+        books = [dict(result) for result in results]
+        for book in books:
+            book['similarity'] = float(book['similarity'])
+        return books
+
+    @staticmethod
+    def search_books_with_metadata(
+        user_text: str,
+        query_embedding: Union[List[float], np.ndarray],
+        top_k=Enumerations.top_k
+    ) -> List[Dict[str, Any]]:
+        if not user_text or not user_text.strip():
+            return []
+
+        try:
+            def fetch(conn):
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    PreparedStatements.execute(
+                        cursor,
+                        Enumerations.lexical_metadata_query,
+                        (user_text, top_k, LexicalService._query_vector(query_embedding))
+                    )
+                    return cursor.fetchall()
+
+            results = MLPostgresConnectionPool.read(fetch)
+
+            books = LexicalService._to_books(results)
+
+            logger.info(f'LexicalService: found {len(books)} full-text matches')
+            return books
+
+        except Exception as e:
+            logger.error(f'LexicalService error: {e}', exc_info=True)
+            return []
+
+    @staticmethod
+    async def search_books_with_metadata_async(
+        user_text: str,
+        query_embedding: Union[List[float], np.ndarray],
+        top_k=Enumerations.top_k
+    ) -> List[Dict[str, Any]]:
+        if not user_text or not user_text.strip():
+            return []
+
+        try:
+            results = await MLAsyncPostgresConnectionPool.read(lambda conn: conn.fetch(
+                Enumerations.lexical_metadata_query_async,
+                user_text,
+                top_k,
+                LexicalService._query_vector(query_embedding)
+            ))
+
+            books = LexicalService._to_books(results)
+
+            logger.info(f'LexicalService: found {len(books)} full-text matches')
+            return books
+
+        except Exception as e:
+            logger.error(f'LexicalService error: {e}', exc_info=True)
+            return []
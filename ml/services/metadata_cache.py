@@ -0,0 +1,146 @@
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ml.Enum.Enumerations import Enumerations
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class MetadataCache:
+    # book_id -> (expires_at, book, approximate bytes)
+    _lru = OrderedDict()
+    _lock = threading.Lock()
+    _version = None
+    _checked_at = 0.0
+    _version_failures = 0
+    _bytes = 0
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return Enumerations.metadata_cache and Enumerations.metadata_cache_size > 0
+
+    @staticmethod
+    def _size(book: Dict[str, Any]) -> int:
+        # column names are shared between rows, so only the dict and its values are counted
+        return sys.getsizeof(book) + sum(sys.getsizeof(value) for value in book.values())
+
+    @classmethod
+    def version(cls) -> Optional[int]:
+        return cls._version
+
+    @classmethod
+    def version_due(cls) -> bool:
+        interval = min(
+            Enumerations.metadata_cache_version_check * 2 ** cls._version_failures,
+            max(Enumerations.metadata_cache_version_backoff, Enumerations.metadata_cache_version_check)
+        )
+        return time.monotonic() - cls._checked_at >= interval
+
+    @classmethod
+    def version_unavailable(cls, error: Exception):
+        # a missing catalog_version table fails on every read, so it is reported once and polled less and less often
+        with cls._lock:
+            cls._checked_at = time.monotonic()
+            cls._version_failures = min(cls._version_failures + 1, 32)
+            first = cls._version_failures == 1
+
+        if first:
+            logger.warning(f'MetadataCache: catalog version unavailable, cache relies on its TTL: {error}')
+        else:
+            logger.debug(f'MetadataCache: catalog version still unavailable ({cls._version_failures} failures): {error}')
+
+    @classmethod
+    def set_version(cls, version: Optional[int]):
+        # a new catalog version drops every cached row at once; None (no version readable) keeps the cache
+        with cls._lock:
+            cls._checked_at = time.monotonic()
+            if version is None:
+                return
+
+            if cls._version_failures:
+                logger.info(f'MetadataCache: catalog version readable again after {cls._version_failures} failed reads')
+                cls._version_failures = 0
+            if version == cls._version:
+                return
+
+            if cls._version is not None:
+                logger.info(f'MetadataCache: catalog version {cls._version} -> {version}, dropping {len(cls._lru)} books')
+            cls._lru.clear()
+            cls._bytes = 0
+            cls._version = version
+
+    @classmethod
+    def get_many(cls, book_ids: Iterable[int]) -> Tuple[Dict[int, Dict[str, Any]], List[int], Optional[int]]:
+        found, missing = {}, []
+        now = time.monotonic()
+
+        with cls._lock:
+            for book_id in dict.fromkeys(book_ids):
+                entry = cls._lru.get(book_id)
+                if entry is not None and entry[0] > now:
+                    cls._lru.move_to_end(book_id)
+                    # callers attach scores to the rows they get back
+                    found[book_id] = dict(entry[1])
+                    continue
+
+                if entry is not None:
+                    del cls._lru[book_id]
+                    cls._bytes -= entry[2]
+                missing.append(book_id)
+
+            cls._hits += len(found)
+            cls._misses += len(missing)
+            return found, missing, cls._version
+
+    @classmethod
+    def set_many(cls, books: Iterable[Dict[str, Any]], version: Optional[int]):
+        expires_at = time.monotonic() + Enumerations.metadata_cache_ttl
+
+        with cls._lock:
+            # rows read before a catalog version change may already be stale
+            if version != cls._version:
+                return
+
+            for book in books:
+                book = dict(book)
+                size = cls._size(book)
+                previous = cls._lru.pop(book['book_id'], None)
+                if previous is not None:
+                    cls._bytes -= previous[2]
+                cls._lru[book['book_id']] = (expires_at, book, size)
+                cls._bytes += size
+
+            while len(cls._lru) > Enumerations.metadata_cache_size:
+                _, (_, _, size) = cls._lru.popitem(last=False)
+                cls._bytes -= size
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            lookups = cls._hits + cls._misses
+            return {
+                'enabled': cls.enabled(),
+                'catalog_version': cls._version,
+                'books': len(cls._lru),
+                'max_books': Enumerations.metadata_cache_size,
+                'bytes': cls._bytes,
+                'hits': cls._hits,
+                'misses': cls._misses,
+                'hit_ratio': round(cls._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._lru.clear()
+            cls._bytes = 0
+            cls._hits = 0
+            cls._misses = 0
+            cls._version = None
+            cls._checked_at = 0.0
+            cls._version_failures = 0
@@ -0,0 +1,62 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class MetadataFilter:
+    FIELDS = ('min_year', 'max_year', 'min_rating', 'publisher', 'author', 'category')
+
+    CONDITIONS = {
+        'min_year': 'publishyear >= {}',
+        'max_year': 'publishyear <= {}',
+        'min_rating': 'rating >= {}',
+        'publisher': 'lower(publisher) = lower({})',
+        'author': "authors ILIKE {} ESCAPE '\\'",
+        # equality on the partition key lets the planner prune every other partition
+        'category': 'category = {}',
+    }
+
+    @staticmethod
+    def normalize(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not filters:
+            return {}
+
+        normalized = {}
+        for field in MetadataFilter.FIELDS:
+            value = filters.get(field)
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == '':
+                continue
+            normalized[field] = value
+
+        return normalized
+
+    @staticmethod
+    def _value(field: str, value: Any) -> Any:
+        if field == 'author':
+            escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            return f'%{escaped}%'
+        if field in ('min_year', 'max_year'):
+            return int(value)
+        if field == 'min_rating':
+            return float(value)
+        return value
+
+    @staticmethod
+    def where(filters: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        conditions, params = [], {}
+
+        for field, value in filters.items():
+            conditions.append(MetadataFilter.CONDITIONS[field].format(f'%({field})s'))
+            params[field] = MetadataFilter._value(field, value)
+
+        return ' AND '.join(conditions) or 'TRUE', params
+
+    @staticmethod
+    def where_async(filters: Dict[str, Any], first_index: int) -> Tuple[str, List[Any]]:
+        conditions, params = [], []
+
+        for field, value in filters.items():
+            conditions.append(MetadataFilter.CONDITIONS[field].format(f'${first_index + len(params)}'))
+            params.append(MetadataFilter._value(field, value))
+
+        return ' AND '.join(conditions) or 'TRUE', params
@@ -1,7 +1,11 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from ml.Enum.Enumerations import Enumerations
 from backend.app.core.logging import get_logger
 from ml.services.postgres_pool import MLPostgresConnectionPool
+from ml.services.async_postgres_pool import MLAsyncPostgresConnectionPool
+from ml.services.metadata_cache import MetadataCache
+from ml.services.catalog_snapshot import CatalogSnapshot
+from ml.services.prepared_statements import PreparedStatements
 import psycopg2
 import psycopg2.extras
 
@@ -9,6 +13,32 @@ logger = get_logger(__name__, system_type='ml')
 
 
 class MetadataService:
+    @staticmethod
+    def _ordered(book_ids: List[int], books: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [books[book_id] for book_id in dict.fromkeys(book_ids) if book_id in books]
+
+    @staticmethod
+    def _catalog_version() -> Optional[int]:
+        try:
+            def fetch(conn):
+                with conn.cursor() as cursor:
+                    cursor.execute(Enumerations.catalog_version_query)
+                    return cursor.fetchone()
+
+            row = MLPostgresConnectionPool.read(fetch)
+            return row[0] if row else None
+        except Exception as e:
+            MetadataCache.version_unavailable(e)
+            return None
+
+    @staticmethod
+    async def _catalog_version_async() -> Optional[int]:
+        try:
+            return await MLAsyncPostgresConnectionPool.read(lambda conn: conn.fetchval(Enumerations.catalog_version_query))
+        except Exception as e:
+            MetadataCache.version_unavailable(e)
+            return None
+
     @staticmethod
     def get_books_metadata(
         book_ids: List[int]
@@ -18,18 +48,71 @@ class MetadataService:
             return []
 
         try:
-            with MLPostgresConnectionPool.get_connection() as conn:
-                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                    query = Enumerations.metadata_service_query
+            if MetadataCache.enabled() and MetadataCache.version_due():
+                MetadataCache.set_version(MetadataService._catalog_version())
+
+            # the catalog snapshot answers first, then the LRU cache, then Postgres
+            cached = CatalogSnapshot.books(book_ids, MetadataCache.version())
+            missing, version = [book_id for book_id in dict.fromkeys(book_ids) if book_id not in cached], None
+            if missing and MetadataCache.enabled():
+                found, missing, version = MetadataCache.get_many(missing)
+                cached.update(found)
+
+            # only the books the cache does not hold are read, in one ANY() query
+            if missing:
+                def fetch(conn):
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                        PreparedStatements.execute(cursor, Enumerations.metadata_service_query, (missing, ))
+                        return cursor.fetchall()
+
+                results = MLPostgresConnectionPool.read(fetch)
+
+                fetched = [dict(result) for result in results]
+                if MetadataCache.enabled():
+                    MetadataCache.set_many(fetched, version)
+                cached.update((book['book_id'], book) for book in fetched)
+
+            books = MetadataService._ordered(book_ids, cached)
+
+            logger.info(f"MetaDataService: retrieved metadata for {len(books)} books ({len(missing)} from the database)")
+            return books
+
+        except Exception as e:
+            logger.error(f"MetaDataService error: {e}", exc_info=True)
+            return []
+
+    @staticmethod
+    async def get_books_metadata_async(
+        book_ids: List[int]
+    ) -> List[Dict[str, Any]]:
+        if not book_ids:
+            logger.warning("MetaDataService: empty book_ids list provided")
+            return []
+
+        try:
+            if MetadataCache.enabled() and MetadataCache.version_due():
+                MetadataCache.set_version(await MetadataService._catalog_version_async())
+
+            # the catalog snapshot answers first, then the LRU cache, then Postgres
+            cached = CatalogSnapshot.books(book_ids, MetadataCache.version())
+            missing, version = [book_id for book_id in dict.fromkeys(book_ids) if book_id not in cached], None
+            if missing and MetadataCache.enabled():
+                found, missing, version = MetadataCache.get_many(missing)
+                cached.update(found)
+
+            if missing:
+                results = await MLAsyncPostgresConnectionPool.read(
+                    lambda conn: conn.fetch(Enumerations.metadata_service_query_async, missing)
+                )
 
-                    cursor.execute(query, (book_ids, ))
-                    results = cursor.fetchall()
+                fetched = [dict(result) for result in results]
+                if MetadataCache.enabled():
+                    MetadataCache.set_many(fetched, version)
+                cached.update((book['book_id'], book) for book in fetched)
 
-            books = [
-                dict(result) for result in results
-            ]
+            books = MetadataService._ordered(book_ids, cached)
 
-            logger.info(f"MetaDataService: retrieved metadata for {len(books)} books")
+            logger.info(f"MetaDataService: retrieved metadata for {len(books)} books ({len(missing)} from the database)")
             return books
 
         except Exception as e:
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import threading
+import numpy as np
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from ml.Enum.Enumerations import Enumerations
+from ml.services.postgres_pool import MLPostgresConnectionPool
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class MmapVectorIndex:
+    EMBEDDINGS_FILE = 'embeddings.npy'
+    BOOK_IDS_FILE = 'book_ids.npy'
+    MANIFEST_FILE = 'manifest.json'
+    CURRENT_FILE = 'CURRENT'
+
+    _embeddings = None
+    _book_ids = None
+    _version = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def current_version(snapshot_dir: str) -> Optional[str]:
+        try:
+            with open(os.path.join(snapshot_dir, MmapVectorIndex.CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def export(
+        snapshot_dir: str = Enumerations.vector_snapshot_dir,
+        batch_size: int = 10000,
+        keep: int = Enumerations.vector_snapshot_keep
+    ) -> str:
+        from pgvector.psycopg2 import register_vector
+
+        version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        target = os.path.join(snapshot_dir, version)
+        os.makedirs(target, exist_ok=True)
+
+        with MLPostgresConnectionPool.get_connection() as conn:
+            register_vector(conn)
+            conn.rollback()
+
+            # count and rows come from one snapshot so the preallocated matrix matches exactly
+            with conn.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ;')
+                cursor.execute('SELECT count(*) FROM books WHERE embedding IS NOT NULL;')
+                total = cursor.fetchone()[0]
+
+            embeddings = np.lib.format.open_memmap(
+                os.path.join(target, MmapVectorIndex.EMBEDDINGS_FILE),
+                mode='w+',
+                dtype=np.float32,
+                shape=(total, Enumerations.embedding_storage_dimension)
+            )
+            book_ids = np.empty(total, dtype=np.int64)
+            written = 0
+
+            # server-side cursor so the whole table never sits in client memory
+            with conn.cursor(name='mmap_index_export') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(
+                    'SELECT book_id, embedding::vector FROM books '
+                    'WHERE embedding IS NOT NULL ORDER BY book_id;'
+                )
+
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    end = written + len(rows)
+                    vectors = np.vstack([
+                        row[1].to_numpy() if hasattr(row[1], 'to_numpy') else row[1] for row in rows
+                    ]).astype(np.float32)
+                    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+
+                    embeddings[written:end] = vectors / np.clip(norms, 1e-12, None)
+                    book_ids[written:end] = [row[0] for row in rows]
+                    written = end
+
+            conn.rollback()
+
+        embeddings.flush()
+        del embeddings
+        np.save(os.path.join(target, MmapVectorIndex.BOOK_IDS_FILE), book_ids)
+
+        with open(os.path.join(target, MmapVectorIndex.MANIFEST_FILE), 'w') as f:
+            json.dump({
+                'version': version,
+                'count': written,
+                'dimension': Enumerations.embedding_storage_dimension,
+                'model': Enumerations.embedding_model_name,
+                'storage': Enumerations.embedding_storage_type,
+                'projection': Enumerations.embedding_projection,
+            }, f, indent=2)
+
+        # atomically switch readers to the new snapshot
+        pointer = os.path.join(snapshot_dir, MmapVectorIndex.CURRENT_FILE)
+        with open(f'{pointer}.tmp', 'w') as f:
+            f.write(version)
+        os.replace(f'{pointer}.tmp', pointer)
+
+        MmapVectorIndex.prune(snapshot_dir, keep)
+        logger.info(f'MmapVectorIndex: exported {written} embeddings to {target}')
+        return target
+
+    @staticmethod
+    def prune(snapshot_dir: str = Enumerations.vector_snapshot_dir, keep: int = Enumerations.vector_snapshot_keep):
+        current = MmapVectorIndex.current_version(snapshot_dir)
+        versions = sorted(
+            name for name in os.listdir(snapshot_dir)
+            if os.path.isfile(os.path.join(snapshot_dir, name, MmapVectorIndex.MANIFEST_FILE))
+        )
+
+        for name in versions[:-max(keep, 1)]:
+            if name != current:
+                shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+                logger.info(f'MmapVectorIndex: removed old snapshot {name}')
+
+    @classmethod
+    def load(cls, snapshot_dir: str = Enumerations.vector_snapshot_dir) -> bool:
+        version = cls.current_version(snapshot_dir)
+        if version is None:
+            logger.warning(f'MmapVectorIndex: no snapshot in {snapshot_dir}')
+            return False
+
+        cls._checked_at = time.monotonic()
+        if version == cls._version:
+            return True
+
+        path = os.path.join(snapshot_dir, version)
+        embeddings = np.load(os.path.join(path, cls.EMBEDDINGS_FILE), mmap_mode='r')
+        book_ids = np.load(os.path.join(path, cls.BOOK_IDS_FILE))
+
+        with cls._lock:
+            cls._embeddings, cls._book_ids, cls._version = embeddings, book_ids, version
+
+        logger.info(f'MmapVectorIndex: loaded snapshot {version} ({len(book_ids)} embeddings)')
+        return True
+
+    @classmethod
+    def _ensure_loaded(cls) -> bool:
+        if cls._embeddings is not None and time.monotonic() - cls._checked_at < Enumerations.vector_snapshot_refresh:
+            return True
+
+        return cls.load()
+
+    @classmethod
+    def warm_up(cls) -> int:
+        if not cls.load():
+            raise RuntimeError('vector snapshot is not available')
+
+        # touch every page once so the first query does not fault them in
+        cls.search(np.zeros(cls._embeddings.shape[1], dtype=np.float32), 1)
+        return len(cls._book_ids)
+
+    @classmethod
+    def search(
+        cls,
+        query_embedding: Any,
+        top_k: int = Enumerations.top_k,
+        ef: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        # exact search; ef is accepted so every VectorService backend shares one signature
+        if not cls._ensure_loaded():
+            raise RuntimeError('vector snapshot is not available')
+
+        with cls._lock:
+            embeddings, book_ids = cls._embeddings, cls._book_ids
+
+        top_k = min(top_k, len(book_ids))
+        if top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        scores = embeddings @ query
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+
+        return [
+            {'book_id': int(book_ids[i]), 'similarity': float(scores[i])}
+            for i in best
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the books embeddings into a memory-mapped search snapshot')
+    parser.add_argument('command', choices=['export', 'prune'])
+    parser.add_argument('--dir', default=Enumerations.vector_snapshot_dir)
+    parser.add_argument('--keep', type=int, default=Enumerations.vector_snapshot_keep)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        print(MmapVectorIndex.export(args.dir, keep=args.keep))
+    else:
+        MmapVectorIndex.prune(args.dir, args.keep)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import struct
+import numpy as np
+from typing import Any, Iterable, List
+
+
+class PGBinary:
+    COPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+    COPY_TRAILER = struct.pack('>h', -1)
+    NULL = struct.pack('>i', -1)
+
+    @staticmethod
+    def vector(values: Any) -> bytes:
+        array = np.asarray(values, dtype='>f4')
+        return struct.pack('>HH', array.shape[0], 0) + array.tobytes()
+
+    @staticmethod
+    def halfvec(values: Any) -> bytes:
+        array = np.asarray(values, dtype='>f2')
+        return struct.pack('>HH', array.shape[0], 0) + array.tobytes()
+
+    @staticmethod
+    def copy_header() -> bytes:
+        return PGBinary.COPY_SIGNATURE + struct.pack('>ii', 0, 0)
+
+    @staticmethod
+    def _field(value: Any, kind: str) -> bytes:
+        if value is None:
+            return PGBinary.NULL
+
+        if kind == 'int4':
+            payload = struct.pack('>i', int(value))
+        elif kind == 'float8':
+            if value != value:
+                return PGBinary.NULL
+            payload = struct.pack('>d', float(value))
+        elif kind == 'text':
+            payload = str(value).encode('utf-8')
+        elif kind == 'vector':
+            payload = PGBinary.vector(value)
+        elif kind == 'halfvec':
+            payload = PGBinary.halfvec(value)
+        else:
+            raise ValueError(f'unsupported binary COPY type: {kind}')
+
+        return struct.pack('>i', len(payload)) + payload
+
+    @staticmethod
+    def copy_rows(rows: Iterable[Iterable[Any]], kinds: List[str]) -> bytes:
+        parts = [PGBinary.copy_header()]
+        row_header = struct.pack('>h', len(kinds))
+
+        for row in rows:
+            parts.append(row_header)
+            parts.extend(PGBinary._field(value, kind) for value, kind in zip(row, kinds))
+
+        parts.append(PGBinary.COPY_TRAILER)
+        return b''.join(parts)
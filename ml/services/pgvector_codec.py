@@ -0,0 +1,72 @@
+import struct
+import numpy as np
+from typing import Any
+from psycopg2.extensions import AsIs, register_adapter
+from ml.Enum.Enumerations import Enumerations
+from ml.services.pg_binary import PGBinary
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class QueryVector:
+    __slots__ = ('values',)
+
+    def __init__(self, values: Any):
+        self.values = np.asarray(values, dtype=np.float32).ravel()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, QueryVector) and np.array_equal(self.values, other.values)
+
+    def __repr__(self) -> str:
+        return f'QueryVector({self.values.shape[0]} dims)'
+
+
+class PGVectorCodec:
+    _formats = {}
+
+    @staticmethod
+    def text(values: Any) -> str:
+        values = np.asarray(values, dtype=np.float32).ravel()
+        template = PGVectorCodec._formats.get(len(values))
+
+        # 9 significant digits round-trip float32 exactly at about half the length of a float64 repr
+        if template is None:
+            template = '[' + ','.join(['%.9g'] * len(values)) + ']'
+            PGVectorCodec._formats[len(values)] = template
+
+        return template % tuple(values.tolist())
+
+    @staticmethod
+    def adapt_psycopg2(vector: QueryVector) -> AsIs:
+        return AsIs(f"'{PGVectorCodec.text(vector.values)}'::{Enumerations.embedding_storage}")
+
+    @staticmethod
+    def encode(values: Any) -> bytes:
+        if Enumerations.embedding_storage == 'halfvec':
+            return PGBinary.halfvec(values)
+        return PGBinary.vector(values)
+
+    @staticmethod
+    def decode(data: bytes) -> np.ndarray:
+        dimension = struct.unpack_from('>H', data)[0]
+        dtype = '>f2' if Enumerations.embedding_storage == 'halfvec' else '>f4'
+        return np.frombuffer(data, dtype=dtype, count=dimension, offset=4).astype(np.float32)
+
+    @staticmethod
+    async def register_asyncpg(conn):
+        try:
+            await conn.set_type_codec(
+                Enumerations.embedding_storage,
+                schema='public',
+                encoder=lambda value: PGVectorCodec.encode(
+                    value.values if isinstance(value, QueryVector) else value
+                ),
+                decoder=PGVectorCodec.decode,
+                format='binary'
+            )
+        except Exception as e:
+            logger.warning(f'PGVectorCodec: {Enumerations.embedding_storage} codec not registered: {e}')
+
+
+register_adapter(QueryVector, PGVectorCodec.adapt_psycopg2)
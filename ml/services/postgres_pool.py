@@ -1,41 +1,180 @@
+import threading
 import psycopg2
 from psycopg2 import pool
 from backend.app.core.config import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER
 from ml.Enum.Enumerations import Enumerations
+from ml.services.replica_router import ReplicaRouter
+from ml.services.prepared_statements import PreparedConnection, PreparedStatements
 from backend.app.core.logging import get_logger
 from contextlib import contextmanager
+from typing import Any, Callable
 
 logger = get_logger(__name__, system_type='ml')
 
 
+class ReplicaConnectionLost(psycopg2.OperationalError):
+    pass
+
+
+class MLThreadedConnectionPool(pool.ThreadedConnectionPool):
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.in_use = 0
+
+    # both run under the pool lock held by getconn/putconn
+    def _getconn(self, key=None):
+        conn = super()._getconn(key)
+        self.in_use += 1
+        return conn
+
+    def _putconn(self, conn, key=None, close=False):
+        # psycopg2 closes every returned connection beyond minconn; idle ones are kept up to maxconn so a
+        # partition fan-out reuses its connections and their prepared statements instead of reconnecting
+        minconn, self.minconn = self.minconn, self.maxconn
+        try:
+            super()._putconn(conn, key, close)
+        finally:
+            self.minconn = minconn
+        self.in_use -= 1
+
+
 class MLPostgresConnectionPool:
     _pool = None
+    _replica_pools = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _create_pool(host: str, port: str, **kwargs):
+        return MLThreadedConnectionPool(
+            minconn=Enumerations.min_connections,
+            maxconn=Enumerations.max_connections,
+            dbname=DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            host=host,
+            port=port,
+            # session settings are applied at connect time and every connection tracks its prepared statements
+            options=PreparedStatements.connection_options(),
+            connection_factory=PreparedConnection,
+            **kwargs
+        )
 
     @classmethod
     def get_pool(cls):
         if cls._pool is None:
             try:
-                cls._pool = psycopg2.pool.ThreadedConnectionPool(
-                    minconn=Enumerations.min_connections,
-                    maxconn=Enumerations.max_connections,
-                    dbname=DB_NAME,
-                    user=DB_USER,
-                    password=DB_PASSWORD,
-                    host=DB_HOST,
-                    port=DB_PORT
-                )
+                cls._pool = cls._create_pool(DB_HOST, DB_PORT)
                 logger.info("Synchronous PostgreSQL connection pool initialized for ML services")
             except Exception as e:
                 logger.error(f"Error initializing Synchronous PostgreSQL connection pool: {e}")
                 raise
         return cls._pool
 
+    @classmethod
+    def get_replica_pool(cls, replica):
+        replica_pool = cls._replica_pools.get(replica)
+        if replica_pool is None:
+            with cls._lock:
+                replica_pool = cls._replica_pools.get(replica)
+                if replica_pool is None:
+                    replica_pool = cls._create_pool(
+                        *replica,
+                        connect_timeout=Enumerations.replica_connect_timeout
+                    )
+                    cls._replica_pools[replica] = replica_pool
+                    logger.info(f"Synchronous PostgreSQL replica pool initialized for {replica[0]}:{replica[1]}")
+        return replica_pool
+
+    @staticmethod
+    def _close_idle(replica_pool):
+        # closeall() would also close connections other requests are still using
+        if not replica_pool.closed and not replica_pool.in_use:
+            replica_pool.closeall()
+
+    @classmethod
+    def _eject(cls, replica, replica_pool, error: Exception = None):
+        ReplicaRouter.eject(replica, error)
+        # a dropped pool is closed as soon as its last borrowed connection comes back
+        with cls._lock:
+            if replica_pool is not None and cls._replica_pools.get(replica) is replica_pool:
+                del cls._replica_pools[replica]
+                cls._close_idle(replica_pool)
+
+    @classmethod
+    def _release(cls, pool, conn, replica):
+        if replica is not None and conn.closed:
+            cls._eject(replica, pool)
+        pool.putconn(conn)
+
+        if replica is not None and cls._replica_pools.get(replica) is not pool:
+            with cls._lock:
+                cls._close_idle(pool)
+
+    @classmethod
+    def _checkout(cls, read_only: bool):
+        if read_only:
+            for replica in ReplicaRouter.candidates():
+                replica_pool = None
+                try:
+                    replica_pool = cls.get_replica_pool(replica)
+                    return replica_pool, replica_pool.getconn(), replica
+                except psycopg2.pool.PoolError:
+                    # an exhausted (or just dropped) replica pool spills over to the next host without ejecting it
+                    continue
+                except psycopg2.OperationalError as e:
+                    cls._eject(replica, replica_pool, e)
+
+        primary = cls.get_pool()
+        return primary, primary.getconn(), None
+
     @classmethod
     @contextmanager
-    def get_connection(cls):
-        pool = cls.get_pool()
-        conn = pool.getconn()
+    def get_connection(cls, read_only: bool = False):
+        # read_only connections go to a healthy read replica when DB_READ_REPLICAS is set
+        pool, conn, replica = cls._checkout(read_only)
         try:
             yield conn
+        except Exception as e:
+            if replica is not None and conn.closed:
+                raise ReplicaConnectionLost(f"Replica {replica[0]}:{replica[1]} failed mid-query: {e}") from e
+            raise
         finally:
-            pool.putconn(conn)
+            cls._release(pool, conn, replica)
+
+    @classmethod
+    def read(cls, work: Callable[[Any], Any]) -> Any:
+        # the replica is already ejected when its connection breaks, so the read runs once more on the primary
+        try:
+            with cls.get_connection(read_only=True) as conn:
+                return work(conn)
+        except ReplicaConnectionLost as e:
+            logger.warning(f"{e}, retrying on the primary")
+
+        with cls.get_connection() as conn:
+            return work(conn)
+
+    @classmethod
+    def warm_up(cls, connections: int = Enumerations.warmup_connections) -> int:
+        pool = cls.get_pool()
+        opened = []
+
+        try:
+            for _ in range(min(connections, Enumerations.max_connections)):
+                conn = pool.getconn()
+                opened.append(conn)
+
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT 1;')
+                    cursor.fetchone()
+        finally:
+            for conn in opened:
+                pool.putconn(conn)
+
+        for replica in ReplicaRouter.replicas():
+            try:
+                cls.get_replica_pool(replica)
+            except psycopg2.OperationalError as e:
+                cls._eject(replica, None, e)
+
+        logger.info(f"ML connection pool warmed up with {len(opened)} connections")
+        return len(opened)
@@ -0,0 +1,229 @@
+import re
+import time
+import hashlib
+import argparse
+import threading
+import numpy as np
+from collections import OrderedDict
+import psycopg2.errors
+import psycopg2.extensions
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from ml.Enum.Enumerations import Enumerations
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class PreparedConnection(psycopg2.extensions.connection):
+    # psycopg2 connection that remembers which statements its server session has prepared, least recently used first
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = OrderedDict()
+
+
+class PreparedStatements:
+    NAMED_PARAMETER = re.compile(r'%\((\w+)\)s')
+    MAX_STATEMENTS = 1024
+
+    # sql -> (statement name, PREPARE body with $n parameters, named parameters in $n order), least recently used first
+    _statements = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def connection_options() -> str:
+        # session settings travel in the startup packet, so no request ever sends them
+        return ' '.join(f'-c {name}={value}' for name, value in Enumerations.session_settings.items())
+
+    @staticmethod
+    def _convert(sql: str) -> Tuple[str, str, Optional[List[str]]]:
+        body = sql.strip().rstrip(';')
+        names = list(dict.fromkeys(PreparedStatements.NAMED_PARAMETER.findall(body)))
+
+        if names:
+            body = PreparedStatements.NAMED_PARAMETER.sub(lambda match: f'${names.index(match.group(1)) + 1}', body)
+        else:
+            parts = body.split('%s')
+            body = parts[0] + ''.join(f'${index}{part}' for index, part in enumerate(parts[1:], start=1))
+
+        name = f'ml_{hashlib.md5(sql.encode()).hexdigest()[:16]}'
+        return name, body.replace('%%', '%'), names or None
+
+    @staticmethod
+    def limit(top_k: int) -> int:
+        steps = Enumerations.prepared_limit_steps
+        top_k = int(top_k)
+        for step in steps:
+            if top_k <= step:
+                return step
+        return -(-top_k // steps[-1]) * steps[-1]
+
+    @classmethod
+    def _statement(cls, sql: str) -> Tuple[str, str, Optional[List[str]]]:
+        with cls._lock:
+            statement = cls._statements.get(sql)
+            if statement is not None:
+                cls._statements.move_to_end(sql)
+                return statement
+
+        statement = cls._convert(sql)
+        with cls._lock:
+            cls._statements[sql] = statement
+            while len(cls._statements) > cls.MAX_STATEMENTS:
+                cls._statements.popitem(last=False)
+        return statement
+
+    @staticmethod
+    def settings(ef_search: Optional[int] = None, iterative_scan: Optional[str] = None) -> str:
+        # only values that differ from the session defaults are sent, scoped to the current transaction
+        settings = ''
+        if ef_search and int(ef_search) != Enumerations.hnsw_session_ef_search:
+            settings += f'SET LOCAL hnsw.ef_search = {int(ef_search)}; '
+        if iterative_scan:
+            settings += f'SET LOCAL hnsw.iterative_scan = {iterative_scan}; '
+        return settings
+
+    @staticmethod
+    def arguments(count: int) -> str:
+        return f" ({', '.join(['%s'] * count)})" if count else ''
+
+    @staticmethod
+    def _make_room(cursor):
+        # like PREPARE, DEALLOCATE is not undone by the request's rollback; it only runs once a connection
+        # holds as many statements as its budget
+        conn = cursor.connection
+        while conn.prepared and len(conn.prepared) >= Enumerations.prepared_statements_per_connection:
+            evicted, _ = conn.prepared.popitem(last=False)
+            cursor.execute(f'DEALLOCATE {evicted}')
+            logger.debug(f'PreparedStatements: deallocated {evicted}')
+
+    @staticmethod
+    def _record(conn, name: str):
+        conn.prepared[name] = True
+        logger.debug(f'PreparedStatements: prepared {name} ({len(conn.prepared)} on this connection)')
+
+    @classmethod
+    def prepare(cls, cursor, sql: str) -> Tuple[str, Optional[List[str]]]:
+        # PREPARE outlives the request's rollback, so the statement is only recorded once the server accepted it
+        name, body, names = cls._statement(sql)
+        conn = cursor.connection
+        if name in conn.prepared:
+            conn.prepared.move_to_end(name)
+            return name, names
+
+        cls._make_room(cursor)
+        cursor.execute(f'PREPARE {name} AS {body}')
+        cls._record(conn, name)
+        return name, names
+
+    @classmethod
+    def execute(
+        cls,
+        cursor,
+        sql: str,
+        params: Any = (),
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None
+    ):
+        settings = cls.settings(ef_search, iterative_scan)
+
+        if not Enumerations.prepared_statements or not isinstance(cursor.connection, PreparedConnection):
+            cursor.execute(settings + sql, params)
+            return
+
+        name, body, names = cls._statement(sql)
+        values = [params[key] for key in names] if names else list(params)
+        statement = f'{settings}EXECUTE {name}{cls.arguments(len(values))};'
+
+        conn = cursor.connection
+        if name in conn.prepared:
+            conn.prepared.move_to_end(name)
+            cursor.execute(statement, values)
+            return
+
+        cls._make_room(cursor)
+
+        # the first use sends PREPARE in the same round trip as its EXECUTE; the body goes through
+        # psycopg2's parameter interpolation again, so its literal % are escaped back
+        try:
+            cursor.execute(f"PREPARE {name} AS {body.replace('%', '%%')}; {statement}", values)
+        except psycopg2.errors.DuplicatePreparedStatement:
+            # an earlier request failed after its PREPARE ran
+            cls._record(conn, name)
+            raise
+        except psycopg2.ProgrammingError:
+            # the server rejected the statement text, so the PREPARE did not run
+            raise
+        except psycopg2.Error:
+            # statements run in order, so a failed SET LOCAL or EXECUTE leaves the PREPARE on the server
+            if not conn.closed:
+                cls._record(conn, name)
+            raise
+        cls._record(conn, name)
+
+
+def _planning_ms(cursor, sql: str, params: Sequence[Any]) -> float:
+    cursor.execute(f'EXPLAIN (ANALYZE, SUMMARY) {sql}', params)
+    plan = '\n'.join(row[0] for row in cursor.fetchall())
+    return float(re.search(r'Planning Time: ([\d.]+) ms', plan).group(1))
+
+
+def _latency_ms(cursor, sql: str, params: Sequence[Any]) -> float:
+    start = time.perf_counter()
+    cursor.execute(sql, params)
+    cursor.fetchall()
+    return (time.perf_counter() - start) * 1000
+
+
+def benchmark(iterations: int = 200) -> List[Dict[str, Any]]:
+    from ml.services.pgvector_codec import QueryVector
+    from ml.services.postgres_pool import MLPostgresConnectionPool
+
+    rng = np.random.default_rng(0)
+    vectors = [QueryVector(rng.normal(size=Enumerations.embedding_storage_dimension)) for _ in range(16)]
+    top_k = Enumerations.top_k
+    queries = {
+        'vector_service_query': (Enumerations.vector_service_query.format(top_k=top_k), lambda i: (vectors[i % 16],)),
+        'vector_metadata_query': (Enumerations.vector_metadata_query.format(top_k=top_k), lambda i: (vectors[i % 16],)),
+        'metadata_service_query': (Enumerations.metadata_service_query, lambda i: (list(range(i, i + 50)),)),
+        'lexical_metadata_query': (Enumerations.lexical_metadata_query, lambda i: ('python', top_k, vectors[i % 16])),
+    }
+    report = []
+
+    with MLPostgresConnectionPool.get_connection(read_only=True) as conn:
+        with conn.cursor() as cursor:
+            for label, (sql, params) in queries.items():
+                name, _ = PreparedStatements.prepare(cursor, sql)
+                prepared = f'EXECUTE {name}{PreparedStatements.arguments(len(params(0)))};'
+
+                row = {'query': label}
+                for mode, statement in (('plain', sql), ('prepared', prepared)):
+                    row[f'{mode}_planning_ms'] = float(np.median([
+                        _planning_ms(cursor, statement, params(i)) for i in range(iterations)
+                    ]))
+                    row[f'{mode}_latency_ms'] = float(np.median([
+                        _latency_ms(cursor, statement, params(i)) for i in range(iterations)
+                    ]))
+
+                cursor.execute('SELECT generic_plans FROM pg_prepared_statements WHERE name = %s;', (name,))
+                row['generic_plans'] = cursor.fetchone()[0]
+                report.append(row)
+                conn.rollback()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare planning time of the search queries sent as text and as prepared statements')
+    parser.add_argument('command', choices=['bench'])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    for row in benchmark(args.iterations):
+        saved = row['plain_planning_ms'] - row['prepared_planning_ms']
+        print(f"{row['query']}: planning {row['plain_planning_ms']:.3f} -> {row['prepared_planning_ms']:.3f} ms "
+              f"(saved {saved:.3f} ms/query, {row['generic_plans']} generic plans), "
+              f"latency {row['plain_latency_ms']:.3f} -> {row['prepared_latency_ms']:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+import os
+import time
+import argparse
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional
+from ml.Enum.Enumerations import Enumerations
+from ml.services.mmap_index import MmapVectorIndex
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class QuantizedVectorIndex:
+    CODES_FILE = 'binary_codes.npy'
+
+    _codes = None
+    _embeddings = None
+    _book_ids = None
+    _version = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def quantize(embeddings: Any) -> np.ndarray:
+        # one bit per dimension, set when the value is positive (pgvector's binary_quantize),
+        # zero-padded to whole 64-bit words so the Hamming distance is a popcount per word
+        bits = np.asarray(embeddings) > 0
+        padding = -bits.shape[-1] % 64
+        if padding:
+            bits = np.concatenate([bits, np.zeros(bits.shape[:-1] + (padding,), dtype=bool)], axis=-1)
+        return np.ascontiguousarray(np.packbits(bits, axis=-1)).view(np.uint64)
+
+    @staticmethod
+    def build(snapshot_dir: str = Enumerations.vector_snapshot_dir, batch_size: int = 10000) -> str:
+        version = MmapVectorIndex.current_version(snapshot_dir)
+        if version is None:
+            raise RuntimeError(f'no vector snapshot in {snapshot_dir}, run mmap_index export first')
+
+        folder = os.path.join(snapshot_dir, version)
+        embeddings = np.load(os.path.join(folder, MmapVectorIndex.EMBEDDINGS_FILE), mmap_mode='r')
+        codes = np.empty((embeddings.shape[0], (embeddings.shape[1] + 63) // 64), dtype=np.uint64)
+
+        for start in range(0, len(embeddings), batch_size):
+            codes[start:start + batch_size] = QuantizedVectorIndex.quantize(embeddings[start:start + batch_size])
+
+        path = os.path.join(folder, QuantizedVectorIndex.CODES_FILE)
+        np.save(f'{path}.tmp.npy', codes)
+        os.replace(f'{path}.tmp.npy', path)
+
+        logger.info(f'QuantizedVectorIndex: built {codes.nbytes} bytes of binary codes for {len(codes)} embeddings')
+        return path
+
+    @classmethod
+    def load(cls, snapshot_dir: str = Enumerations.vector_snapshot_dir) -> bool:
+        version = MmapVectorIndex.current_version(snapshot_dir)
+        if version is None or not os.path.exists(os.path.join(snapshot_dir, version, cls.CODES_FILE)):
+            logger.warning(f'QuantizedVectorIndex: no binary codes in {snapshot_dir}')
+            return False
+
+        cls._checked_at = time.monotonic()
+        if version == cls._version:
+            return True
+
+        folder = os.path.join(snapshot_dir, version)
+        # the codes stay in RAM; full vectors are only paged in for the candidates being rescored
+        codes = np.load(os.path.join(folder, cls.CODES_FILE))
+        embeddings = np.load(os.path.join(folder, MmapVectorIndex.EMBEDDINGS_FILE), mmap_mode='r')
+        book_ids = np.load(os.path.join(folder, MmapVectorIndex.BOOK_IDS_FILE))
+
+        with cls._lock:
+            cls._codes, cls._embeddings, cls._book_ids, cls._version = codes, embeddings, book_ids, version
+
+        logger.info(f'QuantizedVectorIndex: loaded snapshot {version} ({len(book_ids)} embeddings)')
+        return True
+
+    @classmethod
+    def _ensure_loaded(cls) -> bool:
+        if cls._codes is not None and time.monotonic() - cls._checked_at < Enumerations.vector_snapshot_refresh:
+            return True
+
+        return cls.load()
+
+    @classmethod
+    def warm_up(cls) -> int:
+        if not cls.load():
+            raise RuntimeError('binary codes are not available')
+
+        cls.search(np.ones(cls._embeddings.shape[1], dtype=np.float32), 1)
+        return len(cls._book_ids)
+
+    @staticmethod
+    def candidates(codes: np.ndarray, query: np.ndarray, count: int) -> np.ndarray:
+        differing = np.bitwise_xor(codes, QuantizedVectorIndex.quantize(query))
+        distances = np.bitwise_count(differing).sum(axis=1, dtype=np.uint32)
+        count = min(count, len(distances))
+        # sorted positions keep the rescoring reads of the memory map sequential
+        return np.sort(np.argpartition(distances, count - 1)[:count])
+
+    @classmethod
+    def search(
+        cls,
+        query_embedding: Any,
+        top_k: int = Enumerations.top_k,
+        ef: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        # ef is the size of the Hamming candidate list that is rescored with the full vectors
+        if not cls._ensure_loaded():
+            raise RuntimeError('binary codes are not available')
+
+        with cls._lock:
+            codes, embeddings, book_ids = cls._codes, cls._embeddings, cls._book_ids
+
+        top_k = min(top_k, len(book_ids))
+        if top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        candidates = cls.candidates(codes, query, max(ef or Enumerations.quantized_candidates, top_k))
+        scores = embeddings[candidates] @ query
+        best = np.argsort(-scores)[:top_k]
+
+        return [
+            {'book_id': int(book_ids[candidates[i]]), 'similarity': float(scores[i])}
+            for i in best
+        ]
+
+    @classmethod
+    def recall(
+        cls,
+        top_k: int = 10,
+        queries: int = 200,
+        candidates: Optional[int] = None,
+        seed: int = 0
+    ) -> float:
+        if not cls._ensure_loaded():
+            raise RuntimeError('binary codes are not available')
+
+        embeddings, book_ids = cls._embeddings, cls._book_ids
+        rng = np.random.default_rng(seed)
+        noise = 0.3 / np.sqrt(embeddings.shape[1])
+        picked = rng.choice(len(book_ids), size=min(queries, len(book_ids)), replace=False)
+        hits = 0
+
+        for position in picked:
+            # stored vectors plus noise stand in for queries the corpus has never seen
+            query = np.asarray(embeddings[position]) + rng.normal(scale=noise, size=embeddings.shape[1])
+            query = (query / np.linalg.norm(query)).astype(np.float32)
+
+            exact = set(book_ids[np.argsort(-(embeddings @ query))[:top_k]].tolist())
+            found = {result['book_id'] for result in cls.search(query, top_k, ef=candidates)}
+            hits += len(exact & found)
+
+        return hits / (len(picked) * min(top_k, len(book_ids)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or evaluate the binary-quantized index of the current vector snapshot')
+    parser.add_argument('command', choices=['build', 'recall'])
+    parser.add_argument('--dir', default=Enumerations.vector_snapshot_dir)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--candidates', type=int, nargs='*', default=[Enumerations.quantized_candidates])
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(QuantizedVectorIndex.build(args.dir))
+        return
+
+    if not QuantizedVectorIndex.load(args.dir):
+        raise SystemExit(f'no binary codes in {args.dir}, run build first')
+
+    for candidates in args.candidates:
+        recall = QuantizedVectorIndex.recall(args.top_k, args.queries, candidates)
+        print(f'candidates={candidates} recall@{args.top_k}={recall:.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import time
+import itertools
+import threading
+from typing import List, Tuple
+from backend.app.core.config import DB_PORT, DB_READ_REPLICAS
+from ml.Enum.Enumerations import Enumerations
+from backend.app.core.logging import get_logger
+
+logger = get_logger(__name__, system_type='ml')
+
+
+class ReplicaRouter:
+    _replicas = None
+    _ejected_until = {}
+    _counter = itertools.count()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def parse(replicas: str) -> List[Tuple[str, str]]:
+        parsed = []
+        for entry in replicas.split(','):
+            entry = entry.strip()
+            if entry:
+                host, _, port = entry.partition(':')
+                parsed.append((host, port or DB_PORT))
+        return parsed
+
+    @classmethod
+    def replicas(cls) -> List[Tuple[str, str]]:
+        if cls._replicas is None:
+            cls._replicas = cls.parse(DB_READ_REPLICAS)
+        return cls._replicas
+
+    @classmethod
+    def candidates(cls) -> List[Tuple[str, str]]:
+        # healthy replicas in round-robin order; callers fall back to the primary when none works
+        now = time.monotonic()
+        healthy = [replica for replica in cls.replicas() if cls._ejected_until.get(replica, 0.0) <= now]
+        if not healthy:
+            return []
+
+        start = next(cls._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    @classmethod
+    def eject(cls, replica: Tuple[str, str], error: Exception = None):
+        with cls._lock:
+            cls._ejected_until[replica] = time.monotonic() + Enumerations.replica_eject_seconds
+
+        logger.warning(f'ReplicaRouter: replica {replica[0]}:{replica[1]} ejected for '
+                       f'{Enumerations.replica_eject_seconds}s: {error}')
@@ -1,36 +1,265 @@
+import time
+import heapq
+import asyncio
+import threading
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from backend.app.core.logging import get_logger
 from ml.services.postgres_pool import MLPostgresConnectionPool
-from typing import List, Union
+from ml.services.async_postgres_pool import MLAsyncPostgresConnectionPool
+from typing import Any, Dict, List, Optional, Sequence, Union
 from ml.Enum.Enumerations import Enumerations
+from ml.models.v1.projection import EmbeddingProjection
+from ml.services.mmap_index import MmapVectorIndex
+from ml.services.hnsw_index import HnswVectorIndex
+from ml.services.quantized_index import QuantizedVectorIndex
+from ml.services.pgvector_codec import QueryVector
+from ml.services.metadata_filter import MetadataFilter
+from ml.services.prepared_statements import PreparedStatements
+from ml.pipeline.v1.feature import FeatureExtractor
 import numpy as np
+import psycopg2.extras
 
 logger = get_logger(__name__, system_type='ml')
 
 
 class VectorService:
+    LOCAL_BACKENDS = {
+        'mmap': MmapVectorIndex,
+        'hnsw': HnswVectorIndex,
+        'binary': QuantizedVectorIndex,
+    }
+
+    ITERATIVE_SCAN_MODES = ('relaxed_order', 'strict_order')
+
+    # books is LIST-partitioned by FeatureExtractor.tech_category, one HNSW index per partition
+    PARTITIONS = tuple(f'books_{category}' for category in FeatureExtractor.CATEGORIES)
+
+    _partition_executor = None
+    _lock = threading.Lock()
+
+    # normalized filters -> (expires_at, matches counted up to bound, bound)
+    _filter_matches = OrderedDict()
+    _matches_lock = threading.Lock()
+
+    @staticmethod
+    def _filtered_ef(ef_search: Optional[int], top_k: int) -> int:
+        # a selective filter discards most of the HNSW candidate list, so the list grows with top_k
+        ef_search = max(int(ef_search or Enumerations.hnsw_ef_search), top_k * Enumerations.filtered_search_ef_factor)
+        return min(ef_search, Enumerations.hnsw_max_ef_search)
+
+    @staticmethod
+    def _filter_key(filters: Dict[str, Any]) -> tuple:
+        return tuple((field, MetadataFilter._value(field, value)) for field, value in filters.items())
+
+    @classmethod
+    def _cached_matches(cls, key, top_k: int) -> Optional[int]:
+        with cls._matches_lock:
+            entry = cls._filter_matches.get(key)
+            if entry is None:
+                return None
+
+            expires_at, matches, bound = entry
+            if expires_at <= time.monotonic():
+                del cls._filter_matches[key]
+                return None
+            # a count that hit its bound only answers requests that need no more than the bound
+            if matches < bound or top_k <= bound:
+                cls._filter_matches.move_to_end(key)
+                return min(matches, top_k)
+            return None
+
+    @classmethod
+    def _store_matches(cls, key, matches: int, bound: int):
+        with cls._matches_lock:
+            cls._filter_matches[key] = (time.monotonic() + Enumerations.filtered_search_count_ttl, matches, bound)
+            cls._filter_matches.move_to_end(key)
+            while len(cls._filter_matches) > Enumerations.filtered_search_count_cache_size:
+                cls._filter_matches.popitem(last=False)
+
+    @staticmethod
+    def _binary() -> bool:
+        return Enumerations.vector_search_backend == 'pgvector_binary'
+
+    @staticmethod
+    def _partitioned() -> bool:
+        return Enumerations.vector_search_backend == 'pgvector_partitioned'
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        if cls._partition_executor is None:
+            with cls._lock:
+                if cls._partition_executor is None:
+                    # shared by all requests: caps the connections the sync fan-out holds across every search,
+                    # while partition_search_connections caps a single search
+                    cls._partition_executor = ThreadPoolExecutor(
+                        max_workers=Enumerations.partition_search_workers,
+                        thread_name_prefix='partition-search'
+                    )
+        return cls._partition_executor
+
+    @staticmethod
+    def _merge_partitions(results, top_k: int) -> list:
+        # every partition list is already sorted by similarity, so a heap merge yields the global order
+        return list(islice(heapq.merge(*results, key=lambda row: -row['similarity']), top_k))
+
+    @staticmethod
+    def _search_partition(query: str, partition: str, query_vector: QueryVector, top_k: int, ef_search: int):
+        def fetch(conn):
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                PreparedStatements.execute(
+                    cursor,
+                    query.format(partition=partition, top_k=PreparedStatements.limit(top_k)),
+                    (query_vector,),
+                    ef_search
+                )
+                return cursor.fetchall()[:top_k]
+
+        return MLPostgresConnectionPool.read(fetch)
+
+    @staticmethod
+    def _search_partitions(query: str, query_vector: QueryVector, top_k: int, ef_search: Optional[int]):
+        return VectorService._search_partitions_batch(query, [query_vector], top_k, ef_search)[0]
+
+    @staticmethod
+    def _search_partitions_batch(query: str, query_vectors: List[QueryVector], top_k: int, ef_search: Optional[int]):
+        ef_search = int(ef_search or Enumerations.hnsw_ef_search)
+        searches = iter([
+            (position, query_vector, partition)
+            for position, query_vector in enumerate(query_vectors)
+            for partition in VectorService.PARTITIONS
+        ])
+        lock = threading.Lock()
+
+        def drain():
+            # every task takes the next (query, partition) pair until none are left, so the search runs
+            # at most partition_search_connections queries at a time
+            results = []
+            while True:
+                with lock:
+                    search = next(searches, None)
+                if search is None:
+                    return results
+                position, query_vector, partition = search
+                results.append((position, VectorService._search_partition(query, partition, query_vector, top_k, ef_search)))
+
+        tasks = [
+            VectorService.get_executor().submit(drain)
+            for _ in range(min(Enumerations.partition_search_connections, len(query_vectors) * len(VectorService.PARTITIONS)))
+        ]
+        results = [[] for _ in query_vectors]
+        for task in tasks:
+            for position, rows in task.result():
+                results[position].append(rows)
+        return [VectorService._merge_partitions(rows, top_k) for rows in results]
+
+    @staticmethod
+    async def _search_partitions_async(query: str, query_vector: QueryVector, top_k: int, ef_search: Optional[int]):
+        semaphore = asyncio.Semaphore(Enumerations.partition_search_connections)
+
+        async def fetch(partition):
+            async with semaphore:
+                return await VectorService._fetch_async(query.format(partition=partition), query_vector, top_k, ef_search)
+
+        results = await asyncio.gather(*(fetch(partition) for partition in VectorService.PARTITIONS))
+        return VectorService._merge_partitions(results, top_k)
+
+    @staticmethod
+    def _candidates(ef_search: Optional[int], top_k: int) -> int:
+        # in the two-stage mode ef_search is the number of Hamming candidates rescored with the full vectors
+        candidates = max(int(ef_search or Enumerations.quantized_candidates), top_k)
+        return min(candidates, Enumerations.hnsw_max_ef_search)
+
+    @staticmethod
+    def _iterative_scan() -> Optional[str]:
+        mode = Enumerations.filtered_search_iterative_scan
+        return mode if mode in VectorService.ITERATIVE_SCAN_MODES else None
+
+    @staticmethod
+    def _to_books(results) -> List[Dict[str, Any]]:
+        books = [dict(result) for result in results]
+        for book in books:
+            book['similarity'] = float(book['similarity'])
+        return books
+
+    @staticmethod
+    def _query_vectors(query_embeddings: Any) -> List[QueryVector]:
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        if EmbeddingProjection.enabled():
+            query_embeddings = EmbeddingProjection.project(query_embeddings)
+        return [QueryVector(embedding) for embedding in query_embeddings]
+
+    @staticmethod
+    def _group_by_query(results, count: int) -> List[List[Dict[str, Any]]]:
+        books = [[] for _ in range(count)]
+        for result in results:
+            book = dict(result)
+            position = book.pop('query_position')
+            book['similarity'] = float(book['similarity'])
+            books[position - 1].append(book)
+        return books
+
     @staticmethod
     def search_similar_books(
         query_embedding: Union[List[float], np.ndarray],
-        top_k=Enumerations.top_k
+        top_k=Enumerations.top_k,
+        ef_search: Optional[int] = None
     ):
         if query_embedding is None or len(query_embedding) == 0:
             return []
 
-        if isinstance(query_embedding, np.ndarray):
-            query_embedding = query_embedding.tolist()
+        if EmbeddingProjection.enabled():
+            query_embedding = EmbeddingProjection.project(query_embedding)
+
+        backend = Enumerations.vector_search_backend
+        local_index = VectorService.LOCAL_BACKENDS.get(backend)
+
+        if local_index is not None:
+            try:
+                results = local_index.search(query_embedding, top_k, ef=ef_search)
+                logger.info(f'VectorService: found {len(results)} similar books in the {backend} index')
+                return results
+            except Exception as e:
+                logger.error(f'VectorService {backend} index error, falling back to pgvector: {e}', exc_info=True)
 
-        vector_str = '[' + ','.join(map(str, query_embedding)) + ']'
+        query_vector = QueryVector(query_embedding)
 
         try:
-            with MLPostgresConnectionPool.get_connection() as conn:
+            if VectorService._partitioned():
+                results = VectorService._search_partitions(
+                    Enumerations.vector_partition_query,
+                    query_vector,
+                    top_k,
+                    ef_search
+                )
+                logger.info(f'VectorService: found {len(results)} similar books in {len(VectorService.PARTITIONS)} partitions')
+                return [
+                    {'book_id': r['book_id'], 'similarity': float(r['similarity'])}
+                    for r in results
+                ]
+
+            def fetch(conn):
                 with conn.cursor() as cursor:
-                    cursor.execute(Enumerations.ef_search)
-                    cursor.execute(
-                        Enumerations.vector_service_query,
-                        (vector_str, vector_str, top_k)
-                    )
+                    if VectorService._binary():
+                        candidates = VectorService._candidates(ef_search, top_k)
+                        PreparedStatements.execute(
+                            cursor,
+                            Enumerations.vector_service_binary_query,
+                            (query_vector, query_vector, candidates, top_k),
+                            candidates
+                        )
+                    else:
+                        PreparedStatements.execute(
+                            cursor,
+                            Enumerations.vector_service_query.format(top_k=PreparedStatements.limit(top_k)),
+                            (query_vector,),
+                            int(ef_search or Enumerations.hnsw_ef_search)
+                        )
 
-                    results = cursor.fetchall()
+                    return cursor.fetchall()[:top_k]
+
+            results = MLPostgresConnectionPool.read(fetch)
 
             logger.info(f'VectorService: found {len(results)} similar books')
 
@@ -41,3 +270,373 @@ class VectorService:
         except Exception as e:
             logger.error(f'VectorService error: {e}', exc_info=True)
             return []
+
+    @staticmethod
+    def _search_filtered(cursor, query_vector: QueryVector, top_k: int, ef_search: Optional[int], filters: Dict[str, Any]):
+        where, params = MetadataFilter.where(filters)
+        params.update(query=query_vector)
+        limit = PreparedStatements.limit(top_k)
+
+        PreparedStatements.execute(
+            cursor,
+            Enumerations.vector_metadata_filtered_query.format(where=where, top_k=limit),
+            params,
+            VectorService._filtered_ef(ef_search, top_k),
+            VectorService._iterative_scan()
+        )
+        results = cursor.fetchall()[:top_k]
+
+        if len(results) < top_k:
+            key = VectorService._filter_key(filters)
+            matches = VectorService._cached_matches(key, top_k)
+            if matches is None:
+                PreparedStatements.execute(
+                    cursor,
+                    Enumerations.vector_metadata_filtered_count_query.format(where=where, top_k=limit),
+                    params
+                )
+                matches = cursor.fetchone()['matches']
+                VectorService._store_matches(key, matches, limit)
+                matches = min(matches, top_k)
+
+            # the filter itself matches fewer books than top_k, so the HNSW scan was not truncated
+            if len(results) >= matches:
+                return results
+
+            logger.info(f'VectorService: filtered HNSW scan returned {len(results)} of {matches} matches, using an exact scan')
+            PreparedStatements.execute(
+                cursor,
+                Enumerations.vector_metadata_filtered_exact_query.format(where=where, top_k=limit),
+                params
+            )
+            results = cursor.fetchall()[:top_k]
+
+        return results
+
+    @staticmethod
+    def search_books_with_metadata(
+        query_embedding: Union[List[float], np.ndarray],
+        top_k=Enumerations.top_k,
+        ef_search: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        if query_embedding is None or len(query_embedding) == 0:
+            return []
+
+        if EmbeddingProjection.enabled():
+            query_embedding = EmbeddingProjection.project(query_embedding)
+
+        query_vector = QueryVector(query_embedding)
+        filters = MetadataFilter.normalize(filters)
+
+        try:
+            if VectorService._partitioned() and not filters:
+                books = VectorService._to_books(VectorService._search_partitions(
+                    Enumerations.vector_partition_metadata_query,
+                    query_vector,
+                    top_k,
+                    ef_search
+                ))
+                logger.info(f'VectorService: found {len(books)} similar books with metadata in {len(VectorService.PARTITIONS)} partitions')
+                return books
+
+            def fetch(conn):
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    if filters:
+                        return VectorService._search_filtered(cursor, query_vector, top_k, ef_search, filters)
+
+                    if VectorService._binary():
+                        candidates = VectorService._candidates(ef_search, top_k)
+                        PreparedStatements.execute(
+                            cursor,
+                            Enumerations.vector_metadata_binary_query,
+                            (query_vector, candidates, query_vector, top_k),
+                            candidates
+                        )
+                    else:
+                        PreparedStatements.execute(
+                            cursor,
+                            Enumerations.vector_metadata_query.format(top_k=PreparedStatements.limit(top_k)),
+                            (query_vector,),
+                            int(ef_search or Enumerations.hnsw_ef_search)
+                        )
+                    return cursor.fetchall()[:top_k]
+
+            results = MLPostgresConnectionPool.read(fetch)
+            books = VectorService._to_books(results)
+
+            logger.info(f'VectorService: found {len(books)} similar books with metadata')
+            return books
+
+        except Exception as e:
+            logger.error(f'VectorService error: {e}', exc_info=True)
+            return []
+
+    @staticmethod
+    def search_books_with_metadata_batch(
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        top_k=Enumerations.top_k,
+        ef_search: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        if query_embeddings is None or len(query_embeddings) == 0:
+            return []
+
+        # the LATERAL batch statement scans books with the full-vector index; the two-stage backend runs its
+        # single-query plan per query on the shared executor, and the partitioned backend fans every
+        # (query, partition) pair out through the same bounded drain as a single search
+        if VectorService._binary():
+            return list(VectorService.get_executor().map(
+                lambda embedding: VectorService.search_books_with_metadata(embedding, top_k, ef_search),
+                query_embeddings
+            ))
+
+        query_vectors = VectorService._query_vectors(query_embeddings)
+
+        try:
+            if VectorService._partitioned():
+                books = [
+                    VectorService._to_books(results)
+                    for results in VectorService._search_partitions_batch(
+                        Enumerations.vector_partition_metadata_query,
+                        query_vectors,
+                        top_k,
+                        ef_search
+                    )
+                ]
+                logger.info(f'VectorService: found similar books with metadata for {len(query_vectors)} queries '
+                            f'in {len(VectorService.PARTITIONS)} partitions')
+                return books
+
+            def fetch(conn):
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    PreparedStatements.execute(
+                        cursor,
+                        Enumerations.vector_metadata_batch_query.format(top_k=PreparedStatements.limit(top_k)),
+                        (query_vectors,),
+                        int(ef_search or Enumerations.hnsw_ef_search)
+                    )
+                    return cursor.fetchall()
+
+            results = MLPostgresConnectionPool.read(fetch)
+
+            logger.info(f'VectorService: found {len(results)} similar books with metadata for {len(query_vectors)} queries')
+            return [books[:top_k] for books in VectorService._group_by_query(results, len(query_vectors))]
+
+        except Exception as e:
+            logger.error(f'VectorService error: {e}', exc_info=True)
+            return [[] for _ in query_vectors]
+
+    @staticmethod
+    async def _fetch_async(
+        query: str,
+        query_vector: Union[QueryVector, List[QueryVector]],
+        top_k: int,
+        ef_search: Optional[int],
+        params: Sequence[Any] = (),
+        iterative_scan: Optional[str] = None
+    ):
+        async def fetch(conn):
+            if not ef_search and not iterative_scan:
+                return await conn.fetch(query, query_vector, top_k, *params)
+
+            async with conn.transaction():
+                if ef_search:
+                    await conn.execute(Enumerations.ef_search_local_async, str(int(ef_search)))
+                if iterative_scan:
+                    await conn.execute(Enumerations.iterative_scan_local_async, iterative_scan)
+                return await conn.fetch(query, query_vector, top_k, *params)
+
+        return await MLAsyncPostgresConnectionPool.read(fetch)
+
+    @staticmethod
+    async def _fetch_binary_async(query: str, query_vector: QueryVector, top_k: int, ef_search: Optional[int]):
+        candidates = VectorService._candidates(ef_search, top_k)
+        ef_search = candidates if candidates > Enumerations.hnsw_session_ef_search else None
+        return await VectorService._fetch_async(query, query_vector, top_k, ef_search, [candidates])
+
+    @staticmethod
+    async def _search_filtered_async(
+        query_vector: QueryVector,
+        top_k: int,
+        ef_search: Optional[int],
+        filters: Dict[str, Any]
+    ):
+        where, params = MetadataFilter.where_async(filters, first_index=3)
+
+        results = await VectorService._fetch_async(
+            Enumerations.vector_metadata_filtered_query_async.format(where=where),
+            query_vector,
+            top_k,
+            VectorService._filtered_ef(ef_search, top_k),
+            params,
+            VectorService._iterative_scan()
+        )
+
+        if len(results) < top_k:
+            key = VectorService._filter_key(filters)
+            matches = VectorService._cached_matches(key, top_k)
+            if matches is None:
+                count_where, count_params = MetadataFilter.where_async(filters, first_index=2)
+                matches = await MLAsyncPostgresConnectionPool.read(lambda conn: conn.fetchval(
+                    Enumerations.vector_metadata_filtered_count_query_async.format(where=count_where),
+                    top_k,
+                    *count_params
+                ))
+                VectorService._store_matches(key, matches, top_k)
+
+            if len(results) >= matches:
+                return results
+
+            logger.info(f'VectorService: filtered HNSW scan returned {len(results)} of {matches} matches, using an exact scan')
+            results = await VectorService._fetch_async(
+                Enumerations.vector_metadata_filtered_exact_query_async.format(where=where),
+                query_vector,
+                top_k,
+                None,
+                params
+            )
+
+        return results
+
+    @staticmethod
+    async def search_similar_books_async(
+        query_embedding: Union[List[float], np.ndarray],
+        top_k=Enumerations.top_k,
+        ef_search: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        if query_embedding is None or len(query_embedding) == 0:
+            return []
+
+        if EmbeddingProjection.enabled():
+            query_embedding = EmbeddingProjection.project(query_embedding)
+
+        backend = Enumerations.vector_search_backend
+        local_index = VectorService.LOCAL_BACKENDS.get(backend)
+
+        if local_index is not None:
+            try:
+                # the scan (and a snapshot reload) is CPU-bound, so it runs off the event loop
+                results = await asyncio.to_thread(local_index.search, query_embedding, top_k, ef=ef_search)
+                logger.info(f'VectorService: found {len(results)} similar books in the {backend} index')
+                return results
+            except Exception as e:
+                logger.error(f'VectorService {backend} index error, falling back to pgvector: {e}', exc_info=True)
+
+        try:
+            if VectorService._partitioned():
+                results = await VectorService._search_partitions_async(
+                    Enumerations.vector_partition_query_async,
+                    QueryVector(query_embedding),
+                    top_k,
+                    ef_search
+                )
+            elif VectorService._binary():
+                results = await VectorService._fetch_binary_async(
+                    Enumerations.vector_service_binary_query_async,
+                    QueryVector(query_embedding),
+                    top_k,
+                    ef_search
+                )
+            else:
+                results = await VectorService._fetch_async(
+                    Enumerations.vector_service_query_async,
+                    QueryVector(query_embedding),
+                    top_k,
+                    ef_search
+                )
+
+            logger.info(f'VectorService: found {len(results)} similar books')
+
+            return [
+                {'book_id': r['book_id'], 'similarity': float(r['similarity'])}
+                for r in results
+            ]
+        except Exception as e:
+            logger.error(f'VectorService error: {e}', exc_info=True)
+            return []
+
+    @staticmethod
+    async def search_books_with_metadata_async(
+        query_embedding: Union[List[float], np.ndarray],
+        top_k=Enumerations.top_k,
+        ef_search: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        if query_embedding is None or len(query_embedding) == 0:
+            return []
+
+        if EmbeddingProjection.enabled():
+            query_embedding = EmbeddingProjection.project(query_embedding)
+
+        filters = MetadataFilter.normalize(filters)
+
+        try:
+            if filters:
+                results = await VectorService._search_filtered_async(
+                    QueryVector(query_embedding),
+                    top_k,
+                    ef_search,
+                    filters
+                )
+            elif VectorService._partitioned():
+                results = await VectorService._search_partitions_async(
+                    Enumerations.vector_partition_metadata_query_async,
+                    QueryVector(query_embedding),
+                    top_k,
+                    ef_search
+                )
+            elif VectorService._binary():
+                results = await VectorService._fetch_binary_async(
+                    Enumerations.vector_metadata_binary_query_async,
+                    QueryVector(query_embedding),
+                    top_k,
+                    ef_search
+                )
+            else:
+                results = await VectorService._fetch_async(
+                    Enumerations.vector_metadata_query_async,
+                    QueryVector(query_embedding),
+                    top_k,
+                    ef_search
+                )
+
+            books = VectorService._to_books(results)
+
+            logger.info(f'VectorService: found {len(books)} similar books with metadata')
+            return books
+
+        except Exception as e:
+            logger.error(f'VectorService error: {e}', exc_info=True)
+            return []
+
+    @staticmethod
+    async def search_books_with_metadata_batch_async(
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        top_k=Enumerations.top_k,
+        ef_search: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        if query_embeddings is None or len(query_embeddings) == 0:
+            return []
+
+        if VectorService._binary() or VectorService._partitioned():
+            return list(await asyncio.gather(*(
+                VectorService.search_books_with_metadata_async(embedding, top_k, ef_search)
+                for embedding in query_embeddings
+            )))
+
+        query_vectors = VectorService._query_vectors(query_embeddings)
+
+        try:
+            results = await VectorService._fetch_async(
+                Enumerations.vector_metadata_batch_query_async,
+                query_vectors,
+                top_k,
+                ef_search
+            )
+
+            logger.info(f'VectorService: found {len(results)} similar books with metadata for {len(query_vectors)} queries')
+            return VectorService._group_by_query(results, len(query_vectors))
+
+        except Exception as e:
+            logger.error(f'VectorService error: {e}', exc_info=True)
+            return [[] for _ in query_vectors]
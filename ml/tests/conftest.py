@@ -13,6 +13,6 @@ def mock_db_connection(mocker):
 
     mock_pool = mocker.MagicMock()
     mock_pool.getconn.return_value = mock_conn
-    mocker.patch('psycopg2.pool.ThreadedConnectionPool', return_value=mock_pool)
+    mocker.patch('ml.services.postgres_pool.MLThreadedConnectionPool', return_value=mock_pool)
 
     return mock_conn, mock_cursor
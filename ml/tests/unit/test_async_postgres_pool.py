@@ -0,0 +1,109 @@
+import asyncpg
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from ml.services.async_postgres_pool import MLAsyncPostgresConnectionPool
+from ml.services.pgvector_codec import PGVectorCodec
+
+
+async def test_async_pool_initialization(mocker):
+    mock_pool = MagicMock()
+    create_pool = mocker.patch('ml.services.async_postgres_pool.asyncpg.create_pool', AsyncMock(return_value=mock_pool))
+    mocker.patch.object(MLAsyncPostgresConnectionPool, '_pool', None)
+    mocker.patch.object(MLAsyncPostgresConnectionPool, '_lock', None)
+
+    assert await MLAsyncPostgresConnectionPool.get_pool() is mock_pool
+    assert await MLAsyncPostgresConnectionPool.get_pool() is mock_pool
+
+    create_pool.assert_awaited_once()
+    kwargs = create_pool.call_args.kwargs
+    assert kwargs['init'] is PGVectorCodec.register_asyncpg
+    assert 'hnsw.ef_search' in kwargs['server_settings']
+    assert kwargs['server_settings']['jit'] == 'off'
+
+
+async def test_async_pool_warm_up(mocker):
+    conn = MagicMock()
+    conn.fetchval = AsyncMock(return_value=1)
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    mock_pool = MagicMock()
+    mock_pool.acquire = acquire
+    mocker.patch.object(MLAsyncPostgresConnectionPool, 'get_pool', AsyncMock(return_value=mock_pool))
+
+    assert await MLAsyncPostgresConnectionPool.warm_up(connections=3) == 3
+    assert conn.fetchval.await_count == 3
+
+
+async def test_async_pool_close(mocker):
+    mock_pool = MagicMock()
+    mock_pool.close = AsyncMock()
+    mocker.patch.object(MLAsyncPostgresConnectionPool, '_pool', mock_pool)
+
+    await MLAsyncPostgresConnectionPool.close()
+
+    mock_pool.close.assert_awaited_once()
+    assert MLAsyncPostgresConnectionPool._pool is None
+
+
+async def test_async_read_only_connection_uses_replica(mocker):
+    conn = MagicMock()
+    conn.is_closed.return_value = False
+    replica_pool = MagicMock()
+    replica_pool.acquire = AsyncMock(return_value=conn)
+    replica_pool.release = AsyncMock()
+    mocker.patch('ml.services.async_postgres_pool.ReplicaRouter.candidates', return_value=[('replica', '5432')])
+    mocker.patch.object(MLAsyncPostgresConnectionPool, 'get_replica_pool', AsyncMock(return_value=replica_pool))
+    primary = mocker.patch.object(MLAsyncPostgresConnectionPool, 'get_pool', AsyncMock())
+
+    async with MLAsyncPostgresConnectionPool.get_connection(read_only=True) as acquired:
+        assert acquired is conn
+
+    replica_pool.release.assert_awaited_once_with(conn)
+    primary.assert_not_awaited()
+
+
+async def test_async_read_only_connection_falls_back_to_primary(mocker):
+    conn = MagicMock()
+    primary_pool = MagicMock()
+    primary_pool.acquire = AsyncMock(return_value=conn)
+    primary_pool.release = AsyncMock()
+    mocker.patch('ml.services.async_postgres_pool.ReplicaRouter.candidates', return_value=[('replica', '5432')])
+    eject = mocker.patch('ml.services.async_postgres_pool.ReplicaRouter.eject')
+    mocker.patch.object(MLAsyncPostgresConnectionPool, 'get_replica_pool',
+                        AsyncMock(side_effect=OSError('connection refused')))
+    mocker.patch.object(MLAsyncPostgresConnectionPool, 'get_pool', AsyncMock(return_value=primary_pool))
+
+    async with MLAsyncPostgresConnectionPool.get_connection(read_only=True) as acquired:
+        assert acquired is conn
+
+    assert eject.call_args.args[0] == ('replica', '5432')
+    primary_pool.release.assert_awaited_once_with(conn)
+
+
+async def test_async_read_retries_on_primary_when_replica_fails_mid_query(mocker):
+    replica_conn = MagicMock()
+    replica_conn.is_closed.return_value = False
+    replica_pool = MagicMock()
+    replica_pool.acquire = AsyncMock(return_value=replica_conn)
+    replica_pool.release = AsyncMock()
+    replica_pool.close = AsyncMock()
+    primary_pool = MagicMock()
+    primary_pool.acquire = AsyncMock(return_value=MagicMock())
+    primary_pool.release = AsyncMock()
+    mocker.patch('ml.services.async_postgres_pool.ReplicaRouter.candidates', return_value=[('replica', '5432')])
+    eject = mocker.patch('ml.services.async_postgres_pool.ReplicaRouter.eject')
+    mocker.patch.object(MLAsyncPostgresConnectionPool, 'get_replica_pool', AsyncMock(return_value=replica_pool))
+    mocker.patch.object(MLAsyncPostgresConnectionPool, 'get_pool', AsyncMock(return_value=primary_pool))
+
+    async def work(conn):
+        if conn is replica_conn:
+            replica_conn.is_closed.return_value = True
+            raise asyncpg.ConnectionDoesNotExistError('connection was closed in the middle of operation')
+        return 'rows'
+
+    assert await MLAsyncPostgresConnectionPool.read(work) == 'rows'
+    eject.assert_called_once()
+    primary_pool.release.assert_awaited_once_with(primary_pool.acquire.return_value)
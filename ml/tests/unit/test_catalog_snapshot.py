@@ -0,0 +1,69 @@
+import json
+import numpy as np
+import pytest
+from ml.Enum.Enumerations import Enumerations
+from ml.services.catalog_snapshot import CatalogSnapshot
+
+ROWS = [
+    (10, 0.8, 0.5, 0.3, 0.9, 0.1, 'learning rust', 'Steve', 'No Starch', 'systems', 4.5, 2019, 0.7),
+    (20, None, 0.2, 0.0, 0.4, 0.0, 'sql basics', None, 'Manning', 'données', None, None, None),
+    (30, 0.1, 0.1, 0.1, 0.1, 0.5, 'a novel', 'Jane', None, '', 3.0, 2001, 0.2),
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path, mocker):
+    version = '20260101T000000'
+    path = tmp_path / version
+    path.mkdir()
+
+    assert CatalogSnapshot.write(str(path), [ROWS[:2], ROWS[2:]], len(ROWS), display=True) == 3
+    (path / CatalogSnapshot.MANIFEST_FILE).write_text(json.dumps({'catalog_version': 7, 'display': True}))
+    (tmp_path / CatalogSnapshot.CURRENT_FILE).write_text(version)
+
+    mocker.patch.object(Enumerations, 'catalog_snapshot', True)
+    mocker.patch.object(CatalogSnapshot, '_snapshot', None)
+    mocker.patch.object(CatalogSnapshot, '_checked_at', 0.0)
+    CatalogSnapshot.load(str(tmp_path))
+    mocker.patch.object(CatalogSnapshot, '_checked_at', float('inf'))
+    return tmp_path
+
+
+def test_load_memory_maps_columns(snapshot):
+    assert isinstance(CatalogSnapshot._snapshot['features'], np.memmap)
+    assert CatalogSnapshot._snapshot['features'].flags['C_CONTIGUOUS']
+    assert CatalogSnapshot.stats()['catalog_version'] == 7
+
+
+def test_features_gather_by_book_id(snapshot):
+    features, found = CatalogSnapshot.features([30, 99, 10, 20])
+
+    assert found.tolist() == [True, False, True, True]
+    assert features[0] == pytest.approx([0.1, 0.1, 0.1, 0.1, 0.5])
+    assert features[1].tolist() == [0.0] * 5
+    assert features[3][0] == 0.0
+
+
+def test_books_decode_display_fields(snapshot):
+    books = CatalogSnapshot.books([20, 10, 99])
+
+    assert sorted(books) == [10, 20]
+    assert books[10]['name'] == 'learning rust'
+    assert books[10]['publishyear'] == 2019 and books[10]['rating'] == 4.5
+    assert books[20]['authors'] is None and books[20]['rating'] is None
+    assert books[20]['description'] == 'données'
+    assert books[20]['weighted_rating'] == 0.0
+    # the same Python floats a database row carries
+    assert [books[10][column] for column in CatalogSnapshot.FEATURES] == list(ROWS[0][1:6])
+
+
+def test_books_skipped_for_a_newer_catalog_version(snapshot):
+    assert CatalogSnapshot.books([10], catalog_version=7)
+    assert CatalogSnapshot.books([10], catalog_version=8) == {}
+
+
+def test_disabled_snapshot_finds_nothing(snapshot, mocker):
+    mocker.patch.object(Enumerations, 'catalog_snapshot', False)
+
+    assert CatalogSnapshot.features([10])[1].tolist() == [False]
+    assert CatalogSnapshot.books([10]) == {}
@@ -50,3 +50,27 @@ def test_text_cleaner_repeated_lines():
     assert "****" not in cleaned
     assert "section 1" in cleaned
     assert "section 2" in cleaned
+
+
+def test_text_cleaner_plain_text_skips_html_parser(mocker):
+    soup = mocker.patch("ml.pipeline.v1.clean.BeautifulSoup")
+    cleaned = TextCleaner.text_cleaner("Rust  for Beginners!!! (p. 12)")
+    assert cleaned == "rust for beginners"
+    soup.assert_not_called()
+
+
+def test_text_cleaner_entities_use_html_parser():
+    cleaned = TextCleaner.text_cleaner("Tips &amp; Tricks")
+    assert cleaned == "tips tricks"
+
+
+def test_text_cleaner_non_ascii_and_underscores():
+    text = "Café__au_lait — naïve_code"
+    assert TextCleaner.text_cleaner(text) == "caf au_lait na ve_code"
+
+
+def test_clean_many_matches_text_cleaner():
+    texts = ["<p>Learning <b>Python</b></p>", "", None, "Go in Action!!! www.go.dev"]
+    assert TextCleaner.clean_many(texts) == [
+        TextCleaner.text_cleaner(text) if text else "" for text in texts
+    ]
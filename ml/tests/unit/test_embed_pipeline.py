@@ -1,3 +1,4 @@
+import numpy as np
 from ml.pipeline.v1.embed import Embedder
 
 
@@ -29,3 +30,41 @@ def test_embedder_fallback_on_error(mocker):
     assert result['name_cleaned'] == "Error Text"
     assert result['tech_score'] == 0
     assert result['name_embeddings'] == []
+
+
+def test_embed_batch_encodes_unique_misses_once(mocker):
+    mocker.patch('ml.pipeline.v1.embed.Enumerations.embedding_dimension', 2)
+    mocker.patch('ml.pipeline.v1.embed.EmbeddingWorkerPool.enabled', return_value=False)
+    cached = np.array([0.5, 0.5], dtype=np.float32)
+    mocker.patch('ml.pipeline.v1.embed.EmbeddingCache.get_many',
+                 side_effect=lambda texts: [cached if text == 'rust' else None for text in texts])
+    cache_set = mocker.patch('ml.pipeline.v1.embed.EmbeddingCache.set_many')
+
+    mock_model = mocker.MagicMock()
+    mock_model.encode.return_value = np.array([[1.0, 0.0], [0.0, 1.0]])
+    mocker.patch('ml.pipeline.v1.embed.Model.model', return_value=mock_model)
+
+    result = Embedder.embed_batch(["Python", "Rust", "python", "Go <i>fast</i>"])
+
+    assert result['name_cleaned'] == ['python', 'rust', 'python', 'go fast']
+    assert result['tech_score'].tolist() == [1, 1, 1, 0]
+    assert result['name_embeddings'].dtype == np.float32
+    assert result['name_embeddings'].shape == (4, 2)
+    np.testing.assert_array_equal(result['name_embeddings'][1], cached)
+    np.testing.assert_array_equal(result['name_embeddings'][0], result['name_embeddings'][2])
+    assert mock_model.encode.call_args.args[0] == ['python', 'go fast']
+    assert cache_set.call_args.args[0] == ['python', 'go fast']
+
+
+def test_encode_batch_without_cache(mocker):
+    mocker.patch('ml.pipeline.v1.embed.Enumerations.embedding_dimension', 2)
+    mocker.patch('ml.pipeline.v1.embed.EmbeddingWorkerPool.enabled', return_value=False)
+    cache_get = mocker.patch('ml.pipeline.v1.embed.EmbeddingCache.get_many')
+    mock_model = mocker.MagicMock()
+    mock_model.encode.return_value = np.array([[1.0, 0.0]])
+    mocker.patch('ml.pipeline.v1.embed.Model.model', return_value=mock_model)
+
+    embeddings = Embedder.encode_batch(['rust'], use_cache=False)
+
+    assert embeddings.tolist() == [[1.0, 0.0]]
+    cache_get.assert_not_called()
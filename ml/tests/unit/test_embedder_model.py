@@ -15,3 +15,11 @@ def test_model_singleton_initialization(mocker):
     model2 = Model.model()
     assert model2 is mock_instance
     assert mock_transformer.call_count == 1
+
+
+def test_model_warm_up_runs_dummy_encodes(mocker):
+    mock_instance = mocker.MagicMock()
+    mocker.patch.object(Model, 'model', return_value=mock_instance)
+
+    assert Model.warm_up(encodes=3) == 3
+    assert mock_instance.encode.call_count == 3
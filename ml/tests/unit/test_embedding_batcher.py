@@ -0,0 +1,48 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from ml.Enum.Enumerations import Enumerations
+from ml.pipeline.v1.batcher import EmbeddingBatcher
+
+
+@pytest.fixture
+def batcher(mocker):
+    mocker.patch.object(Enumerations, 'embed_batch_max_size', 8)
+    mocker.patch.object(Enumerations, 'embed_batch_max_wait', 0.2)
+    EmbeddingBatcher.shutdown()
+    yield EmbeddingBatcher
+    EmbeddingBatcher.shutdown()
+
+
+def test_batcher_groups_concurrent_queries(batcher, mocker):
+    mock_model = mocker.MagicMock()
+    mock_model.encode.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    mocker.patch('ml.pipeline.v1.batcher.Model.model', return_value=mock_model)
+
+    texts = ['a', 'bb', 'ccc', 'dddd']
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(batcher.encode, texts))
+
+    assert results == [[1.0], [2.0], [3.0], [4.0]]
+    assert mock_model.encode.call_count < len(texts)
+
+
+def test_batcher_deduplicates_identical_queries(batcher, mocker):
+    mock_model = mocker.MagicMock()
+    mock_model.encode.side_effect = lambda texts: [[0.5] for _ in texts]
+    mocker.patch('ml.pipeline.v1.batcher.Model.model', return_value=mock_model)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(batcher.encode, ['python'] * 3))
+
+    assert results == [[0.5]] * 3
+    encoded = [t for call in mock_model.encode.call_args_list for t in call.args[0]]
+    assert encoded.count('python') == mock_model.encode.call_count
+
+
+def test_batcher_propagates_errors(batcher, mocker):
+    mock_model = mocker.MagicMock()
+    mock_model.encode.side_effect = Exception('Encode Error')
+    mocker.patch('ml.pipeline.v1.batcher.Model.model', return_value=mock_model)
+
+    with pytest.raises(Exception, match='Encode Error'):
+        batcher.encode('python')
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+from ml.Enum.Enumerations import Enumerations
+from ml.pipeline.v1.embedding_cache import EmbeddingCache
+from ml.pipeline.v1.embed import Embedder
+
+
+@pytest.fixture
+def cache(mocker):
+    mocker.patch.object(Enumerations, 'embed_cache', True)
+    mocker.patch.object(Enumerations, 'embed_cache_redis', False)
+    mocker.patch.object(EmbeddingCache, '_loaded', True)
+    EmbeddingCache.clear()
+    yield EmbeddingCache
+    EmbeddingCache.clear()
+
+
+@pytest.fixture
+def mock_redis(mocker):
+    store = {}
+    client = mocker.MagicMock()
+    client.get.side_effect = store.get
+    client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+
+    mocker.patch.object(Enumerations, 'embed_cache_redis', True)
+    mocker.patch.object(EmbeddingCache, '_redis', client)
+    mocker.patch.object(EmbeddingCache, '_redis_retry_at', 0.0)
+    return client, store
+
+
+def test_cache_miss_then_hit(cache):
+    assert cache.get('deep learning') is None
+
+    cache.set('deep learning', [0.1, 0.2, 0.3])
+    result = cache.get('deep learning')
+
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, [0.1, 0.2, 0.3], rtol=1e-6)
+
+
+def test_cache_evicts_least_recently_used(cache, mocker):
+    mocker.patch.object(Enumerations, 'embed_cache_size', 2)
+
+    cache.set('a', [1.0])
+    cache.set('b', [2.0])
+    cache.get('a')
+    cache.set('c', [3.0])
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+
+def test_cache_redis_tier_stores_raw_bytes(cache, mock_redis):
+    client, store = mock_redis
+
+    cache.set('rust', [0.5, 0.25])
+    assert list(store.values())[0] == np.array([0.5, 0.25], dtype=np.float32).tobytes()
+
+    cache.clear()
+    result = cache.get('rust')
+
+    np.testing.assert_allclose(result, [0.5, 0.25])
+    client.get.assert_called_once()
+
+
+def test_cache_get_many_uses_one_mget(cache, mock_redis):
+    client, store = mock_redis
+    client.mget.side_effect = lambda keys: [store.get(key) for key in keys]
+    pipeline = client.pipeline.return_value
+    pipeline.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+
+    cache.set('go', [1.0, 0.0])
+    cache.set_many(['rust', 'python'], [[0.5, 0.25], [0.0, 1.0]])
+    pipeline.execute.assert_called_once()
+
+    cache.clear()
+    cache.set('go', [1.0, 0.0])
+    result = cache.get_many(['go', 'rust', 'java', 'python'])
+
+    np.testing.assert_allclose(result[0], [1.0, 0.0])
+    np.testing.assert_allclose(result[1], [0.5, 0.25])
+    assert result[2] is None
+    np.testing.assert_allclose(result[3], [0.0, 1.0])
+    client.mget.assert_called_once()
+    assert len(client.mget.call_args.args[0]) == 3
+
+
+def test_cache_redis_failure_backs_off(cache, mock_redis):
+    client, _ = mock_redis
+    client.get.side_effect = Exception('Redis Down')
+
+    assert cache.get('python') is None
+    assert cache.get('python') is None
+    client.get.assert_called_once()
+
+
+def test_cache_disk_snapshot_roundtrip(cache, tmp_path):
+    path = str(tmp_path / 'embeddings.npz')
+
+    cache.set('clean code', [0.1, 0.9])
+    assert cache.save(path) == 1
+
+    cache.clear()
+    assert cache.load(path) == 1
+    np.testing.assert_allclose(cache.get('clean code'), [0.1, 0.9], rtol=1e-6)
+
+
+def test_embedder_skips_encode_on_cache_hit(cache, mocker):
+    mocker.patch('ml.pipeline.v1.embed.FeatureExtractor.feature_extractor', return_value={
+        'name_cleaned': 'kubernetes',
+        'tech_score': 1
+    })
+    mock_model = mocker.MagicMock()
+    mock_model.encode.return_value = [[0.3, 0.4]]
+    mocker.patch('ml.pipeline.v1.embed.Model.model', return_value=mock_model)
+    mocker.patch.object(Enumerations, 'embed_batching', False)
+
+    first = Embedder.embedder('Kubernetes')
+    second = Embedder.embedder('KUBERNETES!')
+
+    assert mock_model.encode.call_count == 1
+    np.testing.assert_allclose(second['name_embeddings'], first['name_embeddings'], rtol=1e-6)
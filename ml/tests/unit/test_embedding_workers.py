@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from ml.Enum.Enumerations import Enumerations
+from ml.inference import embedding_workers
+from ml.inference.embedding_workers import EmbeddingWorkerPool
+
+
+@pytest.fixture
+def inline_pool(mocker):
+    mock_model = mocker.MagicMock()
+    mock_model.encode.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+    mocker.patch.object(embedding_workers, '_worker_model', mock_model)
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    mocker.patch.object(EmbeddingWorkerPool, 'get_executor', return_value=executor)
+    mocker.patch.object(Enumerations, 'embedding_workers', 2)
+
+    yield mock_model
+    executor.shutdown()
+
+
+def test_worker_returns_float32_buffer(inline_pool):
+    buffer, shape = embedding_workers._encode_in_worker(['ab', 'abc'])
+
+    assert isinstance(buffer, bytes)
+    assert shape == (2, 2)
+    assert len(buffer) == 2 * 2 * 4
+
+
+def test_pool_encode_rebuilds_array(inline_pool):
+    result = EmbeddingWorkerPool.encode(['ab', 'abc'])
+
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, [[2.0, 1.0], [3.0, 1.0]])
+
+
+def test_pool_warm_up_hits_every_worker(inline_pool):
+    assert EmbeddingWorkerPool.warm_up() == 2
+    assert inline_pool.encode.call_count == 2
+
+
+def test_init_worker_sets_torch_threads(mocker):
+    mocker.patch.object(Enumerations, 'embedding_backend', 'torch')
+    mock_set_threads = mocker.patch('torch.set_num_threads')
+    mocker.patch('ml.models.v1.embedder.Model.model', return_value=mocker.MagicMock())
+
+    embedding_workers._init_worker(4)
+
+    mock_set_threads.assert_called_once_with(4)
+
+
+def test_pool_restarts_after_broken_pool(mocker):
+    executor = mocker.MagicMock()
+    executor.submit.side_effect = BrokenProcessPool('worker died')
+    mocker.patch.object(EmbeddingWorkerPool, '_executor', executor)
+
+    with pytest.raises(BrokenProcessPool):
+        EmbeddingWorkerPool.encode(['python'])
+
+    assert EmbeddingWorkerPool._executor is None
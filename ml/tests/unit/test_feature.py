@@ -1,3 +1,4 @@
+import pandas as pd
 from ml.pipeline.v1.feature import FeatureExtractor
 
 
@@ -24,3 +25,30 @@ def test_feature_extractor_case_insensitivity():
     text = "PYTHON and rEaCt"
     result = FeatureExtractor.feature_extractor(text)
     assert result['tech_score'] == 2
+
+
+def test_feature_extractor_exposes_matched_keywords():
+    result = FeatureExtractor.feature_extractor("Docker and Kubernetes for DevOps")
+    assert result['tech_keywords'] == ['devops', 'docker', 'kubernetes']
+    assert result['tech_score'] == 3
+
+
+def test_feature_extractor_batch_keeps_index():
+    texts = pd.Series(["Learn <b>Python</b>", None, "A cozy mystery"], index=[10, 11, 12])
+    result = FeatureExtractor.feature_extractor_batch(texts)
+    assert list(result.index) == [10, 11, 12]
+    assert result['name_cleaned'].tolist() == ["learn python", "", "a cozy mystery"]
+    assert result['tech_score'].tolist() == [1, 0, 0]
+    assert result.loc[10, 'tech_keywords'] == ['python']
+
+
+def test_tech_category_counts_keywords_per_category():
+    assert FeatureExtractor.tech_category(['python', 'rust', 'docker']) == 'languages'
+    assert FeatureExtractor.tech_category(['docker', 'kubernetes', 'python']) == 'infrastructure'
+    assert FeatureExtractor.tech_category([]) == FeatureExtractor.GENERAL_CATEGORY
+
+
+def test_feature_extractor_exposes_category():
+    result = FeatureExtractor.feature_extractor("Docker and Kubernetes for DevOps")
+    assert result['tech_category'] == FeatureExtractor.tech_category(result['tech_keywords'])
+    assert FeatureExtractor.feature_extractor("A cozy mystery")['tech_category'] == 'general'
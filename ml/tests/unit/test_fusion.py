@@ -0,0 +1,33 @@
+import pytest
+from ml.reranking.fusion import RankFusion
+
+
+def test_reciprocal_rank_sums_both_rankings():
+    vector = [{"book_id": 1, "similarity": 0.9}, {"book_id": 2, "similarity": 0.8}]
+    lexical = [{"book_id": 2, "similarity": 0.8}, {"book_id": 3, "similarity": 0.5}]
+
+    result = RankFusion.reciprocal_rank([vector, lexical], k=60)
+
+    assert [book["book_id"] for book in result] == [2, 1, 3]
+    assert result[0]["rrf_score"] == pytest.approx(1 / 62 + 1 / 61)
+    assert result[1]["rrf_score"] == pytest.approx(1 / 61)
+
+
+def test_reciprocal_rank_ties_keep_first_ranking_order():
+    vector = [{"book_id": 1}, {"book_id": 2}]
+    lexical = [{"book_id": 3}, {"book_id": 4}]
+
+    result = RankFusion.reciprocal_rank([vector, lexical], top_k=3)
+
+    assert [book["book_id"] for book in result] == [1, 3, 2]
+
+
+def test_reciprocal_rank_keeps_first_seen_book():
+    vector = [{"book_id": 1, "name": "vector"}]
+    lexical = [{"book_id": 1, "name": "lexical"}]
+
+    assert RankFusion.reciprocal_rank([vector, lexical])[0]["name"] == "vector"
+
+
+def test_reciprocal_rank_empty():
+    assert RankFusion.reciprocal_rank([[], []]) == []
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from ml.services.hnsw_index import HnswVectorIndex
+from ml.services.mmap_index import MmapVectorIndex
+
+pytest.importorskip('hnswlib')
+
+
+@pytest.fixture
+def snapshot(tmp_path, mocker):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(200, 8)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    path = tmp_path / 'v1'
+    path.mkdir()
+    np.save(path / MmapVectorIndex.EMBEDDINGS_FILE, embeddings)
+    np.save(path / MmapVectorIndex.BOOK_IDS_FILE, np.arange(1, 201, dtype=np.int64))
+    (tmp_path / MmapVectorIndex.CURRENT_FILE).write_text('v1')
+
+    mocker.patch('ml.services.hnsw_index.Enumerations.embedding_storage_dimension', 8)
+    mocker.patch.object(HnswVectorIndex, '_index', None)
+    mocker.patch.object(HnswVectorIndex, '_state', None)
+    return tmp_path, embeddings
+
+
+def test_build_and_search_matches_exact(snapshot):
+    snapshot_dir, embeddings = snapshot
+    HnswVectorIndex.build(str(snapshot_dir), m=16, ef_construction=100)
+    assert HnswVectorIndex.load(str(snapshot_dir)) is True
+
+    query = embeddings[41]
+    results = HnswVectorIndex.search(query, top_k=5, ef=200)
+    exact = np.argsort(-(embeddings @ query))[:5] + 1
+
+    assert [r['book_id'] for r in results] == exact.tolist()
+    assert results[0]['book_id'] == 42
+    assert results[0]['similarity'] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_custom_ef_is_restored(snapshot, mocker):
+    snapshot_dir, embeddings = snapshot
+    mocker.patch('ml.services.hnsw_index.Enumerations.hnsw_local_ef_search', 50)
+    HnswVectorIndex.build(str(snapshot_dir))
+    HnswVectorIndex.load(str(snapshot_dir))
+
+    HnswVectorIndex.search(embeddings[0], top_k=3, ef=300)
+
+    assert HnswVectorIndex._index.ef == 50
+
+
+def test_add_grows_index_and_replaces_vectors(snapshot):
+    snapshot_dir, embeddings = snapshot
+    HnswVectorIndex.build(str(snapshot_dir))
+    HnswVectorIndex.load(str(snapshot_dir))
+    index = HnswVectorIndex._index
+
+    new_vector = np.zeros((1, 8), dtype=np.float32)
+    new_vector[0, 0] = 2.0
+    assert HnswVectorIndex.add(index, [500], new_vector) == 1
+    assert index.get_current_count() == 201
+
+    results = HnswVectorIndex.search(new_vector[0], top_k=1)
+    assert results[0]['book_id'] == 500
+
+
+def test_load_without_index(tmp_path):
+    assert HnswVectorIndex.load(str(tmp_path)) is False
@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from ml.inference.search import Search
 
 
@@ -13,6 +15,7 @@ def test_search_no_embedding(mocker):
 
 
 def test_search_no_vector_results(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'mmap')
     mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
     mocker.patch('ml.inference.search.VectorService.search_similar_books', return_value=[])
 
@@ -21,6 +24,7 @@ def test_search_no_vector_results(mocker):
 
 
 def test_search_success(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'mmap')
     mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
     mocker.patch('ml.inference.search.VectorService.search_similar_books', return_value=[
         {"book_id": 1, "similarity": 0.9},
@@ -46,3 +50,218 @@ def test_search_exception(mocker):
     mocker.patch('ml.inference.search.Embedder.embedder', side_effect=Exception("Search Error"))
     result = Search.search("Test")
     assert result == []
+
+
+def test_search_local_backend_keeps_knn_order(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'mmap')
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    mocker.patch('ml.inference.search.VectorService.search_similar_books', return_value=[
+        {"book_id": 9, "similarity": 0.9},
+        {"book_id": 3, "similarity": 0.7}
+    ])
+    mocker.patch('ml.inference.search.MetadataService.get_books_metadata', return_value=[
+        {"book_id": 3, "name": "Book 3"},
+        {"book_id": 9, "name": "Book 9"}
+    ])
+
+    result = Search.search("Test")
+
+    assert [book["book_id"] for book in result] == [9, 3]
+
+
+def test_search_pgvector_uses_fused_query(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'pgvector')
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    fused = mocker.patch('ml.inference.search.VectorService.search_books_with_metadata', return_value=[
+        {"book_id": 1, "name": "Book 1", "similarity": 0.9}
+    ])
+    two_step = mocker.patch('ml.inference.search.VectorService.search_similar_books')
+    metadata = mocker.patch('ml.inference.search.MetadataService.get_books_metadata')
+
+    result = Search.search("Test", top_k=5)
+
+    assert result == [{"book_id": 1, "name": "Book 1", "similarity": 0.9}]
+    fused.assert_called_once_with(query_embedding=[0.1, 0.2], top_k=5, filters={})
+    two_step.assert_not_called()
+    metadata.assert_not_called()
+
+
+async def test_search_async_uses_fused_async_query(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'pgvector')
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    fused = mocker.patch('ml.inference.search.VectorService.search_books_with_metadata_async',
+                         mocker.AsyncMock(return_value=[{"book_id": 1, "similarity": 0.9}]))
+
+    result = await Search.search_async("Test", top_k=3)
+
+    assert result == [{"book_id": 1, "similarity": 0.9}]
+    fused.assert_awaited_once_with(query_embedding=[0.1, 0.2], top_k=3, filters={})
+
+
+async def test_search_async_local_backend(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'hnsw')
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    mocker.patch('ml.inference.search.VectorService.search_similar_books_async', mocker.AsyncMock(return_value=[
+        {"book_id": 2, "similarity": 0.4},
+        {"book_id": 1, "similarity": 0.9}
+    ]))
+    mocker.patch('ml.inference.search.MetadataService.get_books_metadata_async', mocker.AsyncMock(return_value=[
+        {"book_id": 2, "name": "Book 2"},
+        {"book_id": 1, "name": "Book 1"}
+    ]))
+
+    result = await Search.search_async("Test")
+
+    assert [book["book_id"] for book in result] == [1, 2]
+    assert result[0]["similarity"] == 0.9
+
+
+def test_search_filters_bypass_local_backend(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'hnsw')
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    fused = mocker.patch('ml.inference.search.VectorService.search_books_with_metadata', return_value=[
+        {"book_id": 1, "name": "Book 1", "similarity": 0.9}
+    ])
+    local = mocker.patch('ml.inference.search.VectorService.search_similar_books')
+
+    result = Search.search("Test", top_k=5, filters={"min_year": 2020, "publisher": " "})
+
+    assert result == [{"book_id": 1, "name": "Book 1", "similarity": 0.9}]
+    fused.assert_called_once_with(query_embedding=[0.1, 0.2], top_k=5, filters={"min_year": 2020})
+    local.assert_not_called()
+
+
+def test_search_hybrid_fuses_lexical_results(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'pgvector')
+    mocker.patch('ml.inference.search.Enumerations.hybrid_search', True)
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    mocker.patch('ml.inference.search.VectorService.search_books_with_metadata', return_value=[
+        {"book_id": 1, "similarity": 0.9},
+        {"book_id": 2, "similarity": 0.8}
+    ])
+    lexical = mocker.patch('ml.inference.search.LexicalService.search_books_with_metadata', return_value=[
+        {"book_id": 2, "similarity": 0.8},
+        {"book_id": 3, "similarity": 0.4}
+    ])
+
+    result = Search.search("rust ownership", top_k=2)
+
+    assert [book["book_id"] for book in result] == [2, 1]
+    lexical.assert_called_once_with("rust ownership", [0.1, 0.2], 2)
+
+
+def test_search_hybrid_runs_lexical_alongside_the_vector_query(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'pgvector')
+    mocker.patch('ml.inference.search.Enumerations.hybrid_search', True)
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    started = threading.Event()
+
+    def lexical(user_text, query_embedding, top_k):
+        started.set()
+        return [{"book_id": 3, "similarity": 0.4}]
+
+    def vector(query_embedding, top_k, filters):
+        # the lexical query is already running on another thread
+        assert started.wait(5)
+        return [{"book_id": 1, "similarity": 0.9}]
+
+    mocker.patch('ml.inference.search.VectorService.search_books_with_metadata', side_effect=vector)
+    mocker.patch('ml.inference.search.LexicalService.search_books_with_metadata', side_effect=lexical)
+
+    result = Search.search("rust", top_k=5)
+
+    assert sorted(book["book_id"] for book in result) == [1, 3]
+
+
+async def test_search_async_hybrid_runs_both_retrievers(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'pgvector')
+    mocker.patch('ml.inference.search.Enumerations.hybrid_search', True)
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    mocker.patch('ml.inference.search.VectorService.search_books_with_metadata_async',
+                 mocker.AsyncMock(return_value=[]))
+    lexical = mocker.patch('ml.inference.search.LexicalService.search_books_with_metadata_async',
+                           mocker.AsyncMock(return_value=[{"book_id": 3, "similarity": 0.4}]))
+
+    result = await Search.search_async("rust", top_k=5)
+
+    assert [book["book_id"] for book in result] == [3]
+    lexical.assert_awaited_once_with("rust", [0.1, 0.2], 5)
+
+
+def test_search_hybrid_skipped_for_filters(mocker):
+    mocker.patch('ml.inference.search.Enumerations.hybrid_search', True)
+    mocker.patch('ml.inference.search.Embedder.embedder', return_value={"name_embeddings": [0.1, 0.2]})
+    mocker.patch('ml.inference.search.VectorService.search_books_with_metadata', return_value=[
+        {"book_id": 1, "similarity": 0.9}
+    ])
+    lexical = mocker.patch('ml.inference.search.LexicalService.search_books_with_metadata')
+
+    result = Search.search("rust", filters={"min_year": 2020})
+
+    assert result == [{"book_id": 1, "similarity": 0.9}]
+    lexical.assert_not_called()
+
+
+async def test_search_async_exception(mocker):
+    mocker.patch('ml.inference.search.Embedder.embedder', side_effect=Exception("Search Error"))
+    assert await Search.search_async("Test") == []
+
+
+def test_search_batch_pgvector_single_statement(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'pgvector')
+    mocker.patch('ml.inference.search.Embedder.embed_batch', return_value={"name_embeddings": [[0.1, 0.2], [0.3, 0.4]]})
+    batch = mocker.patch('ml.inference.search.VectorService.search_books_with_metadata_batch', return_value=[
+        [{"book_id": 1, "similarity": 0.9}],
+        []
+    ])
+
+    result = Search.search_batch(["rust", "go"], top_k=5)
+
+    assert result == [[{"book_id": 1, "similarity": 0.9}], []]
+    batch.assert_called_once_with(query_embeddings=[[0.1, 0.2], [0.3, 0.4]], top_k=5)
+
+
+async def test_search_batch_async_local_backend_fetches_metadata_once(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'hnsw')
+    mocker.patch('ml.inference.search.Embedder.embed_batch', return_value={"name_embeddings": [[0.1, 0.2], [0.3, 0.4]]})
+    mocker.patch('ml.inference.search.VectorService.search_similar_books_async', mocker.AsyncMock(side_effect=[
+        [{"book_id": 2, "similarity": 0.4}, {"book_id": 1, "similarity": 0.9}],
+        [{"book_id": 1, "similarity": 0.3}]
+    ]))
+    metadata = mocker.patch('ml.inference.search.MetadataService.get_books_metadata_async', mocker.AsyncMock(return_value=[
+        {"book_id": 1, "name": "Book 1"},
+        {"book_id": 2, "name": "Book 2"}
+    ]))
+
+    result = await Search.search_batch_async(["rust", "go"])
+
+    assert [[book["book_id"] for book in books] for books in result] == [[1, 2], [1]]
+    assert result[0][0]["similarity"] == 0.9
+    assert result[1][0]["similarity"] == 0.3
+    metadata.assert_awaited_once()
+    assert sorted(metadata.call_args.args[0]) == [1, 2]
+
+
+
+async def test_search_batch_async_local_backend_runs_queries_concurrently(mocker):
+    mocker.patch('ml.inference.search.Enumerations.vector_search_backend', 'mmap')
+    mocker.patch('ml.inference.search.Embedder.embed_batch', return_value={"name_embeddings": [[0.1, 0.2], [0.3, 0.4]]})
+    barrier = asyncio.Barrier(2)
+
+    async def search(query_embedding, top_k):
+        # both queries have to be in flight at once to pass the barrier
+        await asyncio.wait_for(barrier.wait(), timeout=1)
+        return [{"book_id": 1, "similarity": 0.5}]
+
+    mocker.patch('ml.inference.search.VectorService.search_similar_books_async', side_effect=search)
+    mocker.patch('ml.inference.search.MetadataService.get_books_metadata_async',
+                 mocker.AsyncMock(return_value=[{"book_id": 1, "name": "Book 1"}]))
+
+    result = await Search.search_batch_async(["rust", "go"])
+
+    assert [[book["book_id"] for book in books] for books in result] == [[1], [1]]
+
+
+def test_search_batch_embedding_failure(mocker):
+    mocker.patch('ml.inference.search.Embedder.embed_batch', return_value={"name_embeddings": []})
+    assert Search.search_batch(["rust", "go"]) == [[], []]
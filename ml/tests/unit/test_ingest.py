@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ml.pipeline.v1.ingest import BookIngestion
+from ml.pipeline.v1.feature import FeatureExtractor
+
+
+@pytest.fixture
+def chunk():
+    return pd.DataFrame({
+        'Name': ['Learning <b>Python</b>', 'A Novel'],
+        'Authors': ['Mark Lutz', None],
+        'Publisher': ["O'Reilly", 'Penguin'],
+        'Description': ['Python programming with django.', None],
+        'Rating': [4.5, 3.0],
+        'PublishYear': [2013, 2000],
+        'CountsOfReview': [100, 0],
+        'RatingDist5': ['5:60', '5:0'],
+        'RatingDist4': ['4:20', '4:0'],
+        'RatingDist2': ['2:5', '2:0'],
+        'RatingDist1': ['1:5', '1:0'],
+        'RatingDistTotal': ['total:100', 'total:0'],
+    })
+
+
+@pytest.fixture
+def stats():
+    return {
+        'mean_rating': 4.0,
+        'min_votes': 100.0,
+        'min_year': 2000.0,
+        'max_year': 2020.0,
+        'max_log_reviews': float(np.log1p(100)),
+    }
+
+
+def test_compute_stats(tmp_path, chunk):
+    path = tmp_path / 'books.csv'
+    chunk.to_csv(path, index=False)
+
+    stats = BookIngestion.compute_stats(str(path), chunk_size=1)
+
+    assert stats['rows'] == 2
+    assert stats['mean_rating'] == 3.75
+    assert stats['min_year'] == 2000.0
+    assert stats['max_year'] == 2013.0
+
+
+def test_features(chunk, stats):
+    features = BookIngestion.features(chunk, stats)
+
+    assert features.loc[0, 'weighted_rating'] == pytest.approx(((0.5 * 4.5) + (0.5 * 4.0)) / 5.0)
+    assert features.loc[1, 'weighted_rating'] == pytest.approx(4.0 / 5.0)
+    assert features.loc[0, 'counts_of_review_scaled'] == pytest.approx(1.0)
+    assert features.loc[0, 'publishyear_scaled'] == pytest.approx(0.65)
+    assert features.loc[0, 'average_low_rating'] == pytest.approx(0.1)
+    assert features.loc[0, 'average_high_rating'] == pytest.approx(0.8)
+    assert features.loc[1, 'average_low_rating'] == 0.0
+
+
+def test_clean_texts_scores_keywords():
+    cleaned = BookIngestion.clean_texts([('Learning <b>Python</b>', 'Python with django.')])
+
+    name, description, tech_score, category = cleaned[0]
+    assert name == 'learning python'
+    assert 'django' in description
+    assert tech_score >= 2
+    assert category == 'languages'
+
+
+def test_build_rows(chunk, stats):
+    cleaned = [('learning python', 'python programming with django', 3, 'languages'), ('a novel', '', 0, 'general')]
+    embeddings = np.ones((2, 4), dtype=np.float32)
+
+    rows = BookIngestion.build_rows(chunk, 11, cleaned, embeddings, stats)
+
+    assert len(rows) == 2
+    assert len(rows[0]) == len(BookIngestion.BOOK_COLUMNS)
+    assert rows[0][0] == 11 and rows[1][0] == 12
+    assert rows[1][3] is None
+    assert rows[1][5] is None
+    assert rows[0][8] == 2013
+    assert rows[0][11] == pytest.approx(0.3)
+    assert [row[-1] for row in rows] == ['languages', 'general']
+
+
+def test_copy_rows_replaces_chunk_range(mocker):
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    row = (5, 'n', 'n', None, None, None, '', 4.0, 2020, 0.8, 0.1, 0.1, 1.0, 0.0, 1.0, [0.1, 0.2], 'general')
+
+    BookIngestion.copy_rows(conn, [row, (6,) + row[1:]])
+
+    cursor.execute.assert_called_once_with('DELETE FROM books WHERE book_id BETWEEN %s AND %s;', (5, 6))
+    sql, payload = cursor.copy_expert.call_args.args
+    assert 'FORMAT binary' in sql
+    assert payload.read().startswith(b'PGCOPY')
+    conn.commit.assert_called_once()
+
+
+def test_checkpoint_roundtrip_and_mismatch(tmp_path):
+    path = str(tmp_path / 'checkpoint.json')
+    csv_path = str(tmp_path / 'books.csv')
+
+    checkpoint = BookIngestion.load_checkpoint(path, csv_path, 100)
+    assert checkpoint['next_chunk'] == 0
+
+    checkpoint['next_chunk'] = 3
+    BookIngestion.save_checkpoint(path, checkpoint)
+
+    assert BookIngestion.load_checkpoint(path, csv_path, 100)['next_chunk'] == 3
+    assert BookIngestion.load_checkpoint(path, csv_path, 200)['next_chunk'] == 0
+
+
+def test_schema_partitions_match_categories():
+    schema = BookIngestion._schema()
+    partitions = [statement.split()[5] for statement in schema['create_partitions']]
+
+    assert partitions == [f'books_{category}' for category in FeatureExtractor.CATEGORIES]
+    assert schema['create_partitions'][-1].endswith('DEFAULT;')
+
+
+def test_finish_table_builds_partition_indexes(mocker):
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [('books_general',), ('books_languages',)]
+    build = mocker.patch.object(BookIngestion, 'build_partition_indexes')
+
+    BookIngestion.finish_table(conn)
+
+    partitions, statements = build.call_args.args
+    assert partitions == ['books_general', 'books_languages']
+    assert statements[0].startswith('CREATE INDEX IF NOT EXISTS {partition}_embedding_idx')
+    assert 'ATTACH PARTITION {partition}_embedding_idx' in statements[1]
+
+
+def test_finish_table_skips_unpartitioned_table(mocker):
+    conn = mocker.MagicMock()
+    conn.cursor.return_value.__enter__.return_value.fetchall.return_value = []
+    build = mocker.patch.object(BookIngestion, 'build_partition_indexes')
+
+    BookIngestion.finish_table(conn)
+
+    build.assert_not_called()
+
+
+def test_prepare_table_creates_missing_table_before_the_load(mocker):
+    conn = mocker.MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.side_effect = [('p',), ('vector(384)',)]
+    mocker.patch('ml.pipeline.v1.ingest.Enumerations.embedding_storage_type', 'vector(384)')
+
+    BookIngestion.prepare_table(conn, truncate=False, drop_index=True)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert statements[:2] == BookIngestion._schema()['setup_commands']
+    assert statements[2].startswith('CREATE TABLE IF NOT EXISTS books(')
+    assert statements[4:14] == BookIngestion._schema()['create_partitions']
+
+
+def test_partition_table_installs_extensions_before_the_move(mocker):
+    conn = mocker.MagicMock()
+    mocker.patch('ml.pipeline.v1.ingest.MLPostgresConnectionPool.get_connection').return_value.__enter__.return_value = conn
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+    cursor.fetchmany.return_value = []
+    mocker.patch.object(BookIngestion, 'finish_table')
+
+    BookIngestion.partition_table()
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    setup = BookIngestion._schema()['setup_commands']
+    assert statements[1:1 + len(setup)] == setup
+    assert statements.index('ALTER TABLE books RENAME TO books_unpartitioned;') > len(setup)
+
+
+def test_partition_table_uses_the_configured_embedding_storage(mocker):
+    mocker.patch('ml.pipeline.v1.ingest.Enumerations.embedding_storage_type', 'halfvec(256)')
+    conn = mocker.MagicMock()
+    mocker.patch('ml.pipeline.v1.ingest.MLPostgresConnectionPool.get_connection').return_value.__enter__.return_value = conn
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+    cursor.fetchmany.return_value = []
+    mocker.patch.object(BookIngestion, 'finish_table')
+
+    BookIngestion.partition_table()
+
+    create = next(call.args[0] for call in cursor.execute.call_args_list if 'PARTITION BY LIST' in call.args[0])
+    assert 'embedding halfvec(256),' in create
+    assert 'VECTOR(384)' not in create
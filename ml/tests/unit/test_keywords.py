@@ -0,0 +1,23 @@
+from ml.pipeline.v1.keywords import KeywordMatcher
+
+
+def test_matches_overlapping_keywords():
+    matcher = KeywordMatcher(['java', 'javascript', 'script', 'rag'])
+    assert matcher.matches('Modern JavaScript and storage') == {'java', 'javascript', 'script', 'rag'}
+
+
+def test_matches_keyword_after_failed_prefix():
+    matcher = KeywordMatcher(['python', 'oop'])
+    assert matcher.matches('oopython') == {'oop', 'python'}
+
+
+def test_score_counts_distinct_keywords():
+    matcher = KeywordMatcher(['rust', 'go'])
+    assert matcher.score('rust rust rust') == 1
+    assert matcher.score('') == 0
+    assert matcher.matches(None) == set()
+
+
+def test_matches_punctuated_keywords():
+    matcher = KeywordMatcher(['c++', 'node.js', 'ci/cd'])
+    assert matcher.matches('C++ and Node.js on a CI/CD box') == {'c++', 'node.js', 'ci/cd'}
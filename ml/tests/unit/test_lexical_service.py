@@ -0,0 +1,52 @@
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from ml.services.lexical_service import LexicalService
+from ml.services.pgvector_codec import QueryVector
+
+
+def test_search_books_with_metadata_empty_text():
+    assert LexicalService.search_books_with_metadata("  ", [0.1, 0.2]) == []
+
+
+def test_search_books_with_metadata_success(mocker):
+    mocker.patch('ml.services.lexical_service.EmbeddingProjection.enabled', return_value=False)
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [
+        {'book_id': 7, 'name': 'Rust in Action', 'similarity': Decimal('0.75')}
+    ]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.lexical_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = LexicalService.search_books_with_metadata("rust", [0.1, 0.2], top_k=5)
+
+    assert result == [{'book_id': 7, 'name': 'Rust in Action', 'similarity': 0.75}]
+    assert isinstance(result[0]['similarity'], float)
+    query, params = mock_cursor.execute.call_args.args
+    assert 'websearch_to_tsquery' in query
+    assert params == ("rust", 5, QueryVector([0.1, 0.2]))
+
+
+def test_search_books_with_metadata_db_error(mocker):
+    mocker.patch('ml.services.lexical_service.MLPostgresConnectionPool.get_connection', side_effect=Exception("DB Error"))
+
+    assert LexicalService.search_books_with_metadata("rust", [0.1, 0.2]) == []
+
+
+async def test_search_books_with_metadata_async(mocker):
+    mocker.patch('ml.services.lexical_service.EmbeddingProjection.enabled', return_value=False)
+    conn = mocker.MagicMock()
+    conn.fetch = mocker.AsyncMock(return_value=[{'book_id': 7, 'similarity': 0.5}])
+
+    @asynccontextmanager
+    async def get_connection(read_only=False):
+        yield conn
+
+    mocker.patch('ml.services.lexical_service.MLAsyncPostgresConnectionPool.get_connection', get_connection)
+
+    result = await LexicalService.search_books_with_metadata_async("rust", [0.1, 0.2], top_k=5)
+
+    assert result == [{'book_id': 7, 'similarity': 0.5}]
+    assert conn.fetch.call_args.args[1:3] == ("rust", 5)
+    assert conn.fetch.call_args.args[3] == QueryVector([0.1, 0.2])
@@ -0,0 +1,101 @@
+import pytest
+from ml.Enum.Enumerations import Enumerations
+from ml.services.metadata_cache import MetadataCache
+
+
+@pytest.fixture
+def cache(mocker):
+    mocker.patch.object(Enumerations, 'metadata_cache', True)
+    mocker.patch.object(Enumerations, 'metadata_cache_size', 2)
+    MetadataCache.clear()
+    MetadataCache.set_version(1)
+    yield MetadataCache
+    MetadataCache.clear()
+
+
+def test_get_many_splits_hits_and_missing_ids(cache):
+    cache.set_many([{'book_id': 1, 'name': 'rust'}], 1)
+
+    found, missing, version = cache.get_many([1, 2, 1])
+
+    assert found == {1: {'book_id': 1, 'name': 'rust'}}
+    assert missing == [2]
+    assert version == 1
+
+
+def test_returned_rows_are_copies(cache):
+    cache.set_many([{'book_id': 1, 'name': 'rust'}], 1)
+
+    cache.get_many([1])[0][1]['similarity'] = 0.9
+
+    assert 'similarity' not in cache.get_many([1])[0][1]
+
+
+def test_least_recently_used_book_is_evicted(cache):
+    cache.set_many([{'book_id': 1}, {'book_id': 2}], 1)
+    cache.get_many([1])
+    cache.set_many([{'book_id': 3}], 1)
+
+    found, missing, _ = cache.get_many([1, 2, 3])
+
+    assert sorted(found) == [1, 3]
+    assert missing == [2]
+
+
+def test_expired_books_are_refetched(cache, mocker):
+    mocker.patch.object(Enumerations, 'metadata_cache_ttl', -1)
+    cache.set_many([{'book_id': 1}], 1)
+
+    assert cache.get_many([1])[1] == [1]
+    assert cache.stats()['books'] == 0
+
+
+def test_new_catalog_version_drops_everything(cache):
+    cache.set_many([{'book_id': 1}], 1)
+
+    cache.set_version(None)
+    assert cache.get_many([1])[0]
+
+    cache.set_version(2)
+    assert cache.get_many([1])[1] == [1]
+
+
+def test_rows_of_an_older_version_are_not_cached(cache):
+    cache.set_version(2)
+    cache.set_many([{'book_id': 1}], 1)
+
+    assert cache.get_many([1])[1] == [1]
+
+
+def test_stats_report_hit_ratio_and_bytes(cache):
+    cache.set_many([{'book_id': 1, 'description': 'x' * 1000}], 1)
+    cache.get_many([1, 2])
+
+    stats = cache.stats()
+
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_ratio'] == 0.5
+    assert stats['bytes'] > 1000
+    assert stats['catalog_version'] == 1
+
+
+def test_missing_catalog_version_is_logged_once_and_backs_off(cache, mocker):
+    mocker.patch('ml.services.metadata_cache.Enumerations.metadata_cache_version_check', 5)
+    mocker.patch('ml.services.metadata_cache.Enumerations.metadata_cache_version_backoff', 60)
+    warning = mocker.patch('ml.services.metadata_cache.logger.warning')
+    clock = mocker.patch('ml.services.metadata_cache.time.monotonic', return_value=1000.0)
+
+    for _ in range(5):
+        cache.version_unavailable(Exception('relation "catalog_version" does not exist'))
+        cache.set_version(None)
+
+    warning.assert_called_once()
+    clock.return_value = 1059.0
+    assert not cache.version_due()
+    clock.return_value = 1060.0
+    assert cache.version_due()
+
+    cache.set_version(3)
+    clock.return_value = 1065.0
+    assert cache.version_due()
+    assert cache.version() == 3
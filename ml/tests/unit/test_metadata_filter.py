@@ -0,0 +1,39 @@
+from ml.services.metadata_filter import MetadataFilter
+
+
+def test_normalize_drops_empty_values():
+    filters = MetadataFilter.normalize({
+        'author': '  Knuth ',
+        'publisher': '',
+        'min_year': None,
+        'min_rating': 4,
+        'unknown': 1,
+    })
+
+    assert filters == {'min_rating': 4, 'author': 'Knuth'}
+    assert MetadataFilter.normalize(None) == {}
+
+
+def test_where_named_parameters():
+    where, params = MetadataFilter.where({'min_year': '2020', 'max_year': 2024, 'min_rating': 4})
+
+    assert where == 'publishyear >= %(min_year)s AND publishyear <= %(max_year)s AND rating >= %(min_rating)s'
+    assert params == {'min_year': 2020, 'max_year': 2024, 'min_rating': 4.0}
+
+
+def test_where_async_positional_parameters():
+    where, params = MetadataFilter.where_async({'publisher': 'Manning', 'author': 'a_b'}, first_index=3)
+
+    assert where == "lower(publisher) = lower($3) AND authors ILIKE $4 ESCAPE '\\'"
+    assert params == ['Manning', '%a\\_b%']
+
+
+def test_where_without_filters():
+    assert MetadataFilter.where({}) == ('TRUE', {})
+
+
+def test_where_category_on_partition_key():
+    where, params = MetadataFilter.where(MetadataFilter.normalize({'category': 'databases'}))
+
+    assert where == 'category = %(category)s'
+    assert params == {'category': 'databases'}
@@ -1,6 +1,20 @@
+import pytest
+from contextlib import asynccontextmanager
+from ml.Enum.Enumerations import Enumerations
+from ml.services.metadata_cache import MetadataCache
 from ml.services.metadata_service import MetadataService
 
 
+@pytest.fixture(autouse=True)
+def metadata_cache(mocker):
+    mocker.patch.object(Enumerations, 'metadata_cache', True)
+    mocker.patch.object(MetadataService, '_catalog_version', return_value=1)
+    mocker.patch.object(MetadataService, '_catalog_version_async', mocker.AsyncMock(return_value=1))
+    MetadataCache.clear()
+    yield MetadataCache
+    MetadataCache.clear()
+
+
 def test_get_books_metadata_empty_input():
     assert MetadataService.get_books_metadata([]) == []
     assert MetadataService.get_books_metadata(None) == []
@@ -32,3 +46,63 @@ def test_get_books_metadata_db_error(mocker):
 
     result = MetadataService.get_books_metadata([101])
     assert result == []
+
+
+async def test_get_books_metadata_async(mocker):
+    conn = mocker.MagicMock()
+    conn.fetch = mocker.AsyncMock(return_value=[{'book_id': 101, 'name': 'Book A'}])
+
+    @asynccontextmanager
+    async def get_connection(read_only=False):
+        yield conn
+
+    mocker.patch('ml.services.metadata_service.MLAsyncPostgresConnectionPool.get_connection', get_connection)
+
+    result = await MetadataService.get_books_metadata_async((101,))
+
+    assert result == [{'book_id': 101, 'name': 'Book A'}]
+    assert conn.fetch.call_args.args[1] == [101]
+    assert await MetadataService.get_books_metadata_async([]) == []
+
+
+def test_get_books_metadata_fetches_only_uncached_ids(mocker, metadata_cache):
+    metadata_cache.set_version(1)
+    metadata_cache.set_many([{'book_id': 101, 'name': 'Book A'}], 1)
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+    mock_cursor.fetchall.return_value = [{'book_id': 202, 'name': 'Book B'}]
+    mocker.patch('ml.services.metadata_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = MetadataService.get_books_metadata([202, 101])
+
+    assert [book['name'] for book in result] == ['Book B', 'Book A']
+    assert mock_cursor.execute.call_args.args[1] == ([202],)
+
+    mock_cursor.execute.reset_mock()
+    assert len(MetadataService.get_books_metadata([101, 202])) == 2
+    mock_cursor.execute.assert_not_called()
+
+
+def test_get_books_metadata_checks_catalog_version(mocker, metadata_cache):
+    metadata_cache.set_version(1)
+    metadata_cache.set_many([{'book_id': 101, 'name': 'Book A'}], 1)
+    mocker.patch.object(MetadataCache, 'version_due', return_value=True)
+    mocker.patch.object(MetadataService, '_catalog_version', return_value=2)
+    get_connection = mocker.patch('ml.services.metadata_service.MLPostgresConnectionPool.get_connection')
+
+    MetadataService.get_books_metadata([101])
+
+    get_connection.assert_called_once_with(read_only=True)
+    assert metadata_cache.stats()['catalog_version'] == 2
+
+
+async def test_get_books_metadata_async_served_from_cache(mocker, metadata_cache):
+    metadata_cache.set_version(1)
+    metadata_cache.set_many([{'book_id': 101, 'name': 'Book A'}], 1)
+    get_connection = mocker.patch('ml.services.metadata_service.MLAsyncPostgresConnectionPool.get_connection')
+
+    result = await MetadataService.get_books_metadata_async([101])
+
+    assert result == [{'book_id': 101, 'name': 'Book A'}]
+    get_connection.assert_not_called()
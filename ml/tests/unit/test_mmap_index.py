@@ -0,0 +1,69 @@
+import os
+import numpy as np
+import pytest
+from ml.services.mmap_index import MmapVectorIndex
+
+
+@pytest.fixture
+def snapshot(tmp_path, mocker):
+    version = '20260101T000000'
+    path = tmp_path / version
+    path.mkdir()
+
+    embeddings = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0], [-1.0, 0.0]], dtype=np.float32)
+    np.save(path / MmapVectorIndex.EMBEDDINGS_FILE, embeddings)
+    np.save(path / MmapVectorIndex.BOOK_IDS_FILE, np.array([10, 20, 30, 40], dtype=np.int64))
+    (path / MmapVectorIndex.MANIFEST_FILE).write_text('{}')
+    (tmp_path / MmapVectorIndex.CURRENT_FILE).write_text(version)
+
+    mocker.patch.object(MmapVectorIndex, '_embeddings', None)
+    mocker.patch.object(MmapVectorIndex, '_book_ids', None)
+    mocker.patch.object(MmapVectorIndex, '_version', None)
+    mocker.patch.object(MmapVectorIndex, '_checked_at', 0.0)
+    return tmp_path
+
+
+def test_load_memory_maps_current_snapshot(snapshot):
+    assert MmapVectorIndex.load(str(snapshot)) is True
+    assert isinstance(MmapVectorIndex._embeddings, np.memmap)
+    assert MmapVectorIndex._version == '20260101T000000'
+
+
+def test_load_without_snapshot(tmp_path):
+    assert MmapVectorIndex.load(str(tmp_path)) is False
+
+
+def test_search_returns_exact_top_k_in_order(snapshot):
+    MmapVectorIndex.load(str(snapshot))
+
+    results = MmapVectorIndex.search([3.0, 4.0], top_k=3)
+
+    assert [r['book_id'] for r in results] == [20, 30, 10]
+    assert results[0]['similarity'] == pytest.approx(1.0)
+    assert results[2]['similarity'] == pytest.approx(0.6)
+
+
+def test_search_caps_top_k_at_corpus_size(snapshot):
+    MmapVectorIndex.load(str(snapshot))
+    assert len(MmapVectorIndex.search([1.0, 0.0], top_k=100)) == 4
+
+
+def test_prune_keeps_current_and_newest(tmp_path):
+    for version in ('a', 'b', 'c'):
+        (tmp_path / version).mkdir()
+        (tmp_path / version / MmapVectorIndex.MANIFEST_FILE).write_text('{}')
+    (tmp_path / MmapVectorIndex.CURRENT_FILE).write_text('a')
+
+    MmapVectorIndex.prune(str(tmp_path), keep=1)
+
+    assert sorted(os.listdir(tmp_path)) == [MmapVectorIndex.CURRENT_FILE, 'a', 'c']
+
+
+def test_current_version_reads_the_pointer(tmp_path):
+    assert MmapVectorIndex.current_version(str(tmp_path)) is None
+
+    (tmp_path / MmapVectorIndex.CURRENT_FILE).write_text('')
+    assert MmapVectorIndex.current_version(str(tmp_path)) is None
+
+    (tmp_path / MmapVectorIndex.CURRENT_FILE).write_text('v2\n')
+    assert MmapVectorIndex.current_version(str(tmp_path)) == 'v2'
@@ -0,0 +1,70 @@
+import numpy as np
+from ml.Enum.Enumerations import Enumerations
+from ml.models.v1.embedder import Model
+from ml.models.v1.onnx_embedder import OnnxEmbedder
+
+
+def _fake_embedder(mocker, token_embeddings):
+    embedder = OnnxEmbedder.__new__(OnnxEmbedder)
+
+    encodings = [
+        mocker.MagicMock(ids=[101, 7, 102], attention_mask=[1, 1, 1], type_ids=[0, 0, 0]),
+        mocker.MagicMock(ids=[101, 102, 0], attention_mask=[1, 1, 0], type_ids=[0, 0, 0]),
+    ]
+    embedder.tokenizer = mocker.MagicMock()
+    embedder.tokenizer.encode_batch.side_effect = lambda sentences: encodings[:len(sentences)]
+
+    embedder.session = mocker.MagicMock()
+    embedder.session.run.side_effect = lambda _, feeds: [token_embeddings[:len(feeds['input_ids'])]]
+    embedder.input_names = {'input_ids', 'attention_mask'}
+
+    return embedder
+
+
+def test_mean_pooling_ignores_padding():
+    tokens = np.array([[[1.0, 1.0], [3.0, 3.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+
+    pooled = OnnxEmbedder._mean_pooling(tokens, mask)
+
+    np.testing.assert_allclose(pooled, [[2.0, 2.0]])
+
+
+def test_encode_returns_normalized_float32(mocker):
+    tokens = np.array([
+        [[3.0, 0.0], [3.0, 0.0], [3.0, 0.0]],
+        [[0.0, 2.0], [0.0, 2.0], [9.0, 9.0]],
+    ], dtype=np.float32)
+    embedder = _fake_embedder(mocker, tokens)
+
+    result = embedder.encode(['python', 'rust'])
+
+    assert result.dtype == np.float32
+    assert result.shape == (2, 2)
+    np.testing.assert_allclose(result, [[1.0, 0.0], [0.0, 1.0]], atol=1e-6)
+
+    feeds = embedder.session.run.call_args.args[1]
+    assert set(feeds) == {'input_ids', 'attention_mask'}
+
+
+def test_encode_single_string(mocker):
+    tokens = np.array([[[0.0, 4.0], [0.0, 4.0], [0.0, 4.0]]], dtype=np.float32)
+    embedder = _fake_embedder(mocker, tokens)
+
+    result = embedder.encode('python')
+
+    assert result.shape == (2,)
+    np.testing.assert_allclose(result, [0.0, 1.0], atol=1e-6)
+
+
+def test_model_uses_onnx_backend(mocker):
+    mocker.patch.object(Enumerations, 'embedding_backend', 'onnx')
+    mock_onnx = mocker.patch('ml.models.v1.onnx_embedder.OnnxEmbedder')
+    mock_transformer = mocker.patch('ml.models.v1.embedder.SentenceTransformer')
+
+    Model._model = None
+    model = Model.model()
+
+    assert model is mock_onnx.return_value
+    mock_transformer.assert_not_called()
+    Model._model = None
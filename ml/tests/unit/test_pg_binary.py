@@ -0,0 +1,40 @@
+import struct
+import numpy as np
+from ml.services.pg_binary import PGBinary
+
+
+def test_vector_binary_format():
+    payload = PGBinary.vector([1.0, -2.5])
+
+    assert payload[:4] == struct.pack('>HH', 2, 0)
+    assert np.frombuffer(payload[4:], dtype='>f4').tolist() == [1.0, -2.5]
+
+
+def test_copy_rows_layout():
+    payload = PGBinary.copy_rows(
+        [(7, 'rust', None, [0.5])],
+        ['int4', 'text', 'float8', 'vector']
+    )
+
+    assert payload.startswith(PGBinary.COPY_SIGNATURE)
+    assert payload.endswith(PGBinary.COPY_TRAILER)
+
+    body = payload[len(PGBinary.copy_header()):-2]
+    assert body[:2] == struct.pack('>h', 4)
+    assert body[2:10] == struct.pack('>ii', 4, 7)
+    assert body[10:18] == struct.pack('>i', 4) + b'rust'
+    assert body[18:22] == PGBinary.NULL
+
+
+def test_copy_rows_nan_float_is_null():
+    payload = PGBinary.copy_rows([(float('nan'),)], ['float8'])
+    body = payload[len(PGBinary.copy_header()):-2]
+
+    assert body[2:] == PGBinary.NULL
+
+
+def test_halfvec_binary_format():
+    payload = PGBinary.halfvec([1.0, 0.5, -2.0])
+
+    assert payload[:4] == struct.pack('>HH', 3, 0)
+    assert np.frombuffer(payload[4:], dtype='>f2').tolist() == [1.0, 0.5, -2.0]
@@ -0,0 +1,46 @@
+import asyncio
+import struct
+import numpy as np
+from psycopg2.extensions import adapt
+from ml.services.pgvector_codec import PGVectorCodec, QueryVector
+
+
+def test_text_round_trips_float32():
+    values = np.random.default_rng(0).normal(size=384).astype(np.float32)
+    text = PGVectorCodec.text(values)
+
+    parsed = np.array(text[1:-1].split(','), dtype=np.float32)
+    np.testing.assert_array_equal(parsed, values)
+    assert len(text) < len('[' + ','.join(map(str, values.tolist())) + ']')
+
+
+def test_psycopg2_adapter_casts_to_storage_type(mocker):
+    mocker.patch('ml.services.pgvector_codec.Enumerations.embedding_storage', 'halfvec')
+    assert adapt(QueryVector([0.5, -1.0])).getquoted() == b"'[0.5,-1]'::halfvec"
+
+
+def test_binary_encode_decode_round_trip(mocker):
+    mocker.patch('ml.services.pgvector_codec.Enumerations.embedding_storage', 'vector')
+    data = PGVectorCodec.encode([1.5, -2.0, 0.25])
+
+    assert data[:4] == struct.pack('>HH', 3, 0)
+    assert len(data) == 4 + 3 * 4
+    np.testing.assert_array_equal(PGVectorCodec.decode(data), [1.5, -2.0, 0.25])
+
+
+def test_register_asyncpg_sets_binary_codec(mocker):
+    conn = mocker.MagicMock()
+    conn.set_type_codec = mocker.AsyncMock()
+
+    asyncio.run(PGVectorCodec.register_asyncpg(conn))
+
+    kwargs = conn.set_type_codec.call_args.kwargs
+    assert kwargs['format'] == 'binary'
+    assert kwargs['encoder'](QueryVector([1.0, 2.0])) == PGVectorCodec.encode([1.0, 2.0])
+
+
+def test_register_asyncpg_missing_extension(mocker):
+    conn = mocker.MagicMock()
+    conn.set_type_codec = mocker.AsyncMock(side_effect=ValueError('unknown type: public.vector'))
+
+    asyncio.run(PGVectorCodec.register_asyncpg(conn))
@@ -1,9 +1,12 @@
-from ml.services.postgres_pool import MLPostgresConnectionPool
+import pytest
+import psycopg2
+from ml.services.postgres_pool import MLPostgresConnectionPool, MLThreadedConnectionPool
+from ml.services.prepared_statements import PreparedConnection
 from unittest.mock import MagicMock
 
 
 def test_pool_initialization(mocker):
-    mock_pool_cls = mocker.patch('psycopg2.pool.ThreadedConnectionPool')
+    mock_pool_cls = mocker.patch('ml.services.postgres_pool.MLThreadedConnectionPool')
     mock_pool_instance = MagicMock()
     mock_pool_cls.return_value = mock_pool_instance
 
@@ -12,6 +15,9 @@ def test_pool_initialization(mocker):
     pool = MLPostgresConnectionPool.get_pool()
     assert pool is mock_pool_instance
     mock_pool_cls.assert_called_once()
+    kwargs = mock_pool_cls.call_args.kwargs
+    assert kwargs['connection_factory'] is PreparedConnection
+    assert '-c jit=off' in kwargs['options']
 
 
 def test_pool_context_manager(mocker):
@@ -26,3 +32,153 @@ def test_pool_context_manager(mocker):
 
     mock_pool.getconn.assert_called_once()
     mock_pool.putconn.assert_called_once_with(mock_conn)
+
+
+def test_pool_warm_up_opens_connections(mocker):
+    mock_pool = MagicMock()
+    mock_pool.getconn.side_effect = lambda: MagicMock()
+
+    mocker.patch.object(MLPostgresConnectionPool, 'get_pool', return_value=mock_pool)
+
+    assert MLPostgresConnectionPool.warm_up(connections=3) == 3
+    assert mock_pool.getconn.call_count == 3
+    assert mock_pool.putconn.call_count == 3
+
+
+def test_read_only_connection_uses_replica(mocker):
+    replica_pool = MagicMock()
+    replica_conn = MagicMock(closed=0)
+    replica_pool.getconn.return_value = replica_conn
+    primary = mocker.patch.object(MLPostgresConnectionPool, 'get_pool')
+    mocker.patch('ml.services.postgres_pool.ReplicaRouter.candidates', return_value=[('replica', '5432')])
+    mocker.patch.object(MLPostgresConnectionPool, '_replica_pools', {('replica', '5432'): replica_pool})
+
+    with MLPostgresConnectionPool.get_connection(read_only=True) as conn:
+        assert conn is replica_conn
+
+    replica_pool.putconn.assert_called_once_with(replica_conn)
+    primary.assert_not_called()
+
+
+def test_read_only_connection_falls_back_to_primary(mocker):
+    replica_pool = MagicMock()
+    replica_pool.getconn.side_effect = psycopg2.OperationalError('replica down')
+    primary_pool = MagicMock()
+    mocker.patch.object(MLPostgresConnectionPool, 'get_pool', return_value=primary_pool)
+    mocker.patch('ml.services.postgres_pool.ReplicaRouter.candidates', return_value=[('replica', '5432')])
+    eject = mocker.patch('ml.services.postgres_pool.ReplicaRouter.eject')
+    pools = {('replica', '5432'): replica_pool}
+    mocker.patch.object(MLPostgresConnectionPool, '_replica_pools', pools)
+
+    with MLPostgresConnectionPool.get_connection(read_only=True) as conn:
+        assert conn is primary_pool.getconn.return_value
+
+    assert eject.call_args.args[0] == ('replica', '5432')
+    assert pools == {}
+
+
+def test_broken_replica_connection_ejects_replica(mocker):
+    replica_pool = MagicMock()
+    replica_conn = MagicMock(closed=0)
+    replica_pool.getconn.return_value = replica_conn
+    mocker.patch('ml.services.postgres_pool.ReplicaRouter.candidates', return_value=[('replica', '5432')])
+    eject = mocker.patch('ml.services.postgres_pool.ReplicaRouter.eject')
+    mocker.patch.object(MLPostgresConnectionPool, '_replica_pools', {('replica', '5432'): replica_pool})
+
+    try:
+        with MLPostgresConnectionPool.get_connection(read_only=True):
+            replica_conn.closed = 2
+            raise psycopg2.OperationalError('server closed the connection unexpectedly')
+    except psycopg2.OperationalError:
+        pass
+
+    eject.assert_called_once()
+    replica_pool.putconn.assert_called_once_with(replica_conn)
+
+
+def test_read_retries_on_primary_when_replica_fails_mid_query(mocker):
+    replica_pool = MagicMock(closed=False, in_use=1)
+    replica_conn = MagicMock(closed=0)
+    replica_pool.getconn.return_value = replica_conn
+    replica_pool.putconn.side_effect = lambda conn: setattr(replica_pool, 'in_use', 0)
+    primary_pool = MagicMock()
+    mocker.patch.object(MLPostgresConnectionPool, 'get_pool', return_value=primary_pool)
+    mocker.patch('ml.services.postgres_pool.ReplicaRouter.candidates', side_effect=[[('replica', '5432')], []])
+    mocker.patch('ml.services.postgres_pool.ReplicaRouter.eject')
+    mocker.patch.object(MLPostgresConnectionPool, '_replica_pools', {('replica', '5432'): replica_pool})
+
+    def work(conn):
+        if conn is replica_conn:
+            replica_conn.closed = 2
+            raise psycopg2.OperationalError('server closed the connection unexpectedly')
+        return 'rows'
+
+    assert MLPostgresConnectionPool.read(work) == 'rows'
+    replica_pool.putconn.assert_called_once_with(replica_conn)
+    primary_pool.putconn.assert_called_once_with(primary_pool.getconn.return_value)
+    replica_pool.closeall.assert_called_once()
+
+
+def test_read_does_not_retry_query_errors(mocker):
+    replica_pool = MagicMock()
+    replica_pool.getconn.return_value = MagicMock(closed=0)
+    primary = mocker.patch.object(MLPostgresConnectionPool, 'get_pool')
+    mocker.patch('ml.services.postgres_pool.ReplicaRouter.candidates', return_value=[('replica', '5432')])
+    mocker.patch.object(MLPostgresConnectionPool, '_replica_pools', {('replica', '5432'): replica_pool})
+
+    def work(conn):
+        raise psycopg2.errors.QueryCanceled('canceling statement due to statement timeout')
+
+    with pytest.raises(psycopg2.errors.QueryCanceled):
+        MLPostgresConnectionPool.read(work)
+    primary.assert_not_called()
+
+
+def test_dropped_replica_pool_closes_when_last_connection_returns(mocker):
+    replica_pool = MagicMock(closed=False, in_use=1)
+    mocker.patch('ml.services.postgres_pool.ReplicaRouter.eject')
+    mocker.patch.object(MLPostgresConnectionPool, '_replica_pools', {('replica', '5432'): replica_pool})
+
+    MLPostgresConnectionPool._eject(('replica', '5432'), replica_pool)
+    replica_pool.closeall.assert_not_called()
+
+    replica_pool.in_use = 0
+    MLPostgresConnectionPool._release(replica_pool, MagicMock(closed=0), ('replica', '5432'))
+    replica_pool.closeall.assert_called_once()
+
+
+def test_pool_counts_checked_out_connections(mocker):
+    mocker.patch('psycopg2.connect', side_effect=lambda *args, **kwargs: MagicMock(closed=0))
+    pool = MLThreadedConnectionPool(1, 3)
+
+    first, second = pool.getconn(), pool.getconn()
+    assert pool.in_use == 2
+
+    pool.putconn(first)
+    pool.putconn(second)
+    assert pool.in_use == 0
+
+
+def test_pool_keeps_idle_connections_up_to_maxconn(mocker):
+    connect = mocker.patch('psycopg2.connect', side_effect=lambda *args, **kwargs: MagicMock(
+        closed=0, info=MagicMock(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+    ))
+    pool = MLThreadedConnectionPool(1, 3)
+
+    borrowed = [pool.getconn() for _ in range(3)]
+    for conn in borrowed:
+        pool.putconn(conn)
+    assert not any(conn.close.called for conn in borrowed)
+
+    assert {id(pool.getconn()) for _ in range(3)} == {id(conn) for conn in borrowed}
+    assert connect.call_count == 3
+
+
+def test_write_connection_ignores_replicas(mocker):
+    candidates = mocker.patch('ml.services.postgres_pool.ReplicaRouter.candidates')
+    mocker.patch.object(MLPostgresConnectionPool, 'get_pool', return_value=MagicMock())
+
+    with MLPostgresConnectionPool.get_connection():
+        pass
+
+    candidates.assert_not_called()
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+import pytest
+import psycopg2
+from ml.Enum.Enumerations import Enumerations
+from ml.services.prepared_statements import PreparedConnection, PreparedStatements
+
+
+@pytest.fixture
+def cursor(mocker):
+    mocker.patch('ml.services.prepared_statements.Enumerations.prepared_statements', True)
+    cursor = mocker.MagicMock()
+    cursor.connection = mocker.MagicMock(spec=PreparedConnection)
+    cursor.connection.prepared = OrderedDict()
+    cursor.connection.closed = 0
+    return cursor
+
+
+def test_convert_positional_parameters():
+    name, body, names = PreparedStatements._convert("SELECT %s, '100%%' LIMIT %s;")
+
+    assert name.startswith('ml_')
+    assert body == "SELECT $1, '100%' LIMIT $2"
+    assert names is None
+
+
+def test_convert_named_parameters_reuses_positions():
+    _, body, names = PreparedStatements._convert('SELECT %(query)s WHERE a = %(year)s AND b <=> %(query)s')
+
+    assert body == 'SELECT $1 WHERE a = $2 AND b <=> $1'
+    assert names == ['query', 'year']
+
+
+def test_connection_options_apply_session_settings():
+    options = PreparedStatements.connection_options()
+
+    assert f'-c hnsw.ef_search={Enumerations.hnsw_session_ef_search}' in options
+    assert '-c jit=off' in options
+
+
+def test_execute_prepares_once_per_connection(cursor):
+    sql = 'SELECT book_id FROM books WHERE book_id = ANY(%s::int[]);'
+    name, body, _ = PreparedStatements._convert(sql)
+
+    PreparedStatements.execute(cursor, sql, ([1, 2],))
+    PreparedStatements.execute(cursor, sql, ([3],))
+
+    assert [call.args for call in cursor.execute.call_args_list] == [
+        (f'PREPARE {name} AS {body}; EXECUTE {name} (%s);', [[1, 2]]),
+        (f'EXECUTE {name} (%s);', [[3]]),
+    ]
+    assert list(cursor.connection.prepared) == [name]
+
+
+def test_first_execute_escapes_literal_percent_signs(cursor):
+    name, _, _ = PreparedStatements._convert("SELECT %s WHERE name LIKE '100%%'")
+
+    PreparedStatements.execute(cursor, "SELECT %s WHERE name LIKE '100%%'", (1,), ef_search=400)
+
+    assert cursor.execute.call_args.args[0] == (
+        f"PREPARE {name} AS SELECT $1 WHERE name LIKE '100%%'; "
+        f"SET LOCAL hnsw.ef_search = 400; EXECUTE {name} (%s);"
+    )
+
+
+def test_execute_orders_named_parameters(cursor):
+    PreparedStatements.execute(cursor, 'SELECT %(query)s LIMIT %(top_k)s', {'top_k': 5, 'query': 'q', 'unused': 1})
+
+    assert cursor.execute.call_args.args[1] == ['q', 5]
+
+
+def test_execute_sets_only_non_default_settings(cursor):
+    cursor.connection.prepared[PreparedStatements._convert('SELECT %s')[0]] = True
+    PreparedStatements.execute(cursor, 'SELECT %s', (1,), ef_search=Enumerations.hnsw_session_ef_search)
+    default = cursor.execute.call_args.args[0]
+
+    PreparedStatements.execute(cursor, 'SELECT %s', (1,), ef_search=400, iterative_scan='relaxed_order')
+    custom = cursor.execute.call_args.args[0]
+
+    assert default.startswith('EXECUTE ')
+    assert custom.startswith('SET LOCAL hnsw.ef_search = 400; SET LOCAL hnsw.iterative_scan = relaxed_order; EXECUTE ')
+
+
+@pytest.mark.parametrize('top_k, limit', [(1, 10), (10, 10), (11, 20), (100, 100), (101, 200), (1000, 1000), (1001, 2000)])
+def test_limit_rounds_up_to_a_fixed_step(top_k, limit):
+    assert PreparedStatements.limit(top_k) == limit
+
+
+def test_least_recently_used_statement_is_deallocated(mocker, cursor):
+    mocker.patch('ml.services.prepared_statements.Enumerations.prepared_statements_per_connection', 2)
+    first, second, third = (PreparedStatements._convert(f'SELECT {value}')[0] for value in (1, 2, 3))
+
+    PreparedStatements.execute(cursor, 'SELECT 1')
+    PreparedStatements.execute(cursor, 'SELECT 2')
+    PreparedStatements.execute(cursor, 'SELECT 1')
+    PreparedStatements.execute(cursor, 'SELECT 3')
+
+    assert list(cursor.connection.prepared) == [first, third]
+    assert cursor.execute.call_args_list[-2].args == (f'DEALLOCATE {second}',)
+
+
+def test_failed_prepare_is_not_recorded(cursor):
+    cursor.execute.side_effect = psycopg2.errors.SyntaxError('syntax error')
+
+    with pytest.raises(psycopg2.ProgrammingError):
+        PreparedStatements.execute(cursor, 'SELEC %s', (1,))
+
+    assert not cursor.connection.prepared
+
+
+@pytest.mark.parametrize('error', [
+    psycopg2.errors.QueryCanceled('canceling statement due to statement timeout'),
+    psycopg2.errors.DuplicatePreparedStatement('prepared statement already exists'),
+])
+def test_statement_left_on_the_server_by_a_failed_execute_is_recorded(cursor, error):
+    cursor.execute.side_effect = error
+    name, _, _ = PreparedStatements._convert('SELECT %s')
+
+    with pytest.raises(psycopg2.Error):
+        PreparedStatements.execute(cursor, 'SELECT %s', (1,))
+
+    assert list(cursor.connection.prepared) == [name]
+
+
+def test_execute_falls_back_to_text_queries(mocker, cursor):
+    mocker.patch('ml.services.prepared_statements.Enumerations.prepared_statements', False)
+
+    PreparedStatements.execute(cursor, 'SELECT %s', (1,), ef_search=400)
+
+    cursor.execute.assert_called_once_with('SET LOCAL hnsw.ef_search = 400; SELECT %s', (1,))
+    assert not cursor.connection.prepared
@@ -0,0 +1,59 @@
+import numpy as np
+from ml.Enum.Enumerations import Enumerations
+from ml.models.v1.projection import EmbeddingProjection, recall_report
+
+
+def _corpus(n=300, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(8, dim))
+    vectors = rng.normal(size=(n, 8)) @ basis + 0.01 * rng.normal(size=(n, dim))
+    return vectors.astype(np.float32)
+
+
+def test_truncate_projection_is_normalized():
+    projected = EmbeddingProjection.apply([[3.0, 4.0, 12.0]], 'truncate', 2)
+
+    np.testing.assert_allclose(projected, [[0.6, 0.8]], rtol=1e-6)
+    assert projected.dtype == np.float32
+
+
+def test_pca_projection_keeps_neighbours():
+    vectors = _corpus()
+    pca = EmbeddingProjection.fit_pca(vectors, 8)
+
+    projected = EmbeddingProjection.apply(vectors, 'pca', 8, pca)
+
+    assert projected.shape == (300, 8)
+    full = EmbeddingProjection._normalize(vectors)
+    assert np.argmax(full[1:] @ full[0]) == np.argmax(projected[1:] @ projected[0])
+
+
+def test_project_disabled_is_identity(mocker):
+    mocker.patch.object(Enumerations, 'embedding_projection', 'none')
+
+    result = EmbeddingProjection.project([0.1, 0.2])
+
+    np.testing.assert_allclose(result, [0.1, 0.2], rtol=1e-6)
+
+
+def test_pca_save_and_load(tmp_path, mocker):
+    path = str(tmp_path / 'pca.npz')
+    pca = EmbeddingProjection.fit_pca(_corpus(), 4)
+    EmbeddingProjection.save_pca(pca, path)
+
+    mocker.patch.object(EmbeddingProjection, '_pca', None)
+    loaded = EmbeddingProjection.load_pca(path)
+
+    np.testing.assert_allclose(loaded['components'], pca['components'])
+
+
+def test_recall_report_full_dimension_is_exact():
+    report = recall_report(_corpus(), dimensions=[32, 8], queries=20, k=5)
+
+    full = next(r for r in report if r['projection'] == 'none' and r['storage'] == 'vector')
+    assert full['recall@5'] == 1.0
+    assert full['bytes_per_vector'] == 32 * 4 + 8
+
+    half = next(r for r in report if r['dimension'] == 8 and r['storage'] == 'halfvec' and r['projection'] == 'pca')
+    assert half['bytes_per_vector'] == 8 * 2 + 8
+    assert 0.0 <= half['recall@5'] <= 1.0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from ml.services.quantized_index import QuantizedVectorIndex
+from ml.services.mmap_index import MmapVectorIndex
+
+
+@pytest.fixture
+def snapshot(tmp_path, mocker):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(300, 96)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    path = tmp_path / 'v1'
+    path.mkdir()
+    np.save(path / MmapVectorIndex.EMBEDDINGS_FILE, embeddings)
+    np.save(path / MmapVectorIndex.BOOK_IDS_FILE, np.arange(1, 301, dtype=np.int64))
+    (tmp_path / MmapVectorIndex.CURRENT_FILE).write_text('v1')
+
+    mocker.patch.object(QuantizedVectorIndex, '_codes', None)
+    mocker.patch.object(QuantizedVectorIndex, '_version', None)
+    return tmp_path, embeddings
+
+
+def test_quantize_matches_sign_bits():
+    vector = np.array([0.5, -1.0, 0.0, 2.0] + [-1.0] * 60 + [1.0], dtype=np.float32)
+    codes = QuantizedVectorIndex.quantize(vector)
+
+    assert codes.dtype == np.uint64
+    assert codes.shape == (2,)
+    bits = np.unpackbits(codes.view(np.uint8))
+    assert bits[:4].tolist() == [1, 0, 0, 1]
+    assert bits[64] == 1
+    assert bits[65:].sum() == 0
+
+
+def test_candidates_are_nearest_by_hamming():
+    codes = QuantizedVectorIndex.quantize(np.array([
+        [1, 1, 1, 1],
+        [-1, -1, -1, -1],
+        [1, 1, 1, -1],
+    ], dtype=np.float32))
+
+    candidates = QuantizedVectorIndex.candidates(codes, np.ones(4, dtype=np.float32), 2)
+
+    assert candidates.tolist() == [0, 2]
+
+
+def test_search_rescores_with_full_vectors(snapshot):
+    snapshot_dir, embeddings = snapshot
+    QuantizedVectorIndex.build(str(snapshot_dir))
+    assert QuantizedVectorIndex.load(str(snapshot_dir)) is True
+
+    query = embeddings[41]
+    results = QuantizedVectorIndex.search(query, top_k=5, ef=300)
+    exact = np.argsort(-(embeddings @ query))[:5] + 1
+
+    assert [r['book_id'] for r in results] == exact.tolist()
+    assert results[0]['similarity'] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_recall_improves_with_candidates(snapshot):
+    snapshot_dir, _ = snapshot
+    QuantizedVectorIndex.build(str(snapshot_dir))
+    QuantizedVectorIndex.load(str(snapshot_dir))
+
+    coarse = QuantizedVectorIndex.recall(top_k=10, queries=20, candidates=20)
+    full = QuantizedVectorIndex.recall(top_k=10, queries=20, candidates=300)
+
+    assert coarse <= full
+    assert full == 1.0
+
+
+def test_load_without_codes(snapshot):
+    snapshot_dir, _ = snapshot
+    assert QuantizedVectorIndex.load(str(snapshot_dir)) is False
@@ -0,0 +1,40 @@
+from ml.services.replica_router import ReplicaRouter
+
+
+def test_parse_replicas_defaults_port(mocker):
+    mocker.patch('ml.services.replica_router.DB_PORT', '5432')
+
+    assert ReplicaRouter.parse(' replica-a:6432, replica-b ,,') == [('replica-a', '6432'), ('replica-b', '5432')]
+    assert ReplicaRouter.parse('') == []
+
+
+def test_candidates_round_robin(mocker):
+    replicas = [('a', '5432'), ('b', '5432'), ('c', '5432')]
+    mocker.patch.object(ReplicaRouter, '_replicas', replicas)
+    mocker.patch.object(ReplicaRouter, '_ejected_until', {})
+
+    first = ReplicaRouter.candidates()
+    second = ReplicaRouter.candidates()
+
+    assert sorted(first) == sorted(replicas)
+    assert second[0] == first[1]
+
+
+def test_ejected_replica_is_skipped_until_timeout(mocker):
+    replicas = [('a', '5432'), ('b', '5432')]
+    mocker.patch.object(ReplicaRouter, '_replicas', replicas)
+    mocker.patch.object(ReplicaRouter, '_ejected_until', {})
+    clock = mocker.patch('ml.services.replica_router.time.monotonic', return_value=100.0)
+    mocker.patch('ml.services.replica_router.Enumerations.replica_eject_seconds', 30)
+
+    ReplicaRouter.eject(('a', '5432'))
+
+    assert ReplicaRouter.candidates() == [('b', '5432')]
+    clock.return_value = 131.0
+    assert sorted(ReplicaRouter.candidates()) == replicas
+
+
+def test_no_replicas_configured(mocker):
+    mocker.patch.object(ReplicaRouter, '_replicas', [])
+
+    assert ReplicaRouter.candidates() == []
@@ -1,3 +1,5 @@
+import numpy as np
+import pytest
 from ml.reranking.reranking import Reranker
 from ml.Enum.Enumerations import Enumerations
 
@@ -38,3 +40,22 @@ def test_reranker_missing_columns():
     assert len(result) == 1
     assert result[0]["weighted_rating"] == 0.0
     assert "rerank_score" in result[0]
+
+
+def test_reranker_gathers_features_from_catalog_snapshot(mocker):
+    features = np.array([[0.0, 0.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+    mocker.patch('ml.reranking.reranking.CatalogSnapshot.features',
+                 return_value=(features, np.array([True, False])))
+    mocker.patch.object(Enumerations, 'weight_similarity', 0.5)
+    mocker.patch.object(Enumerations, 'weight_weighted_rating', 1.0)
+
+    books = [
+        {"book_id": 1, "similarity": 0.9, "weighted_rating": 1.0},
+        {"book_id": 2, "similarity": 0.1, "weighted_rating": 0.9},
+    ]
+    result = Reranker.reranker(books, top_k=2)
+
+    # book 1 scores from the snapshot row, book 2 from its own fields
+    assert [book["book_id"] for book in result] == [2, 1]
+    assert result[1]["rerank_score"] == pytest.approx(0.45)
+    assert books[0] == {"book_id": 1, "similarity": 0.9, "weighted_rating": 1.0}
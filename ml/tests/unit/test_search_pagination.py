@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+from fastapi import HTTPException
+from backend.app.search.routes import search
+from backend.app.search.schemas import SearchRequest
+from backend.app.search.service import SearchService
+
+
+@pytest.fixture
+def ranked_cache(mocker):
+    cache = {}
+
+    async def get_ranked(token):
+        return cache.get(token, (None, 0))
+
+    async def set_ranked(token, ranked, total_results):
+        cache[token] = (ranked, total_results)
+        return True
+
+    mocker.patch('backend.app.search.service.CacheManager.get_ranked', side_effect=get_ranked)
+    mocker.patch('backend.app.search.service.CacheManager.set_ranked', side_effect=set_ranked)
+    return cache
+
+
+@pytest.fixture
+def metadata(mocker):
+    async def books(book_ids):
+        return {book_id: {'book_id': book_id, 'name': f'Book {book_id}'} for book_id in book_ids}
+
+    return mocker.patch('backend.app.search.service.SearchService._metadata', side_effect=books)
+
+
+def test_cursor_round_trip():
+    cursor = SearchService.encode_cursor('abc123', 40)
+
+    assert '=' not in cursor
+    assert SearchService.decode_cursor(cursor) == ('abc123', 40)
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', SearchService.encode_cursor('abc123', -1)])
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(ValueError):
+        SearchService.decode_cursor(cursor)
+
+
+async def test_unknown_cursor_returns_400(ranked_cache):
+    request = SearchRequest(query='python', cursor=SearchService.encode_cursor('expired', 20))
+
+    with pytest.raises(HTTPException) as error:
+        await search(request)
+
+    assert error.value.status_code == 400
+
+
+async def test_cached_page_hydrates_only_its_slice(ranked_cache, metadata):
+    ranked_cache['token'] = ([[book_id, 1.0 - book_id / 1000] for book_id in range(1000)], 1000)
+
+    page, total, next_cursor = await SearchService.search_page(
+        'python', top_k=1000, page_size=20, cursor=SearchService.encode_cursor('token', 40)
+    )
+
+    metadata.assert_called_once_with(list(range(40, 60)))
+    assert [book['book_id'] for book in page] == list(range(40, 60))
+    assert page[0]['similarity'] == pytest.approx(0.96)
+    assert total == 1000
+    assert SearchService.decode_cursor(next_cursor) == ('token', 60)
+
+
+async def test_pages_reach_the_end_of_a_ranking_above_the_display_limit(mocker, ranked_cache, metadata):
+    mocker.patch('backend.app.search.service.Enumerations.ml_async_db', True)
+    rank = mocker.patch('backend.app.search.service.Search.rank_async', return_value=[
+        {'book_id': book_id, 'similarity': 1.0 - book_id / 1000} for book_id in range(250)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        page, total, cursor = await SearchService.search_page(
+            'python', top_k=250, apply_rerank=False, page_size=20, cursor=cursor
+        )
+        seen += [book['book_id'] for book in page]
+        assert len(page) <= 20
+        if cursor is None:
+            break
+
+    rank.assert_called_once()
+    assert total == 250
+    assert seen == list(range(250))
+
+
+async def test_rerank_hydrates_only_books_missing_from_the_snapshot(mocker, metadata):
+    mocker.patch('backend.app.search.service.Enumerations.ml_async_db', True)
+    mocker.patch('backend.app.search.service.Search.rank_async', return_value=[
+        {'book_id': book_id, 'similarity': 1.0 - book_id / 1000} for book_id in range(150)
+    ])
+    found = np.ones(100, dtype=bool)
+    found[3] = False
+    mocker.patch('backend.app.search.service.CatalogSnapshot.features', return_value=(np.zeros((100, 5)), found))
+    mocker.patch('backend.app.search.service.Reranker.reranker', side_effect=lambda books, top_k: [
+        {**book, 'rerank_score': 2.0} for book in books[::-1][:top_k]
+    ])
+
+    ranked = await SearchService._rank_ids('python', 150, True, None)
+
+    metadata.assert_called_once_with([3])
+    assert len(ranked) == 150
+    assert ranked[0] == [99, pytest.approx(0.901), 2.0]
+    assert ranked[100:] == [[book_id, pytest.approx(1.0 - book_id / 1000)] for book_id in range(100, 150)]
@@ -1,4 +1,18 @@
+import time
+import pytest
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from ml.services.vector_service import VectorService
+from ml.services.pgvector_codec import QueryVector
+from ml.Enum.Enumerations import Enumerations
+
+
+@pytest.fixture(autouse=True)
+def clear_filter_matches():
+    VectorService._filter_matches.clear()
+    yield
+    VectorService._filter_matches.clear()
 
 
 def test_search_similar_books_empty_query():
@@ -29,7 +43,25 @@ def test_search_similar_books_success(mocker):
     assert len(result) == 2
     assert result[0] == {'book_id': 101, 'similarity': 0.95}
     assert result[1] == {'book_id': 202, 'similarity': 0.82}
-    assert mock_cursor.execute.call_count == 2
+    # the default ef_search is a session setting, so only the query is sent
+    mock_cursor.execute.assert_called_once_with(
+        Enumerations.vector_service_query.format(top_k=10),
+        (QueryVector([0.1, 0.2, 0.3]),)
+    )
+
+
+def test_search_similar_books_trims_the_rounded_limit(mocker):
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [(101, 0.95), (202, 0.82), (303, 0.7)]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = VectorService.search_similar_books([0.1, 0.2, 0.3], top_k=2)
+
+    assert [book['book_id'] for book in result] == [101, 202]
+    assert 'LIMIT 10' in mock_cursor.execute.call_args.args[0]
 
 
 def test_search_similar_books_db_error(mocker):
@@ -37,3 +69,493 @@ def test_search_similar_books_db_error(mocker):
 
     result = VectorService.search_similar_books([0.1, 0.2])
     assert result == []
+
+
+def test_search_similar_books_projects_query(mocker):
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = []
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+    mocker.patch('ml.services.vector_service.EmbeddingProjection.enabled', return_value=True)
+    mock_project = mocker.patch('ml.services.vector_service.EmbeddingProjection.project', return_value=[0.6, 0.8])
+
+    VectorService.search_similar_books([3.0, 4.0, 12.0], top_k=2)
+
+    mock_project.assert_called_once()
+    query_vector = mock_cursor.execute.call_args.args[1][0]
+    assert query_vector == QueryVector([0.6, 0.8])
+
+
+def test_search_similar_books_uses_mmap_backend(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'mmap')
+    mock_search = mocker.patch('ml.services.vector_service.MmapVectorIndex.search',
+                               return_value=[{'book_id': 7, 'similarity': 0.9}])
+    mock_get_connection = mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection')
+
+    result = VectorService.search_similar_books([0.6, 0.8], top_k=1)
+
+    assert result == [{'book_id': 7, 'similarity': 0.9}]
+    mock_search.assert_called_once_with([0.6, 0.8], 1, ef=None)
+    mock_get_connection.assert_not_called()
+
+
+def test_search_similar_books_mmap_falls_back_to_pgvector(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'mmap')
+    mocker.patch('ml.services.vector_service.MmapVectorIndex.search', side_effect=RuntimeError('no snapshot'))
+
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [(101, 0.95)]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    assert VectorService.search_similar_books([0.6, 0.8], top_k=1) == [{'book_id': 101, 'similarity': 0.95}]
+
+
+def test_search_similar_books_hnsw_backend_passes_ef(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'hnsw')
+    mock_search = mocker.patch('ml.services.vector_service.HnswVectorIndex.search', return_value=[])
+
+    VectorService.search_similar_books([0.6, 0.8], top_k=5, ef_search=400)
+
+    mock_search.assert_called_once_with([0.6, 0.8], 5, ef=400)
+
+
+def test_search_similar_books_custom_pgvector_ef(mocker):
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = []
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    VectorService.search_similar_books([0.6, 0.8], top_k=5, ef_search=400)
+
+    query, params = mock_cursor.execute.call_args.args
+    assert query.startswith('SET LOCAL hnsw.ef_search = 400; ')
+    assert query.endswith(Enumerations.vector_service_query.format(top_k=10))
+
+
+def test_search_books_with_metadata_single_statement(mocker):
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [
+        {'book_id': 5, 'name': 'rust', 'similarity': 0.91},
+        {'book_id': 2, 'name': 'go', 'similarity': 0.5},
+    ]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = VectorService.search_books_with_metadata([0.6, 0.8], top_k=2, ef_search=64)
+
+    assert [book['book_id'] for book in result] == [5, 2]
+    assert result[0]['similarity'] == 0.91
+    mock_cursor.execute.assert_called_once()
+    assert mock_cursor.execute.call_args.args == (
+        'SET LOCAL hnsw.ef_search = 64; ' + Enumerations.vector_metadata_query.format(top_k=10),
+        (QueryVector([0.6, 0.8]),)
+    )
+
+
+def test_search_similar_books_pgvector_binary(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_binary')
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [(4, 0.9)]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = VectorService.search_similar_books([0.6, 0.8], top_k=10)
+
+    assert result == [{'book_id': 4, 'similarity': 0.9}]
+    candidates = Enumerations.quantized_candidates
+    mock_cursor.execute.assert_called_once_with(
+        f'SET LOCAL hnsw.ef_search = {candidates}; ' + Enumerations.vector_service_binary_query,
+        (QueryVector([0.6, 0.8]), QueryVector([0.6, 0.8]), candidates, 10)
+    )
+
+
+def test_search_books_with_metadata_batch_groups_by_query(mocker):
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [
+        {'query_position': 1, 'book_id': 5, 'similarity': 0.9},
+        {'query_position': 1, 'book_id': 2, 'similarity': 0.4},
+        {'query_position': 3, 'book_id': 5, 'similarity': 0.7},
+    ]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = VectorService.search_books_with_metadata_batch([[0.6, 0.8], [1.0, 0.0], [0.0, 1.0]], top_k=2)
+
+    assert result == [
+        [{'book_id': 5, 'similarity': 0.9}, {'book_id': 2, 'similarity': 0.4}],
+        [],
+        [{'book_id': 5, 'similarity': 0.7}],
+    ]
+    mock_cursor.execute.assert_called_once()
+    assert mock_cursor.execute.call_args.args == (
+        Enumerations.vector_metadata_batch_query.format(top_k=10),
+        ([QueryVector([0.6, 0.8]), QueryVector([1.0, 0.0]), QueryVector([0.0, 1.0])],)
+    )
+
+
+def test_search_books_with_metadata_db_error(mocker):
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection', side_effect=Exception("DB Error"))
+    assert VectorService.search_books_with_metadata([0.1, 0.2]) == []
+    assert VectorService.search_books_with_metadata([]) == []
+
+
+def test_search_books_with_metadata_filtered(mocker):
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [
+        {'book_id': 5, 'name': 'rust', 'similarity': 0.91},
+        {'book_id': 2, 'name': 'go', 'similarity': 0.5},
+    ]
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = VectorService.search_books_with_metadata([0.6, 0.8], top_k=2, filters={'min_year': 2020, 'min_rating': 4})
+
+    assert [book['book_id'] for book in result] == [5, 2]
+    mock_cursor.execute.assert_called_once()
+    query, params = mock_cursor.execute.call_args.args
+    assert 'publishyear >= %(min_year)s AND rating >= %(min_rating)s' in query
+    assert 'SET LOCAL' not in query
+    assert 'LIMIT 10' in query
+    assert params == {
+        'min_year': 2020,
+        'min_rating': 4.0,
+        'query': QueryVector([0.6, 0.8]),
+    }
+
+
+def test_search_books_with_metadata_filtered_exact_fallback(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.filtered_search_iterative_scan', 'relaxed_order')
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.side_effect = [
+        [{'book_id': 5, 'similarity': 0.91}],
+        [{'book_id': 5, 'similarity': 0.91}, {'book_id': 8, 'similarity': 0.3}],
+    ]
+    mock_cursor.fetchone.return_value = {'matches': 2}
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    result = VectorService.search_books_with_metadata([0.6, 0.8], top_k=300, filters={'publisher': "O'Reilly"})
+
+    assert [book['book_id'] for book in result] == [5, 8]
+    approximate, count, exact = mock_cursor.execute.call_args_list
+    assert approximate.args[0].startswith(
+        f'SET LOCAL hnsw.ef_search = {Enumerations.hnsw_max_ef_search}; SET LOCAL hnsw.iterative_scan = relaxed_order; '
+    )
+    assert 'count(*)' in count.args[0] and 'LIMIT 500' in count.args[0]
+    assert 'AS MATERIALIZED' in exact.args[0]
+    assert 'SET LOCAL' not in exact.args[0]
+    assert 'lower(publisher) = lower(%(publisher)s)' in exact.args[0]
+
+
+def test_search_books_with_metadata_filtered_selective_filter_skips_exact_scan(mocker):
+    mock_conn = mocker.MagicMock()
+    mock_cursor = mocker.MagicMock()
+    mock_cursor.fetchall.return_value = [{'book_id': 5, 'similarity': 0.91}]
+    mock_cursor.fetchone.return_value = {'matches': 1}
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection',
+                 mocker.MagicMock(return_value=mocker.MagicMock(__enter__=mocker.MagicMock(return_value=mock_conn))))
+
+    for _ in range(2):
+        result = VectorService.search_books_with_metadata([0.6, 0.8], top_k=10, filters={'publisher': 'No Starch'})
+        assert [book['book_id'] for book in result] == [5]
+
+    queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    # the filter matches one book: one count for both requests, no exact scan
+    assert len(queries) == 3
+    assert sum('count(*)' in query for query in queries) == 1
+    assert not any('AS MATERIALIZED' in query for query in queries)
+
+
+def test_cached_filter_matches_respect_their_bound(mocker):
+    key = VectorService._filter_key({'min_year': 2020})
+    VectorService._store_matches(key, 10, 10)
+    VectorService._store_matches(VectorService._filter_key({'min_year': 2021}), 3, 10)
+
+    assert VectorService._cached_matches(key, 5) == 5
+    assert VectorService._cached_matches(key, 50) is None
+    assert VectorService._cached_matches(VectorService._filter_key({'min_year': 2021}), 50) == 3
+
+    mocker.patch('ml.services.vector_service.Enumerations.filtered_search_count_ttl', -1)
+    VectorService._store_matches(key, 10, 10)
+    assert VectorService._cached_matches(key, 5) is None
+
+
+async def test_search_books_with_metadata_async_filtered_skips_exact_scan_when_filter_is_selective(mocker):
+    conn = _async_connection(mocker, [{'book_id': 3, 'similarity': 0.75}])
+    conn.transaction = mocker.MagicMock(return_value=mocker.AsyncMock())
+    conn.fetchval = mocker.AsyncMock(return_value=1)
+
+    result = await VectorService.search_books_with_metadata_async([0.6, 0.8], top_k=5, filters={'min_year': 2020})
+
+    assert [book['book_id'] for book in result] == [3]
+    assert conn.fetch.await_count == 1
+    query, *params = conn.fetchval.call_args.args
+    assert 'publishyear >= $2' in query
+    assert params == [5, 2020]
+
+
+def _async_connection(mocker, rows):
+    conn = mocker.MagicMock()
+    conn.fetch = mocker.AsyncMock(return_value=rows)
+    conn.execute = mocker.AsyncMock()
+
+    @asynccontextmanager
+    async def get_connection(read_only=False):
+        yield conn
+
+    mocker.patch('ml.services.vector_service.MLAsyncPostgresConnectionPool.get_connection', get_connection)
+    return conn
+
+
+async def test_search_similar_books_async(mocker):
+    conn = _async_connection(mocker, [{'book_id': 3, 'similarity': 0.75}])
+
+    result = await VectorService.search_similar_books_async([0.6, 0.8], top_k=1)
+
+    assert result == [{'book_id': 3, 'similarity': 0.75}]
+    assert conn.fetch.call_args.args[1:] == (QueryVector([0.6, 0.8]), 1)
+    conn.execute.assert_not_called()
+
+
+async def test_search_books_with_metadata_async_custom_ef(mocker):
+    conn = _async_connection(mocker, [{'book_id': 3, 'name': 'rust', 'similarity': 0.75}])
+    conn.transaction = mocker.MagicMock(return_value=mocker.AsyncMock())
+
+    result = await VectorService.search_books_with_metadata_async([0.6, 0.8], top_k=1, ef_search=200)
+
+    assert result == [{'book_id': 3, 'name': 'rust', 'similarity': 0.75}]
+    conn.execute.assert_awaited_once_with(Enumerations.ef_search_local_async, '200')
+
+
+async def test_search_books_with_metadata_async_filtered(mocker):
+    conn = _async_connection(mocker, [{'book_id': 3, 'name': 'rust', 'similarity': 0.75}])
+    conn.transaction = mocker.MagicMock(return_value=mocker.AsyncMock())
+
+    result = await VectorService.search_books_with_metadata_async(
+        [0.6, 0.8], top_k=1, filters={'max_year': 2024, 'author': '50%_off'}
+    )
+
+    assert result == [{'book_id': 3, 'name': 'rust', 'similarity': 0.75}]
+    query, *params = conn.fetch.call_args.args
+    assert 'publishyear <= $3 AND authors ILIKE $4' in query
+    assert params == [QueryVector([0.6, 0.8]), 1, 2024, '%50\\%\\_off%']
+    conn.execute.assert_awaited_once_with(Enumerations.ef_search_local_async, str(Enumerations.hnsw_ef_search))
+
+
+async def test_search_books_with_metadata_async_pgvector_binary(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_binary')
+    mocker.patch('ml.services.vector_service.Enumerations.hnsw_session_ef_search', 400)
+    conn = _async_connection(mocker, [{'book_id': 3, 'similarity': 0.75}])
+
+    await VectorService.search_books_with_metadata_async([0.6, 0.8], top_k=5, ef_search=300)
+
+    assert conn.fetch.call_args.args == (
+        Enumerations.vector_metadata_binary_query_async, QueryVector([0.6, 0.8]), 5, 300
+    )
+    conn.execute.assert_not_called()
+
+
+async def test_search_books_with_metadata_batch_async(mocker):
+    conn = _async_connection(mocker, [{'query_position': 2, 'book_id': 3, 'similarity': 0.75}])
+
+    result = await VectorService.search_books_with_metadata_batch_async([[0.6, 0.8], [1.0, 0.0]], top_k=1)
+
+    assert result == [[], [{'book_id': 3, 'similarity': 0.75}]]
+    assert conn.fetch.call_args.args == (
+        Enumerations.vector_metadata_batch_query_async, [QueryVector([0.6, 0.8]), QueryVector([1.0, 0.0])], 1
+    )
+
+
+async def test_search_books_with_metadata_batch_async_db_error(mocker):
+    conn = _async_connection(mocker, [])
+    conn.fetch.side_effect = Exception("DB Error")
+
+    assert await VectorService.search_books_with_metadata_batch_async([[0.6, 0.8], [1.0, 0.0]]) == [[], []]
+    assert await VectorService.search_books_with_metadata_batch_async([]) == []
+
+
+async def test_search_similar_books_async_db_error(mocker):
+    conn = _async_connection(mocker, [])
+    conn.fetch.side_effect = Exception("DB Error")
+
+    assert await VectorService.search_similar_books_async([0.6, 0.8]) == []
+
+
+def test_merge_partitions_keeps_global_order():
+    results = [
+        [{'book_id': 1, 'similarity': 0.9}, {'book_id': 2, 'similarity': 0.5}],
+        [],
+        [{'book_id': 3, 'similarity': 0.8}, {'book_id': 4, 'similarity': 0.7}],
+    ]
+
+    merged = VectorService._merge_partitions(results, 3)
+
+    assert [row['book_id'] for row in merged] == [1, 3, 4]
+
+
+def test_search_books_with_metadata_partitioned_fans_out(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_partitioned')
+    rows = {
+        'books_languages': [{'book_id': 1, 'similarity': 0.7}],
+        'books_databases': [{'book_id': 2, 'similarity': 0.9}, {'book_id': 3, 'similarity': 0.6}],
+    }
+    search = mocker.patch.object(
+        VectorService, '_search_partition',
+        side_effect=lambda query, partition, query_vector, top_k, ef_search: rows.get(partition, [])
+    )
+
+    result = VectorService.search_books_with_metadata([0.6, 0.8], top_k=2)
+
+    assert [book['book_id'] for book in result] == [2, 1]
+    assert sorted(call.args[1] for call in search.call_args_list) == sorted(VectorService.PARTITIONS)
+    query, _, query_vector, top_k, ef_search = search.call_args.args
+    assert query == Enumerations.vector_partition_metadata_query
+    assert (query_vector, top_k, ef_search) == (QueryVector([0.6, 0.8]), 2, Enumerations.hnsw_ef_search)
+
+
+def test_search_books_with_metadata_partitioned_category_filter(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_partitioned')
+    search = mocker.patch.object(VectorService, '_search_partition')
+    filtered = mocker.patch.object(VectorService, '_search_filtered', return_value=[{'book_id': 2, 'similarity': 0.9}])
+    mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection')
+
+    result = VectorService.search_books_with_metadata([0.6, 0.8], top_k=2, filters={'category': 'databases'})
+
+    assert result == [{'book_id': 2, 'similarity': 0.9}]
+    search.assert_not_called()
+    assert filtered.call_args.args[-1] == {'category': 'databases'}
+
+
+def test_search_partitions_bounds_connections_per_search(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.partition_search_connections', 2)
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def search_partition(query, partition, query_vector, top_k, ef_search):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return [{'book_id': len(partition), 'similarity': 0.5}]
+
+    search = mocker.patch.object(VectorService, '_search_partition', side_effect=search_partition)
+
+    VectorService._search_partitions('query', QueryVector([0.6, 0.8]), 2, None)
+
+    assert search.call_count == len(VectorService.PARTITIONS)
+    assert peak[0] <= 2
+
+
+async def test_search_partitions_async_bounds_connections_per_search(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.partition_search_connections', 3)
+    running, peak = [0], [0]
+
+    async def fetch(query, query_vector, top_k, ef_search):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return []
+
+    fetch_async = mocker.patch.object(VectorService, '_fetch_async', side_effect=fetch)
+
+    await VectorService._search_partitions_async('{partition}', QueryVector([0.6, 0.8]), 2, None)
+
+    assert fetch_async.call_count == len(VectorService.PARTITIONS)
+    assert peak[0] == 3
+
+
+async def test_search_similar_books_async_partitioned(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_partitioned')
+    conn = _async_connection(mocker, [{'book_id': 3, 'similarity': 0.75}])
+
+    result = await VectorService.search_similar_books_async([0.6, 0.8], top_k=2)
+
+    assert result == [{'book_id': 3, 'similarity': 0.75}, {'book_id': 3, 'similarity': 0.75}]
+    queries = [call.args[0] for call in conn.fetch.call_args_list]
+    assert queries == [
+        Enumerations.vector_partition_query_async.format(partition=partition)
+        for partition in VectorService.PARTITIONS
+    ]
+
+
+async def test_search_similar_books_async_local_index_runs_off_the_event_loop(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'mmap')
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def search(query_embedding, top_k, ef=None):
+        threads.append(threading.get_ident())
+        return [{'book_id': 7, 'similarity': 0.9}]
+
+    mocker.patch('ml.services.vector_service.MmapVectorIndex.search', side_effect=search)
+
+    result = await VectorService.search_similar_books_async([0.6, 0.8], top_k=1)
+
+    assert result == [{'book_id': 7, 'similarity': 0.9}]
+    assert threads and threads[0] != loop_thread
+
+
+def test_search_books_with_metadata_batch_dispatches_binary_backend(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_binary')
+    single = mocker.patch.object(VectorService, 'search_books_with_metadata', side_effect=lambda embedding, top_k, ef: [
+        {'book_id': int(embedding[0]), 'similarity': 0.5}
+    ])
+    get_connection = mocker.patch('ml.services.vector_service.MLPostgresConnectionPool.get_connection')
+
+    result = VectorService.search_books_with_metadata_batch([[1.0, 0.0], [2.0, 0.0]], top_k=3)
+
+    assert result == [[{'book_id': 1, 'similarity': 0.5}], [{'book_id': 2, 'similarity': 0.5}]]
+    assert [call.args[1:] for call in single.call_args_list] == [(3, None), (3, None)]
+    get_connection.assert_not_called()
+
+
+def test_search_books_with_metadata_batch_partitioned_fans_out_every_query(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_partitioned')
+    mocker.patch('ml.services.vector_service.Enumerations.partition_search_connections', 3)
+    search = mocker.patch.object(
+        VectorService, '_search_partition',
+        side_effect=lambda query, partition, query_vector, top_k, ef_search: [
+            {'book_id': int(query_vector.values[0]) * 100 + len(partition), 'similarity': len(partition) / 100}
+        ]
+    )
+
+    result = VectorService.search_books_with_metadata_batch([[1.0, 0.0], [2.0, 0.0]], top_k=2)
+
+    assert search.call_count == 2 * len(VectorService.PARTITIONS)
+    assert [len(books) for books in result] == [2, 2]
+    assert all(book['book_id'] // 100 == position + 1 for position, books in enumerate(result) for book in books)
+    assert result[0][0]['similarity'] >= result[0][1]['similarity']
+
+
+async def test_search_books_with_metadata_batch_async_dispatches_partitioned_backend(mocker):
+    mocker.patch('ml.services.vector_service.Enumerations.vector_search_backend', 'pgvector_partitioned')
+    single = mocker.patch.object(VectorService, 'search_books_with_metadata_async', mocker.AsyncMock(side_effect=[
+        [{'book_id': 1, 'similarity': 0.5}],
+        [],
+    ]))
+
+    result = await VectorService.search_books_with_metadata_batch_async([[1.0, 0.0], [2.0, 0.0]], top_k=3)
+
+    assert result == [[{'book_id': 1, 'similarity': 0.5}], []]
+    assert single.await_count == 2